@@ -33,9 +33,16 @@ LOG_DIR = "Game/logs"
 CHOICES_FILE = "choices.json"
 NARRATIVE_FILE = "narrative_text.json"
 CHOICE_BLOCKS_FILE = "block_choices.json"
+WORLD_EVENTS_FILE = "world_events.json"  # События по игровым часам (Game/scripts/GameClock.py)
+STORY_BUNDLE_FILE = "story.bundle.json"  # Сюжет, собранный из сценария (Game/scripts/StoryScript.py)
 PLAYERS_FILE = "players.json"
 CONFIG_FILE = "config.json"
 
+# Сюжет, разбитый на главы (python -m Game.scripts.ChapterStore)
+CHAPTERS_DIR = "chapters"  # Папка внутри папки с сюжетом (DATA_DIR или --data)
+CHAPTERS_ENABLED = True  # Если папка с главами есть - грузим главы по требованию
+MAX_LOADED_CHAPTERS = 4  # Сколько неиспользуемых глав держать в памяти
+
 # ============================================
 # НАСТРОЙКИ ГЕЙМПЛЕЯ
 # ============================================
@@ -44,6 +51,8 @@ CONFIG_FILE = "config.json"
 TEXT_SPEED_FAST = 0.01
 TEXT_SPEED_NORMAL = 0.03
 TEXT_SPEED_SLOW = 0.05
+TYPEWRITER_ENABLED = True  # False - весь экран выводится сразу, без побуквенной печати
+DELAYS_ENABLED = True  # False - паузы между экранами (pause) пропускаются
 
 # Размеры консоли
 CONSOLE_WIDTH = 500
@@ -107,6 +116,22 @@ ACHIEVEMENTS = {
     "mega_album": "Альбом - эталон",
 }
 
+# Составные достижения: условие на языке условий сюжета (флаги, has_item, item_power, time)
+ACHIEVEMENT_RULES = {
+    "three_meals": {
+        "name": "Обжора МАИ",
+        "condition": "eat_1 and eat_2 and eat_3",
+    },
+    "shopaholic": {
+        "name": "Канцелярский шопоголик",
+        "condition": 'has_item("Рейсшина из Читай-города") and has_item("Циркуль из Читай-города")',
+    },
+    "early_genius": {
+        "name": "Сдал до звонка",
+        "condition": "mega_brain and time <= 18:30",
+    },
+}
+
 # ============================================
 # НАСТРОЙКИ БЛОКОВ
 # ============================================
@@ -114,6 +139,9 @@ ACHIEVEMENTS = {
 # ID стартового блока
 START_BLOCK_ID = "text_000"
 
+# ID блока, на котором игра заканчивается подсчетом оценки
+END_BLOCK_ID = "block_end"
+
 # Блоки, в которых скрывать время
 HIDE_TIME_BLOCKS = [
     "text_000",
@@ -136,6 +164,46 @@ AUTOSAVE_AFTER_BLOCK = True
 BACKUP_ENABLED = True
 MAX_BACKUPS = 3
 
+# Хранилище слотов: "json" (один файл player_data.json), "sqlite" (база в SAVES_DIR) или "memory"
+SAVE_BACKEND = "json"
+SAVES_DB_FILE = "saves.db"
+SAVES_DB_PATH = f"{SAVES_DIR}/{SAVES_DB_FILE}"
+
+# ============================================
+# ГОРЯЧАЯ ПЕРЕЗАГРУЗКА СЮЖЕТА
+# ============================================
+
+# Перечитывать измененные JSON файлы сюжета без перезапуска игры
+HOT_RELOAD_ENABLED = DEV_MOD
+HOT_RELOAD_INTERVAL = 1.0  # Как часто проверять файлы (секунды)
+
+# ============================================
+# ПУЛ СЕССИЙ
+# ============================================
+
+# Простаивающие сессии многопользовательского хоста уходят в файл подкачки (Game/scripts/SessionPool.py)
+SESSION_IDLE_TIMEOUT = 300.0  # Через сколько секунд без ввода усыплять сессию
+SESSION_MEMORY_CAP = 64 * 1024 * 1024  # Лимит памяти резидентных сессий (байт), 0 - без лимита
+SESSION_SWEEP_INTERVAL = 5.0  # Как часто фоновая проверка ищет простаивающие сессии (секунды)
+SESSION_SPILL_PATH = f"{SAVES_DIR}/sessions.spill"
+SESSION_SPILL_COMPACT_BYTES = 4 * 1024 * 1024  # Переписывать файл, когда мусора больше живых записей и этого порога
+
+# ============================================
+# МЕТРИКИ (Prometheus)
+# ============================================
+
+METRICS_ENABLED = False  # Если включено - метрики доступны по http://METRICS_HOST:METRICS_PORT/metrics
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9464
+
+# ============================================
+# ПОКРЫТИЕ СЮЖЕТА
+# ============================================
+
+# Счетчики посещений блоков, выборов и исходов условий; каждый процесс пишет свой файл при выходе
+COVERAGE_ENABLED = False
+COVERAGE_DIR = f"{LOG_DIR}/coverage"
+
 # ============================================
 # ТЕКСТОВЫЕ КОНСТАНТЫ
 # ============================================
@@ -158,6 +226,14 @@ CONSOLE_COMMANDS = {
     "инв": "Показать инвентарь"
 }
 
+# Команды разработчика
+if DEV_MOD:
+    CONSOLE_COMMANDS["память"] = "Отчет о памяти по подсистемам"
+    CONSOLE_COMMANDS["поиск"] = "Поиск по тексту сюжета"
+
+# Включать tracemalloc при запуске движка (замедляет игру, нужен для мест выделения в отчете "память")
+MEMORY_TRACE_ENABLED = False
+
 # ============================================
 # СООБЩЕНИЯ ОБ ОШИБКАХ
 # ============================================
@@ -0,0 +1,134 @@
+# Game/scripts/Achievements.py
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+
+from Game import config
+from Game.scripts.Condition import CompiledCondition, compile_condition
+
+_shared_instance = None
+_shared_lock = threading.Lock()
+
+
+class AchievementRule:
+    """Достижение: ID, название и условие на языке условий сюжета"""
+
+    __slots__ = ("id", "name", "condition")
+
+    def __init__(self, achievement_id: str, name: str, condition: CompiledCondition):
+        self.id = achievement_id
+        self.name = name
+        self.condition = condition
+
+    def __repr__(self):
+        return f"AchievementRule({self.id!r}, {self.condition.source!r})"
+
+
+class AchievementEngine:
+    """Проверяет достижения после изменений игрока.
+
+    Правила проиндексированы по флагам и предметам, от которых зависят, поэтому после выбора
+    перепроверяются только затронутые правила. Открытые достижения хранятся в Player
+    и рассылаются подписчикам как события (игрок, правило).
+    """
+
+    def __init__(self, rules: Iterable[AchievementRule]):
+        self.rules: Dict[str, AchievementRule] = {}
+        self._by_flag: Dict[str, List[AchievementRule]] = {}
+        self._by_item: Dict[str, List[AchievementRule]] = {}
+        self._by_power: List[AchievementRule] = []
+        self._by_time: List[AchievementRule] = []
+        self._listeners: List[Callable] = []
+
+        for rule in rules:
+            self.rules[rule.id] = rule
+            condition = rule.condition
+            for flag in condition.flags:
+                self._by_flag.setdefault(flag, []).append(rule)
+            for item in condition.items:
+                self._by_item.setdefault(item, []).append(rule)
+            if condition.uses_power:
+                self._by_power.append(rule)
+            if condition.uses_time:
+                self._by_time.append(rule)
+
+    @classmethod
+    def from_config(cls) -> 'AchievementEngine':
+        """Правила из config: простые ACHIEVEMENTS (флаг -> название) и составные ACHIEVEMENT_RULES"""
+        rules = [AchievementRule(flag, name, compile_condition(flag))
+                 for flag, name in config.ACHIEVEMENTS.items()]
+        for achievement_id, rule in config.ACHIEVEMENT_RULES.items():
+            rules.append(AchievementRule(achievement_id, rule["name"], compile_condition(rule["condition"])))
+        return cls(rules)
+
+    @classmethod
+    def shared(cls) -> 'AchievementEngine':
+        """Общий набор правил процесса"""
+        global _shared_instance
+        with _shared_lock:
+            if _shared_instance is None:
+                _shared_instance = cls.from_config()
+        return _shared_instance
+
+    # ---------- События ----------
+
+    def subscribe(self, listener: Callable) -> Callable:
+        """Подписка на открытие достижений: listener(player, rule). Возвращает функцию отписки"""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener) if listener in self._listeners else None
+
+    def _emit(self, player, rule: AchievementRule):
+        for listener in list(self._listeners):
+            listener(player, rule)
+
+    # ---------- Проверка ----------
+
+    def on_change(self, player, flags: Iterable[str] = (), items: Iterable[str] = (),
+                  time_changed: bool = False) -> List[AchievementRule]:
+        """Перепроверяет правила, зависящие от изменившихся флагов, предметов и времени"""
+        candidates = {}
+        for flag in flags:
+            for rule in self._by_flag.get(flag, ()):
+                candidates[rule.id] = rule
+
+        items = list(items)
+        for item in items:
+            for rule in self._by_item.get(item, ()):
+                candidates[rule.id] = rule
+        if items:
+            for rule in self._by_power:
+                candidates[rule.id] = rule
+
+        if time_changed:
+            for rule in self._by_time:
+                candidates[rule.id] = rule
+
+        return self._unlock(player, candidates.values(), notify=True)
+
+    def check_all(self, player, notify: bool = False) -> List[AchievementRule]:
+        """Проверяет все правила (например, для старых сохранений без списка достижений)"""
+        return self._unlock(player, self.rules.values(), notify)
+
+    def _unlock(self, player, rules: Iterable[AchievementRule], notify: bool) -> List[AchievementRule]:
+        unlocked = []
+        achieved = player.achievements
+        flags, inventory, clock = player.flags, player.inventory, player.current_time
+        for rule in rules:
+            if rule.id in achieved:
+                continue
+            try:
+                passed = rule.condition(flags, inventory, clock)
+            except Exception:
+                passed = False
+            if passed and player.unlock_achievement(rule.id):
+                unlocked.append(rule)
+                if notify:
+                    self._emit(player, rule)
+        return unlocked
+
+    def unlocked(self, player) -> List[AchievementRule]:
+        """Открытые игроком достижения в порядке объявления правил"""
+        achieved = player.achievements
+        return [rule for rule_id, rule in self.rules.items() if rule_id in achieved]
+
+    def get(self, achievement_id: str) -> Optional[AchievementRule]:
+        return self.rules.get(achievement_id)
@@ -0,0 +1,557 @@
+# Game/scripts/BatchSimulator.py
+import argparse
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from Game import config
+from Game.scripts.ChoiceBlock import ChoiceBlock
+from Game.scripts.Scoring import EAT_FLAGS
+from Game.scripts.StoryModel import StoryModel
+
+try:
+    import numpy as np
+except ImportError:  # numpy нужен только самой симуляции, таблицы строятся и без него
+    np = None
+
+# Пакетная симуляция прохождений для подбора баланса.
+#
+#   python -m Game.scripts.BatchSimulator -n 1000000 [--seed 1] [--weight 020=3 ...] [--score eat_2=0.5 ...]
+#
+# N игроков - это массивы: индекс текущего блока, битовые маски флагов и предметов, оставшееся
+# время. Все игроки делают шаг одновременно. Сюжет заранее сводится к плоским таблицам
+# (BatchTables): у каждого условия - таблица истинности по флагам, которые в нем встречаются
+# (и по времени, если оно нужно), у каждой ссылки next_block - до bmax веток. Выбор делается
+# случайно среди доступных (с весами --weight). Балл концовки - скалярное произведение
+# битов флагов на SCORE_VALUES, поэтому пересчет с другими SCORE_VALUES не требует новой симуляции.
+#
+# Отличия от GameEngine: предметы учитываются как множество (item_count видит не больше 1),
+# события мира не срабатывают, случайные ветки тянутся генератором numpy, а не сидом игрока.
+
+TRUE_CONDITION = 0
+FALSE_CONDITION = 1
+MAX_CONDITION_VARS = 12  # Условие на большее число флагов и предметов не сводится к таблице
+
+# Исходы прохождения
+RUNNING = 0
+FINISHED = 1  # Дошел до END_BLOCK_ID
+TIME_UP = 2
+GAME_OVER = 3  # Условие завершения выбора или ссылка в никуда
+STUCK = 4  # Нет доступных выборов
+MISSING_BLOCK = 5
+STEP_LIMIT = 6
+OUTCOMES = ("running", "finished", "time_up", "game_over", "stuck", "missing_block", "step_limit")
+
+# Концовки (как в Scoring.evaluate_ending) и оценка досрочного конца игры (как в PolicySolver)
+ENDINGS = ("none", "fainting", "bad", "good", "excellent")
+GAME_OVER_SCORE = float(config.SCORE_THRESHOLDS["fail"])
+
+# Виды блоков
+TEXT = 0
+CHOICE = 1
+END = 2
+
+
+@dataclass
+class ConditionTable:
+    source: str
+    variables: List[int]  # Индексы переменных; бит j индекса таблицы - variables[j]
+    uses_time: bool
+    table: List[bool]  # [time_left * 2**k + биты] или [биты]
+
+
+class BatchTables:
+    """Сюжет в виде плоских таблиц для пакетной симуляции (чистый Python, без numpy)"""
+
+    def __init__(self, state_manager: 'GameStateManager', model: StoryModel = None):
+        if state_manager.chapter_store is not None:
+            raise ValueError("Пакетная симуляция работает только с сюжетом, загруженным целиком")
+        self.state_manager = state_manager
+        self.model = model or StoryModel(state_manager)
+        self.time_steps = config.START_TIME + 1  # time_left от 0 до START_TIME
+
+        # Блоки
+        self.block_ids: List[str] = list(state_manager.text_blocks) + list(state_manager.choice_blocks)
+        if config.END_BLOCK_ID not in state_manager.text_blocks:
+            self.block_ids.append(config.END_BLOCK_ID)
+        self.block_index = {block_id: index for index, block_id in enumerate(self.block_ids)}
+
+        # Переменные: флаги, затем предметы, затем переменная, которая всегда 0 (для выравнивания)
+        self.choice_ids: List[str] = list(state_manager.choices)
+        self._given_items = {choice_id: self.model._item_names(choice.given_item)
+                             for choice_id, choice in state_manager.choices.items()}
+        flags = dict.fromkeys(config.INITIAL_FLAGS)
+        flags.update(dict.fromkeys(flag for flag in config.SCORE_VALUES if flag != "late_penalty"))
+        flags.update(dict.fromkeys(choice.given_flag for choice in state_manager.choices.values() if choice.given_flag))
+        for compiled in list(state_manager._conditions.values()):
+            if compiled is not None:
+                flags.update(dict.fromkeys(sorted(compiled.flags)))
+        items = dict.fromkeys(item["name"] for item in config.INITIAL_ITEMS)
+        for names in self._given_items.values():
+            items.update(dict.fromkeys(names))
+
+        self.flag_names = list(flags)
+        self.item_names = list(items)
+        self.variables = self.flag_names + [f"item:{name}" for name in self.item_names]
+        self.flag_var = {flag: index for index, flag in enumerate(self.flag_names)}
+        self.item_var = {name: len(self.flag_names) + index for index, name in enumerate(self.item_names)}
+        self.zero_var = len(self.variables)
+        self.words = self.zero_var // 64 + 1
+
+        # Условия
+        self.conditions: List[ConditionTable] = [
+            ConditionTable("True", [], False, [True]),
+            ConditionTable("False", [], False, [False]),
+        ]
+        self._condition_ids: Dict[str, int] = {}
+
+        # Ссылки next_block: ветки (индекс блока, условие, вес); -2 - блока нет в сюжете
+        self.links: List[List[Tuple[int, int, float]]] = []
+        self.link_weighted: List[bool] = []
+        self._link_ids: Dict[object, int] = {}
+
+        # Выборы
+        self.choice_cost: List[int] = []
+        self.choice_gives: List[List[int]] = []
+        self.choice_condition: List[int] = []
+        self.choice_end_condition: List[int] = []
+        self.choice_end: List[int] = []
+        self.choice_link: List[int] = []
+        for choice_id in self.choice_ids:
+            choice = state_manager.choices[choice_id]
+            self.choice_cost.append(choice.time_cost if isinstance(choice.time_cost, int) else 0)
+            gives = [self.flag_var[choice.given_flag]] if choice.given_flag else []
+            gives += [self.item_var[name] for name in self._given_items[choice_id]]
+            self.choice_gives.append(gives)
+            self.choice_condition.append(self.condition_id(choice.condition))
+            self.choice_end_condition.append(
+                self.condition_id(choice.end_condition) if choice.end_condition else FALSE_CONDITION)
+            self.choice_end.append(choice.end if isinstance(choice.end, int) else 0)
+            self.choice_link.append(self.link_id(choice.next_block))
+
+        # Блоки: вид, ссылка и затраты времени текстового блока, выборы блока с выбором
+        choice_index = {choice_id: index for index, choice_id in enumerate(self.choice_ids)}
+        self.block_kind: List[int] = []
+        self.block_link: List[int] = []
+        self.block_cost: List[int] = []
+        self.block_cost_condition: List[int] = []  # Время тратится, только если блок не пропущен
+        self.block_choices: List[List[int]] = []
+        for block_id in self.block_ids:
+            block = state_manager.get_block(block_id)
+            cost = block.time_cost if block is not None else 0
+            self.block_cost.append(cost)
+            self.block_cost_condition.append(
+                self.condition_id(getattr(block, "conditions", None)) if cost else TRUE_CONDITION)
+            if block_id == config.END_BLOCK_ID:
+                self.block_kind.append(END)
+                self.block_link.append(-1)
+                self.block_choices.append([])
+            elif isinstance(block, ChoiceBlock):
+                self.block_kind.append(CHOICE)
+                self.block_link.append(-1)
+                self.block_choices.append([choice_index[choice_id] for choice_id in block.available_choices
+                                           if choice_id in choice_index])
+            else:
+                self.block_kind.append(TEXT)
+                self.block_link.append(self.link_id(block.next_block))
+                self.block_choices.append([])
+
+        # Начальное состояние и подсчет баллов
+        self.start_block = self.block_index.get(config.START_BLOCK_ID, -2)
+        self.initial_vars = [self.flag_var[flag] for flag, value in config.INITIAL_FLAGS.items() if value]
+        self.initial_vars += [self.item_var[item["name"]] for item in config.INITIAL_ITEMS]
+        self.eat_vars = [self.flag_var[flag] for flag in EAT_FLAGS if flag in self.flag_var]
+
+    # ---------- Условия ----------
+
+    def condition_id(self, source: Optional[str]) -> int:
+        """Индекс таблицы истинности условия (пустое условие - всегда истина)"""
+        if not source:
+            return TRUE_CONDITION
+        if source in self._condition_ids:
+            return self._condition_ids[source]
+
+        compiled = self.state_manager.compile_condition(source)
+        if compiled is None:
+            condition_id = FALSE_CONDITION  # Условие с ошибкой никогда не выполняется, как в движке
+        else:
+            condition_id = len(self.conditions)
+            self.conditions.append(self._truth_table(compiled))
+        self._condition_ids[source] = condition_id
+        return condition_id
+
+    def _truth_table(self, compiled) -> ConditionTable:
+        variables = [self.flag_var[flag] for flag in sorted(compiled.flags)]
+        if compiled.uses_power:
+            # Сила зависит от всего инвентаря - берем все предметы
+            variables += [self.item_var[name] for name in self.item_names]
+        else:
+            # has_item и item_count видят только названные предметы; предмета, который никто
+            # не выдает, у игрока не бывает - в таблице он всегда отсутствует
+            variables += [self.item_var[name] for name in sorted(compiled.items) if name in self.item_var]
+        if len(variables) > MAX_CONDITION_VARS:
+            raise ValueError(f"Условие '{compiled.source}' зависит от {len(variables)} флагов и предметов "
+                             f"(для пакетной симуляции не больше {MAX_CONDITION_VARS})")
+
+        names = [self.variables[var] for var in variables]
+        table = []
+        times = range(self.time_steps) if compiled.uses_time else (config.START_TIME,)
+        for time_left in times:
+            clock = config.START_TIME + (config.START_TIME - time_left)
+            for bits in range(1 << len(variables)):
+                flags = {}
+                items = []
+                for position, name in enumerate(names):
+                    if bits >> position & 1:
+                        if name.startswith("item:"):
+                            items.append(name[5:])
+                        else:
+                            flags[name] = True
+                try:
+                    table.append(bool(compiled(flags, self.model.inventory(tuple(sorted(items))), clock)))
+                except Exception:
+                    table.append(False)
+        return ConditionTable(compiled.source, variables, compiled.uses_time, table)
+
+    # ---------- Ссылки ----------
+
+    def link_id(self, next_block) -> int:
+        """Индекс ссылки next_block в таблице ссылок (списки - через таблицы ветвлений менеджера)"""
+        key = id(next_block) if isinstance(next_block, list) else next_block
+        if key in self._link_ids:
+            return self._link_ids[key]
+
+        branches = []
+        weighted = False
+        if isinstance(next_block, list):
+            table = self.state_manager.branch_table(next_block)
+            weighted = table.weighted
+            for branch in table.branches:
+                condition = self.condition_id(branch.condition.source) if branch.condition else TRUE_CONDITION
+                weight = branch.weight if branch.weight is not None else 1.0
+                branches.append((self.block_index.get(branch.block, -2), condition, weight))
+        elif next_block:
+            branches.append((self.block_index.get(next_block, -2), TRUE_CONDITION, 1.0))
+
+        self._link_ids[key] = len(self.links)
+        self.links.append(branches)
+        self.link_weighted.append(weighted)
+        return self._link_ids[key]
+
+
+@dataclass
+class BatchResult:
+    outcome: 'np.ndarray'  # Исход каждого прохождения (FINISHED, TIME_UP, ...)
+    block: 'np.ndarray'  # Блок, на котором прохождение закончилось
+    masks: 'np.ndarray'  # Флаги и предметы в конце (N, words)
+    time_left: 'np.ndarray'
+    end_code: 'np.ndarray'  # choice.end выбора, завершившего игру (0 - нет)
+    steps: int
+    elapsed: float
+
+    def __len__(self) -> int:
+        return len(self.outcome)
+
+
+class BatchSimulator:
+    """Прогоняет N прохождений одновременно по таблицам BatchTables"""
+
+    def __init__(self, tables: BatchTables, choice_weights: Dict[str, float] = None):
+        if np is None:
+            raise ImportError("Для пакетной симуляции нужен numpy (pip install numpy)")
+        self.tables = tables
+        self.words = tables.words
+
+        # Условия: одна плоская таблица истинности и для каждого условия смещение в ней.
+        # Переменная j условия - бит _cond_shift[c, j] слова _cond_word[c, j] маски; лишние
+        # позиции указывают на zero_var, бит которой всегда 0
+        conditions = tables.conditions
+        kmax = max(1, max(len(condition.variables) for condition in conditions))
+        self._cond_size = np.zeros(len(conditions), dtype=np.int64)
+        self._cond_word = np.full((len(conditions), kmax), tables.zero_var >> 6, dtype=np.int64)
+        self._cond_shift = np.full((len(conditions), kmax), tables.zero_var & 63, dtype=np.uint64)
+        self._cond_span = np.ones(len(conditions), dtype=np.int64)
+        self._cond_time = np.zeros(len(conditions), dtype=bool)
+        self._cond_offset = np.zeros(len(conditions), dtype=np.int64)
+        self._positions = np.arange(kmax, dtype=np.uint64)
+        offset = 0
+        for index, condition in enumerate(conditions):
+            variables = np.array(condition.variables, dtype=np.int64)
+            self._cond_size[index] = len(variables)
+            self._cond_word[index, :len(variables)] = variables >> 6
+            self._cond_shift[index, :len(variables)] = variables & 63
+            self._cond_span[index] = 1 << len(condition.variables)
+            self._cond_time[index] = condition.uses_time
+            self._cond_offset[index] = offset
+            offset += len(condition.table)
+        self._truth = np.fromiter((value for condition in conditions for value in condition.table),
+                                  dtype=bool, count=offset)
+
+        # Ссылки: до bmax веток на ссылку, пустые ветки никогда не выполняются
+        bmax = max(1, max((len(branches) for branches in tables.links), default=1))
+        self._link_target = np.full((len(tables.links), bmax), -1, dtype=np.int64)
+        self._link_cond = np.full((len(tables.links), bmax), FALSE_CONDITION, dtype=np.int64)
+        self._link_weight = np.zeros((len(tables.links), bmax), dtype=np.float64)
+        for index, branches in enumerate(tables.links):
+            for position, (target, condition, weight) in enumerate(branches):
+                self._link_target[index, position] = target
+                self._link_cond[index, position] = condition
+                self._link_weight[index, position] = weight
+        self._link_weighted = np.array(tables.link_weighted, dtype=bool)
+        self._any_weighted = bool(self._link_weighted.any())
+
+        # Выборы
+        count = len(tables.choice_ids)
+        self._choice_cost = np.array(tables.choice_cost, dtype=np.int64)
+        self._choice_give = np.zeros((max(count, 1), self.words), dtype=np.uint64)
+        for index, gives in enumerate(tables.choice_gives):
+            for var in gives:
+                self._choice_give[index, var >> 6] |= np.uint64(1 << (var & 63))
+        self._choice_cond = np.array(tables.choice_condition or [TRUE_CONDITION], dtype=np.int64)
+        self._choice_end_cond = np.array(tables.choice_end_condition or [FALSE_CONDITION], dtype=np.int64)
+        self._choice_end = np.array(tables.choice_end or [0], dtype=np.int64)
+        self._choice_link = np.array(tables.choice_link or [0], dtype=np.int64)
+        weights = choice_weights or {}
+        self._choice_weight = np.array([float(weights.get(choice_id, 1.0)) for choice_id in tables.choice_ids] or [1.0])
+
+        # Блоки
+        cmax = max(1, max(len(choices) for choices in tables.block_choices))
+        self._block_kind = np.array(tables.block_kind, dtype=np.int8)
+        self._block_link = np.array(tables.block_link, dtype=np.int64)
+        self._block_cost = np.array(tables.block_cost, dtype=np.int64)
+        self._block_cost_cond = np.array(tables.block_cost_condition, dtype=np.int64)
+        self._block_choices = np.full((len(tables.block_ids), cmax), -1, dtype=np.int64)
+        for index, choices in enumerate(tables.block_choices):
+            self._block_choices[index, :len(choices)] = choices
+
+        self._initial_mask = np.zeros(self.words, dtype=np.uint64)
+        for var in tables.initial_vars:
+            self._initial_mask[var >> 6] |= np.uint64(1 << (var & 63))
+
+    # ---------- Векторные операции ----------
+
+    @staticmethod
+    def _bits(masks: 'np.ndarray', var: 'np.ndarray') -> 'np.ndarray':
+        """Значение переменной var[i] у игрока i (0 или 1)"""
+        rows = np.arange(len(var))
+        words = masks[rows, var >> 6]
+        return ((words >> (var & 63).astype(np.uint64)) & np.uint64(1)).astype(np.int64)
+
+    def _check(self, cond: 'np.ndarray', masks: 'np.ndarray', time_left: 'np.ndarray') -> 'np.ndarray':
+        """Условия cond[i, ...] для игрока i - одно обращение к таблице истинности на условие.
+
+        cond - (N,) или (N, B): так ветки ссылки и выборы блока проверяются за один вызов.
+        """
+        player = (len(cond),) + (1,) * (cond.ndim - 1)
+        index = self._cond_offset[cond]
+        timed = self._cond_time[cond]
+        if timed.any():
+            clock = np.clip(time_left, 0, self.tables.time_steps - 1).reshape(player)
+            index = index + np.where(timed, clock * self._cond_span[cond], 0)
+
+        # Биты переменных сразу для всех позиций: сдвиг слова маски и сумма по позициям
+        used = int(self._cond_size[cond].max(initial=0))
+        if used:
+            if self.words == 1:
+                words = masks[:, 0].reshape(player + (1,))
+            else:
+                rows = np.arange(len(cond)).reshape(player + (1,))
+                words = masks[rows, self._cond_word[cond, :used]]
+            bits = (words >> self._cond_shift[cond, :used]) & np.uint64(1)
+            index = index + (bits << self._positions[:used]).sum(axis=-1).astype(np.int64)
+        return self._truth[index]
+
+    def _resolve(self, links: 'np.ndarray', masks, time_left, rng) -> 'np.ndarray':
+        """Следующий блок по ссылкам (-1 - ни одна ветка не подошла, -2 - блока нет)"""
+        rows = np.arange(len(links))
+        targets = self._link_target[links]
+        passed = self._check(self._link_cond[links], masks, time_left)
+
+        # Без весов - первая выполненная ветка
+        first = targets[rows, passed.argmax(axis=1)]
+        result = np.where(passed.any(axis=1), first, -1)
+
+        weighted = self._link_weighted[links]
+        if self._any_weighted and weighted.any():
+            weights = np.where(passed, self._link_weight[links], 0.0)
+            total = weights.sum(axis=1)
+            point = rng.random(len(links)) * total
+            pick = (weights.cumsum(axis=1) > point[:, None]).argmax(axis=1)
+            # Все подходящие ветки с весом 0 - первая из них, как в BranchTable.select
+            drawn = np.where(total > 0, targets[rows, pick], result)
+            result = np.where(weighted, drawn, result)
+        return result
+
+    # ---------- Симуляция ----------
+
+    def run(self, players: int, seed: Optional[int] = None, max_steps: int = None) -> BatchResult:
+        """Прогоняет players прохождений от стартового блока до конца"""
+        started = time.perf_counter()
+        rng = np.random.default_rng(seed)
+        max_steps = max_steps or 4 * len(self.tables.block_ids) + 100
+
+        block = np.full(players, self.tables.start_block, dtype=np.int64)
+        masks = np.tile(self._initial_mask, (players, 1))
+        time_left = np.full(players, config.START_TIME, dtype=np.int64)
+        outcome = np.zeros(players, dtype=np.int8)
+        end_code = np.zeros(players, dtype=np.int64)
+        if self.tables.start_block < 0:
+            outcome[:] = MISSING_BLOCK
+
+        steps = 0
+        active = np.flatnonzero(outcome == RUNNING)
+        while active.size and steps < max_steps:
+            steps += 1
+            # Как в game_loop: сначала время, затем конец игры
+            current = block[active]
+            kind = self._block_kind[current]
+            time_up = time_left[active] <= 0
+            outcome[active[time_up]] = TIME_UP
+            outcome[active[~time_up & (kind == END)]] = FINISHED
+
+            # Текстовые блоки
+            text = active[~time_up & (kind == TEXT)]
+            if text.size:
+                current = block[text]
+                text_masks = masks[text]
+                text_time = time_left[text]
+                paying = self._check(self._block_cost_cond[current], text_masks, text_time)
+                text_time = np.maximum(text_time - np.where(paying, self._block_cost[current], 0), 0)
+                time_left[text] = text_time
+                self._move(text, self._resolve(self._block_link[current], text_masks, text_time, rng),
+                           block, outcome)
+
+            # Блоки с выбором
+            choosing = active[~time_up & (kind == CHOICE)]
+            if choosing.size:
+                self._choose(choosing, block, masks, time_left, outcome, end_code, rng)
+
+            active = active[outcome[active] == RUNNING]
+
+        outcome[active] = STEP_LIMIT
+        return BatchResult(outcome, block, masks, time_left, end_code, steps, time.perf_counter() - started)
+
+    @staticmethod
+    def _move(players: 'np.ndarray', targets: 'np.ndarray', block, outcome):
+        # Закончившие игру остаются на блоке, где это случилось
+        moved = targets >= 0
+        block[players[moved]] = targets[moved]
+        outcome[players[targets == -1]] = GAME_OVER
+        outcome[players[targets == -2]] = MISSING_BLOCK
+
+    def _choose(self, players, block, masks, time_left, outcome, end_code, rng):
+        rows = np.arange(len(players))
+        candidates = self._block_choices[block[players]]
+        valid = candidates >= 0
+        safe = np.where(valid, candidates, 0)
+        player_masks = masks[players]
+        player_time = time_left[players]
+
+        available = valid & self._check(self._choice_cond[safe], player_masks, player_time)
+
+        weights = np.where(available, self._choice_weight[safe], 0.0)
+        total = weights.sum(axis=1)
+        unweighted = total <= 0  # Все доступные с весом 0 - выбираем поровну
+        if unweighted.any():
+            weights[unweighted] = available[unweighted]
+            total = weights.sum(axis=1)
+
+        stuck = total <= 0
+        outcome[players[stuck]] = STUCK
+        point = rng.random(len(players)) * total
+        chosen = safe[rows, (weights.cumsum(axis=1) > point[:, None]).argmax(axis=1)]
+
+        # Применяем выбор (сначала эффекты, потом условие завершения - как в process_choice)
+        going = ~stuck
+        players, chosen = players[going], chosen[going]
+        time_left[players] = np.maximum(time_left[players] - self._choice_cost[chosen], 0)
+        masks[players] |= self._choice_give[chosen]
+
+        player_masks = masks[players]
+        player_time = time_left[players]
+        ended = self._check(self._choice_end_cond[chosen], player_masks, player_time)
+        outcome[players[ended]] = GAME_OVER
+        end_code[players[ended]] = self._choice_end[chosen[ended]]
+
+        moving = ~ended
+        targets = self._resolve(self._choice_link[chosen[moving]], player_masks[moving], player_time[moving], rng)
+        self._move(players[moving], targets, block, outcome)
+
+    # ---------- Баллы ----------
+
+    def score(self, result: BatchResult, score_values: Dict[str, float] = None) -> Tuple['np.ndarray', 'np.ndarray']:
+        """Баллы и концовки (индексы ENDINGS) всех прохождений: баллы - masks @ SCORE_VALUES"""
+        values = dict(config.SCORE_VALUES if score_values is None else score_values)
+        late_penalty = values.pop("late_penalty", -2.0)
+        variables = [self.tables.flag_var[flag] for flag in values if flag in self.tables.flag_var]
+        vector = np.array([values[flag] for flag in values if flag in self.tables.flag_var], dtype=np.float64)
+
+        players = len(result)
+        bits = np.empty((players, len(variables)), dtype=np.float64)
+        for column, var in enumerate(variables):
+            bits[:, column] = self._bits(result.masks, np.full(players, var, dtype=np.int64))
+        scores = bits @ vector
+
+        arrival = config.START_TIME + (config.START_TIME - result.time_left)
+        scores += np.where(arrival > config.DEADLINE_TIME, late_penalty, 0.0)
+
+        ate = np.zeros(players, dtype=bool)
+        for var in self.tables.eat_vars:
+            ate |= self._bits(result.masks, np.full(players, var, dtype=np.int64)).astype(bool)
+
+        thresholds = config.SCORE_THRESHOLDS
+        endings = np.where(scores < thresholds["bad"], ENDINGS.index("bad"),
+                           np.where(scores < thresholds["excellent"], ENDINGS.index("good"), ENDINGS.index("excellent")))
+        finished = result.outcome == FINISHED
+        endings = np.where(finished, np.where(ate, endings, ENDINGS.index("fainting")), ENDINGS.index("none"))
+        scores = np.where(finished & ate, scores, np.where(finished, 0.0, GAME_OVER_SCORE))
+        return scores, endings
+
+
+def format_summary(simulator: BatchSimulator, result: BatchResult, scores, endings) -> List[str]:
+    """Строки сводки для консоли"""
+    players = len(result)
+    rate = players / result.elapsed if result.elapsed else float("inf")
+    lines = [f"Прохождений: {players}, шагов: {result.steps}, время: {result.elapsed:.2f} с ({rate:,.0f} в секунду)"]
+    lines.append("Исходы:")
+    for code, count in enumerate(np.bincount(result.outcome, minlength=len(OUTCOMES))):
+        if count:
+            lines.append(f"  {OUTCOMES[code]:<15} {count:>10} ({count / players:.1%})")
+    lines.append("Концовки:")
+    for code, count in enumerate(np.bincount(endings, minlength=len(ENDINGS))):
+        if count and ENDINGS[code] != "none":
+            lines.append(f"  {ENDINGS[code]:<15} {count:>10} ({count / players:.1%})")
+    lines.append(f"Балл: средний {scores.mean():.3f}, лучший {scores.max():.3f}, медиана {np.median(scores):.3f}")
+    return lines
+
+
+def _parse_pairs(pairs: Sequence[str]) -> Dict[str, float]:
+    parsed = {}
+    for pair in pairs:
+        key, _, value = pair.partition("=")
+        parsed[key] = float(value)
+    return parsed
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Пакетная симуляция прохождений (numpy)")
+    parser.add_argument("-n", "--players", type=int, default=1_000_000, help="Количество прохождений")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--data", default=None, help="Папка с сюжетом (по умолчанию DATA_DIR)")
+    parser.add_argument("--weight", nargs="*", default=[], help="Веса выборов: ID=вес (по умолчанию 1)")
+    parser.add_argument("--score", nargs="*", default=[], help="Переопределить SCORE_VALUES: флаг=балл")
+    args = parser.parse_args(argv)
+
+    from Game.scripts.GameStateManager import GameStateManager
+    manager = GameStateManager.shared(args.data)
+
+    simulator = BatchSimulator(BatchTables(manager), _parse_pairs(args.weight))
+    result = simulator.run(args.players, seed=args.seed)
+    score_values = {**config.SCORE_VALUES, **_parse_pairs(args.score)}
+    scores, endings = simulator.score(result, score_values)
+    for line in format_summary(simulator, result, scores, endings):
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# Game/scripts/BlockRegistry.py
+from typing import Dict, List, Type
+
+from Game.scripts.GameBlock import GameBlock
+from Game.scripts.TextBlock import TextBlock
+from Game.scripts.ChoiceBlock import ChoiceBlock
+from Game.scripts.RandomBlock import RandomBlock
+from Game.scripts.WaitBlock import WaitBlock
+from Game.scripts.ItemCheckBlock import ItemCheckBlock
+from Game.scripts.EndingBlock import EndingBlock
+
+# Типы блоков по тегу "type" в данных сюжета:
+#   "block_7": {"type": "wait", "body": "Очередь в столовой...", "minutes": 15, "next_block": "block_8"}
+# Блок без тега - тип по умолчанию для файла (text в text_blocks.json, choice в choice_blocks.json).
+# Новый тип - класс-наследник GameBlock с атрибутом type_tag и from_dict, зарегистрированный через
+# BLOCK_TYPES.register; game_loop вызывает block.process(engine) и про типы ничего не знает.
+
+
+class BlockRegistry:
+    """Реестр типов блоков: тег -> класс"""
+
+    def __init__(self, block_types: List[Type[GameBlock]] = ()):
+        self._types: Dict[str, Type[GameBlock]] = {}
+        for block_type in block_types:
+            self.register(block_type)
+
+    def register(self, block_type: Type[GameBlock]) -> Type[GameBlock]:
+        """Регистрирует тип блока по его type_tag (можно использовать как декоратор класса)"""
+        tag = block_type.type_tag
+        if not tag:
+            raise ValueError(f"У типа блока {block_type.__name__} не задан type_tag")
+        existing = self._types.get(tag)
+        if existing is not None and existing is not block_type:
+            raise ValueError(f"Тип блока '{tag}' уже зарегистрирован ({existing.__name__})")
+        self._types[tag] = block_type
+        return block_type
+
+    def get(self, tag: str) -> Type[GameBlock]:
+        return self._types[tag]
+
+    @property
+    def tags(self) -> List[str]:
+        return list(self._types)
+
+    def create(self, block_id: str, data: dict, default: Type[GameBlock]) -> GameBlock:
+        """Создает блок по тегу "type" из данных (без тега - блок типа default).
+
+        Тип должен быть наследником default: блоки из text_blocks.json ведут себя как текстовые,
+        а из choice_blocks.json - как блоки с выбором, на это опираются решатели и инструменты.
+        """
+        tag = data.get("type")
+        if tag is None:
+            return default.from_dict(block_id, data)
+
+        block_type = self._types.get(tag)
+        if block_type is None:
+            raise ValueError(f"Блок '{block_id}': неизвестный тип '{tag}' (есть: {', '.join(self._types)})")
+        if not issubclass(block_type, default):
+            raise ValueError(f"Блок '{block_id}': тип '{tag}' не может лежать среди блоков '{default.type_tag}'")
+        return block_type.from_dict(block_id, data)
+
+
+# Встроенные типы блоков
+BLOCK_TYPES = BlockRegistry([TextBlock, ChoiceBlock, RandomBlock, WaitBlock, ItemCheckBlock, EndingBlock])
@@ -0,0 +1,112 @@
+# Game/scripts/BranchTable.py
+import random
+import zlib
+from typing import Callable, List, Optional, Union
+
+from Game.scripts.Condition import CompiledCondition
+
+# Ссылка next_block может быть таблицей ветвлений:
+#   "next_block": ["block_a", {"block": "block_b", "condition": "eat_1"}, {"block": "block_c", "weight": 3}]
+# Без весов выбирается первая ветка, чье условие выполнено (строка - ветка без условия).
+# Если у веток есть веса - среди выполненных тянется случайная с сидом от состояния игрока.
+# Вес - неотрицательное число; ветка с весом 0 выбирается, только если у всех выполненных вес 0.
+
+
+class Branch:
+    __slots__ = ("block", "condition", "weight")
+
+    def __init__(self, block: str, condition: Optional[CompiledCondition] = None, weight: Optional[float] = None):
+        self.block = block
+        self.condition = condition
+        self.weight = weight
+
+
+class BranchTable:
+    """Скомпилированная таблица ветвлений одной ссылки next_block"""
+
+    __slots__ = ("source", "branches", "weighted", "errors")
+
+    def __init__(self, source: list, branches: List[Branch], errors: List[str] = ()):
+        self.source = source  # Исходный список, по нему проверяется актуальность кэша
+        self.branches = tuple(branches)
+        self.weighted = any(branch.weight is not None for branch in branches)
+        self.errors = list(errors)  # Отброшенные при компиляции ветки
+
+    @property
+    def targets(self) -> List[str]:
+        return [branch.block for branch in self.branches]
+
+    def select(self, flags: dict, inventory=None, clock: int = 0, seed: Optional[str] = None) -> Optional[str]:
+        """Возвращает ID следующего блока (None - ни одна ветка не подошла).
+
+        Одна проверка условия на ветку. Для взвешенных таблиц без seed возвращается
+        самая тяжелая из подходящих веток (так рассуждают решатели).
+        """
+        if not self.weighted:
+            for branch in self.branches:
+                condition = branch.condition
+                if condition is None or condition(flags, inventory, clock):
+                    return branch.block
+            return None
+
+        passed = [branch for branch in self.branches
+                  if branch.condition is None or branch.condition(flags, inventory, clock)]
+        if not passed:
+            return None
+        if seed is None:
+            return max(passed, key=_weight).block
+
+        total = sum(_weight(branch) for branch in passed)
+        if total <= 0:
+            return passed[0].block  # У всех подходящих веток вес 0 - тянуть не из чего
+        point = random.Random(zlib.crc32(seed.encode("utf-8"))).random() * total
+        for branch in passed:
+            point -= _weight(branch)
+            if point < 0:
+                return branch.block
+        return passed[-1].block
+
+
+def _weight(branch: Branch) -> float:
+    return branch.weight if branch.weight is not None else 1.0
+
+
+def compile_branches(next_block: list, compile_condition: Callable[[str], Optional[CompiledCondition]]) -> BranchTable:
+    """Компилирует список next_block в таблицу (условия - через кэш менеджера сюжета)"""
+    branches = []
+    errors = []
+    for entry in next_block:
+        if isinstance(entry, str):
+            if entry:
+                branches.append(Branch(entry))
+            continue
+        if not isinstance(entry, dict) or not entry.get("block"):
+            continue
+
+        condition = None
+        if entry.get("condition"):
+            condition = compile_condition(entry["condition"])
+            if condition is None:
+                continue  # Условие с ошибкой - ветка никогда не выбирается
+        weight = entry.get("weight")
+        if weight is not None:
+            if isinstance(weight, bool) or not isinstance(weight, (int, float)) or weight < 0:
+                errors.append(f"Ветка в '{entry['block']}': вес должен быть неотрицательным числом, а не {weight!r}")
+                continue
+            weight = float(weight)
+        branches.append(Branch(entry["block"], condition, weight))
+    return BranchTable(next_block, branches, errors)
+
+
+def link_targets(next_block: Union[str, list, None]) -> List[str]:
+    """Все блоки, куда может вести ссылка next_block, без учета условий"""
+    if isinstance(next_block, list):
+        targets = []
+        for entry in next_block:
+            if isinstance(entry, str) and entry:
+                targets.append(entry)
+            elif isinstance(entry, dict) and isinstance(entry.get("block"), str):
+                targets.append(entry["block"])
+        return targets
+    return [next_block] if isinstance(next_block, str) and next_block else []
+
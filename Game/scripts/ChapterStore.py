@@ -0,0 +1,327 @@
+# Game/scripts/ChapterStore.py
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from Game import config
+from Game.scripts.BranchTable import link_targets
+from Game.utils.JsonStream import iter_object_items
+
+MANIFEST_FILE = "manifest.json"
+
+
+class ChapterStore:
+    """Подгружает главы сюжета по требованию и выгружает неиспользуемые (LRU).
+
+    Каждая глава - отдельная папка со своими narrative_text.json, block_choices.json,
+    choices.json и manifest.json. При старте читаются только манифесты.
+    """
+
+    def __init__(self, state_manager: 'GameStateManager', chapters_dir: str, max_loaded: int = None):
+        self._state_manager = state_manager
+        self._chapters_dir = chapters_dir
+        self._max_loaded = max_loaded if max_loaded is not None else config.MAX_LOADED_CHAPTERS
+
+        self._manifests: Dict[str, dict] = {}
+        self._block_index: Dict[str, str] = {}  # ID блока -> ID главы
+        self._loaded: "OrderedDict[str, dict]" = OrderedDict()  # Глава -> какие ID она добавила
+        self._choice_refs: Dict[str, int] = {}  # Выбор может лежать в нескольких главах
+        self._sessions: Dict[Hashable, str] = {}  # Сессия -> глава, в которой она сейчас
+        self._lock = threading.RLock()
+        self._story_hash: Optional[str] = None
+
+        self._read_manifests()
+
+    def _read_manifests(self):
+        for chapter_id in sorted(os.listdir(self._chapters_dir)):
+            manifest_path = os.path.join(self._chapters_dir, chapter_id, MANIFEST_FILE)
+            if not os.path.isfile(manifest_path):
+                continue
+
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+
+            self._manifests[chapter_id] = manifest
+            for block_id in manifest.get("blocks", []):
+                self._block_index[block_id] = chapter_id
+
+    @property
+    def chapter_ids(self) -> List[str]:
+        return list(self._manifests)
+
+    @property
+    def block_ids(self) -> List[str]:
+        return list(self._block_index)
+
+    @property
+    def loaded_chapters(self) -> List[str]:
+        return list(self._loaded)
+
+    def manifest(self, chapter_id: str) -> Optional[dict]:
+        return self._manifests.get(chapter_id)
+
+    def story_hash(self) -> str:
+        """Хэш всего сюжета - тот же, что content_hash у сюжета, загруженного целиком.
+
+        Берется из манифестов (split_story записывает его в каждую главу); для старых манифестов
+        без хэша один раз считается по файлам всех глав, не трогая загруженные таблицы.
+        """
+        with self._lock:
+            if self._story_hash is None:
+                hashes = {manifest.get("story_hash") for manifest in self._manifests.values()}
+                if len(hashes) == 1 and None not in hashes:
+                    self._story_hash = hashes.pop()
+                else:
+                    from Game.scripts.GameStateManager import tables_hash
+                    self._story_hash = tables_hash(self.read_story())
+            return self._story_hash
+
+    def read_story(self) -> Tuple[dict, dict, dict]:
+        """Текстовые блоки, блоки с выбором и выборы всех глав, прочитанные из файлов.
+
+        Таблицы менеджера и очередь загруженных глав не меняются, условия не компилируются.
+        """
+        from Game.scripts.GameStateManager import GameStateManager
+        from Game.scripts.TextBlock import TextBlock
+        from Game.scripts.ChoiceBlock import ChoiceBlock
+        from Game.scripts.Choice import Choice
+
+        text_blocks, choice_blocks, choices = {}, {}, {}
+        for chapter_id in self._manifests:
+            chapter_dir = os.path.join(self._chapters_dir, chapter_id)
+            for key, data in _chapter_items(chapter_dir, config.NARRATIVE_FILE, ()):
+                block = GameStateManager._create_block(key, data, TextBlock)
+                if block is not None:
+                    text_blocks[key] = block
+            for key, data in _chapter_items(chapter_dir, config.CHOICE_BLOCKS_FILE, ("choice_blocks",)):
+                block = GameStateManager._create_block(key, data, ChoiceBlock)
+                if block is not None:
+                    choice_blocks[key] = block
+            for key, data in _chapter_items(chapter_dir, config.CHOICES_FILE, ("choices",)):
+                choices[key] = Choice.from_dict(key, data)
+        return text_blocks, choice_blocks, choices
+
+    def chapter_of(self, block_id: str) -> Optional[str]:
+        """Возвращает ID главы, в которой лежит блок"""
+        return self._block_index.get(block_id)
+
+    def ensure_block(self, block_id: str) -> bool:
+        """Подгружает главу с нужным блоком, если её еще нет в памяти"""
+        chapter_id = self._block_index.get(block_id)
+        if chapter_id is None:
+            return False
+        self.ensure_loaded(chapter_id)
+        return True
+
+    def ensure_loaded(self, chapter_id: str):
+        """Загружает главу в таблицы GameStateManager"""
+        with self._lock:
+            if chapter_id in self._loaded:
+                self._loaded.move_to_end(chapter_id)
+                return
+
+            chapter_dir = os.path.join(self._chapters_dir, chapter_id)
+            manager = self._state_manager
+            text_blocks = self._parse_optional(manager._parse_text_blocks, chapter_dir, config.NARRATIVE_FILE)
+            choice_blocks = self._parse_optional(manager._parse_choice_blocks, chapter_dir, config.CHOICE_BLOCKS_FILE)
+            choices = self._parse_optional(manager._parse_choices, chapter_dir, config.CHOICES_FILE)
+
+            with manager._lock:
+                # Выбор, общий для нескольких глав, заменяется новым объектом - старая таблица ветвлений не нужна
+                manager.forget_branches(manager.choices[choice_id] for choice_id in choices
+                                        if choice_id in manager.choices)
+                manager.text_blocks.update(text_blocks)
+                manager.choice_blocks.update(choice_blocks)
+                manager.blocks.update(choice_blocks)
+                manager.blocks.update(text_blocks)
+                manager.choices.update(choices)
+
+            for choice_id in choices:
+                self._choice_refs[choice_id] = self._choice_refs.get(choice_id, 0) + 1
+
+            self._loaded[chapter_id] = {
+                "text_blocks": list(text_blocks),
+                "choice_blocks": list(choice_blocks),
+                "choices": list(choices),
+            }
+            self._evict(keep=chapter_id)
+
+    @staticmethod
+    def _parse_optional(parser, chapter_dir: str, filename: str) -> dict:
+        filepath = os.path.join(chapter_dir, filename)
+        if not os.path.exists(filepath):
+            return {}
+        return parser(filepath)
+
+    def enter(self, session_key: Hashable, block_id: str):
+        """Отмечает, что сессия находится в главе с этим блоком (глава не будет выгружена)"""
+        chapter_id = self._block_index.get(block_id)
+        if chapter_id is None:
+            return
+
+        with self._lock:
+            previous = self._sessions.get(session_key)
+            self._sessions[session_key] = chapter_id
+            self.ensure_loaded(chapter_id)
+            if previous is not None and previous != chapter_id:
+                self._evict()
+
+    def leave(self, session_key: Hashable):
+        """Сессия завершилась - её глава больше не удерживается"""
+        with self._lock:
+            self._sessions.pop(session_key, None)
+            self._evict()
+
+    def _evict(self, keep: Optional[str] = None):
+        """Выгружает самые давно использованные главы, которые не нужны ни одной сессии"""
+        pinned = set(self._sessions.values())
+        if keep is not None:
+            pinned.add(keep)
+        for chapter_id in list(self._loaded):
+            if len(self._loaded) <= self._max_loaded:
+                break
+            if chapter_id in pinned:
+                continue
+            self._unload(chapter_id)
+
+    def _unload(self, chapter_id: str):
+        ids = self._loaded.pop(chapter_id)
+        manager = self._state_manager
+
+        with manager._lock:
+            for block_id in ids["text_blocks"]:
+                manager.forget_branches([manager.text_blocks.pop(block_id, None)])
+                manager.blocks.pop(block_id, None)
+            for block_id in ids["choice_blocks"]:
+                manager.choice_blocks.pop(block_id, None)
+                manager.blocks.pop(block_id, None)
+            for choice_id in ids["choices"]:
+                refs = self._choice_refs.get(choice_id, 1) - 1
+                if refs > 0:
+                    self._choice_refs[choice_id] = refs
+                else:
+                    self._choice_refs.pop(choice_id, None)
+                    manager.forget_branches([manager.choices.pop(choice_id, None)])
+
+
+def _chapter_items(chapter_dir: str, filename: str, section: tuple):
+    filepath = os.path.join(chapter_dir, filename)
+    if not os.path.exists(filepath):
+        return ()
+    return iter_object_items(filepath, section)
+
+
+def split_story(state_manager: 'GameStateManager', out_dir: str, chapter_size: int = 10) -> List[str]:
+    """Разбивает загруженный монолитный сюжет на главы по chapter_size блоков.
+
+    Блоки раскладываются в порядке обхода в ширину от стартового блока,
+    поэтому соседние по сюжету блоки попадают в одну главу.
+    """
+    story_hash = state_manager.content_hash()
+    blocks = {}
+    blocks.update(state_manager.text_blocks)
+    blocks.update(state_manager.choice_blocks)
+
+    def links(block_id: str) -> List[str]:
+        targets = []
+        if block_id in state_manager.choice_blocks:
+            for choice_id in state_manager.choice_blocks[block_id].available_choices:
+                choice = state_manager.choices.get(choice_id)
+                if choice is not None:
+                    targets.append(choice.next_block)
+        else:
+            targets.append(blocks[block_id].next_block)
+
+        result = []
+        for target in targets:
+            result.extend(link_targets(target))
+        return [t for t in result if t in blocks]
+
+    # Обход в ширину, недостижимые блоки идут в конец
+    order = []
+    seen = set()
+    queue = [config.START_BLOCK_ID] if config.START_BLOCK_ID in blocks else []
+    while queue:
+        block_id = queue.pop(0)
+        if block_id in seen:
+            continue
+        seen.add(block_id)
+        order.append(block_id)
+        queue.extend(links(block_id))
+    order.extend(block_id for block_id in blocks if block_id not in seen)
+
+    chapter_of = {}
+    chapters = []
+    for i in range(0, len(order), chapter_size):
+        chapter_id = f"chapter_{len(chapters) + 1:03d}"
+        chapters.append((chapter_id, order[i:i + chapter_size]))
+        for block_id in order[i:i + chapter_size]:
+            chapter_of[block_id] = chapter_id
+
+    entries = {chapter_id: set() for chapter_id, _ in chapters}
+    if order:
+        entries[chapter_of[order[0]]].add(order[0])
+    for block_id in order:
+        for target in links(block_id):
+            if chapter_of[target] != chapter_of[block_id]:
+                entries[chapter_of[target]].add(target)
+
+    for chapter_id, block_ids in chapters:
+        chapter_dir = os.path.join(out_dir, chapter_id)
+        os.makedirs(chapter_dir, exist_ok=True)
+
+        text_data = {}
+        choice_block_data = {}
+        choice_data = {}
+        exits = set()
+        for block_id in block_ids:
+            if block_id in state_manager.choice_blocks:
+                block = state_manager.choice_blocks[block_id]
+                choice_block_data[block_id] = block.to_dict()
+                for choice_id in block.available_choices:
+                    if choice_id in state_manager.choices:
+                        choice_data[choice_id] = state_manager.choices[choice_id].to_dict()
+            else:
+                text_data[block_id] = state_manager.text_blocks[block_id].to_dict()
+
+            for target in links(block_id):
+                if chapter_of[target] != chapter_id:
+                    exits.add(target)
+
+        manifest = {
+            "id": chapter_id,
+            "story_hash": story_hash,
+            "entry_blocks": sorted(entries[chapter_id]),
+            "exit_blocks": sorted(exits),
+            "blocks": block_ids,
+        }
+        files = {
+            MANIFEST_FILE: manifest,
+            config.NARRATIVE_FILE: text_data,
+            config.CHOICE_BLOCKS_FILE: {"choice_blocks": choice_block_data},
+            config.CHOICES_FILE: {"choices": choice_data},
+        }
+        for filename, content in files.items():
+            with open(os.path.join(chapter_dir, filename), 'w', encoding='utf-8') as f:
+                json.dump(content, f, ensure_ascii=False, indent=2)
+
+    return [chapter_id for chapter_id, _ in chapters]
+
+
+if __name__ == "__main__":
+    # python -m Game.scripts.ChapterStore [размер_главы] [папка]
+    from Game.scripts.GameStateManager import GameStateManager
+
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    target_dir = sys.argv[2] if len(sys.argv) > 2 else config.get_full_path(config.CHAPTERS_DIR)
+
+    manager = GameStateManager()
+    manager.load_choices(config.get_full_path(config.CHOICES_FILE))
+    manager.load_text_blocks(config.get_full_path(config.NARRATIVE_FILE))
+    manager.load_choice_blocks(config.get_full_path(config.CHOICE_BLOCKS_FILE))
+
+    created = split_story(manager, target_dir, size)
+    print(f"✅ Создано глав: {len(created)} в {target_dir}")
@@ -43,6 +43,7 @@ class Choice:
             "time_cost": self.time_cost,
             "condition": self.condition,
             "given_flag": self.given_flag,
+            "given_item": self.given_item,
             "next_block": self.next_block,
             "end_condition": self.end_condition,
             "end": self.end,
@@ -4,10 +4,12 @@ from Game.scripts.GameBlock import GameBlock
 
 from Game import config
 from Game.scripts.Choice import Choice
-from Game.utils.ConsoleUtils import print_slow, clear_console
+from Game.utils.ConsoleUtils import Screen
 
 
 class ChoiceBlock(GameBlock):
+    type_tag = "choice"
+
     def __init__(self,
                  block_id: str,
                  name: str,
@@ -40,20 +42,24 @@ class ChoiceBlock(GameBlock):
         # Следующий блок определяется выбором игрока
         return None
 
+    def _compose(self, engine: 'GameEngine') -> Screen:
+        """Собирает заголовок экрана с выбором"""
+        title = engine.format_text_with_variables(self._name)
+
+        screen = Screen().clear().line(engine.game_header())
+        screen.separator(config.SEP_SYMBOL, 60)
+        screen.typed(title, config.TEXT_SPEED_NORMAL)
+        screen.separator(config.SEP_SYMBOL, 60)
+        screen.line()
+        return screen
+
     def display(self, engine: 'GameEngine'):
         """Отобразить блок с выбором"""
-        clear_console()
-        engine.display_game_header()
-
-        title = engine.format_text_with_variables(self._name)
-        print_slow("=" * 60, config.TEXT_SPEED_FAST)
-        print_slow(title, config.TEXT_SPEED_NORMAL)
-        print_slow("=" * 60, config.TEXT_SPEED_FAST)
-        print_slow("", config.TEXT_SPEED_FAST)
+        self._compose(engine).show()
 
     def process(self, engine: 'GameEngine'):
         """Обработать блок с выбором"""
-        self.display(engine)
+        screen = self._compose(engine)
 
         # Доступные выборы
         available_choices = []
@@ -63,13 +69,13 @@ class ChoiceBlock(GameBlock):
                 available_choices.append(choice)
 
         if not available_choices:
-            print_slow("😔 Нет доступных вариантов...", config.TEXT_SPEED_FAST)
+            screen.line("😔 Нет доступных вариантов...").show()
             input("\n↵ Нажмите Enter чтобы продолжить...")
             return
 
         # Отображаем варианты
-        print_slow("📋 Доступные варианты:", config.TEXT_SPEED_NORMAL)
-        print_slow("-" * 40, config.TEXT_SPEED_FAST)
+        screen.line("📋 Доступные варианты:")
+        screen.separator("-", 40)
 
         for i, choice in enumerate(available_choices, 1):
             time_cost = choice.time_cost
@@ -80,10 +86,11 @@ class ChoiceBlock(GameBlock):
             else:
                 time_info = " [⚡ мгновенно]"
 
-            print_slow(f"{i}. {choice.name}{time_info}", config.TEXT_SPEED_SLOW)
+            screen.typed(f"{i}. {choice.name}{time_info}", config.TEXT_SPEED_SLOW)
 
-        print_slow("-" * 40, config.TEXT_SPEED_FAST)
-        print_slow("", config.TEXT_SPEED_FAST)
+        screen.separator("-", 40)
+        screen.line()
+        screen.show()
 
         # Получаем выбор игрока
         engine.get_player_choice(available_choices)
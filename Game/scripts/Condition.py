@@ -0,0 +1,126 @@
+# Game/scripts/Condition.py
+import ast
+import re
+from typing import Callable, FrozenSet, Optional
+
+# Строковые литералы не трогаем, время вида 17:30 заменяем на минуты
+_STRING_RE = re.compile(r'("(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\')')
+_CLOCK_RE = re.compile(r'\b(\d{1,2}):(\d{2})\b')
+
+# Имена, которые не являются флагами
+TIME_NAME = "time"
+POWER_NAME = "item_power"
+ITEM_FUNCTIONS = {"has_item": "has_item", "item_count": "count"}
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub,
+    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+    ast.Name, ast.Load, ast.Constant, ast.Call,
+)
+
+
+class ConditionError(ValueError):
+    """Условие не удалось разобрать"""
+
+
+class CompiledCondition:
+    """Условие, скомпилированное в функцию (флаги, инвентарь, время) -> bool.
+
+    Кроме самой функции хранит, от каких флагов, предметов и времени условие зависит.
+    """
+
+    __slots__ = ("source", "check", "flags", "items", "uses_time", "uses_power")
+
+    def __init__(self, source: str, check: Callable, flags: FrozenSet[str], items: FrozenSet[str],
+                 uses_time: bool, uses_power: bool):
+        self.source = source
+        self.check = check
+        self.flags = flags
+        self.items = items
+        self.uses_time = uses_time
+        self.uses_power = uses_power
+
+    def __call__(self, flags: dict, inventory=None, clock: int = 0) -> bool:
+        return bool(self.check(flags, inventory, clock))
+
+
+class _Rewriter(ast.NodeTransformer):
+    """Переписывает имена условия в обращения к аргументам функции"""
+
+    def __init__(self):
+        self.flags = set()
+        self.items = set()
+        self.uses_time = False
+        self.uses_power = False
+
+    def visit_Name(self, node: ast.Name):
+        if node.id == TIME_NAME:
+            self.uses_time = True
+            return ast.copy_location(ast.Name(id="_t", ctx=ast.Load()), node)
+        if node.id == POWER_NAME:
+            self.uses_power = True
+            return ast.copy_location(ast.parse("_inv.power", mode="eval").body, node)
+
+        # Любое другое имя - флаг игрока, отсутствующий флаг считается False
+        self.flags.add(node.id)
+        return ast.copy_location(ast.parse(f"_f.get({node.id!r}, False)", mode="eval").body, node)
+
+    def visit_Call(self, node: ast.Call):
+        if (not isinstance(node.func, ast.Name) or node.func.id not in ITEM_FUNCTIONS
+                or len(node.args) != 1 or node.keywords
+                or not isinstance(node.args[0], ast.Constant) or not isinstance(node.args[0].value, str)):
+            raise ConditionError(f"Недопустимый вызов: {ast.unparse(node)}")
+
+        item_name = node.args[0].value
+        self.items.add(item_name)
+        method = ITEM_FUNCTIONS[node.func.id]
+        return ast.copy_location(ast.parse(f"_inv.{method}({item_name!r})", mode="eval").body, node)
+
+
+def _preprocess(source: str) -> str:
+    parts = _STRING_RE.split(source)
+    for i in range(0, len(parts), 2):
+        parts[i] = _CLOCK_RE.sub(lambda m: str(int(m.group(1)) * 60 + int(m.group(2))), parts[i])
+    return "".join(parts)
+
+
+def compile_condition(source: str) -> CompiledCondition:
+    """Компилирует условие вида `eat_1 == True and has_item("Циркуль") and time < 17:30`"""
+    try:
+        tree = ast.parse(_preprocess(source.strip()), mode="eval")
+    except SyntaxError as e:
+        raise ConditionError(f"Синтаксическая ошибка в условии '{source}': {e.msg}")
+
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ConditionError(f"Недопустимая конструкция в условии '{source}': {type(node).__name__}")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (bool, int, float, str)):
+            raise ConditionError(f"Недопустимое значение в условии '{source}': {node.value!r}")
+
+    rewriter = _Rewriter()
+    body = rewriter.visit(tree).body
+    check = eval(f"lambda _f, _inv, _t: {ast.unparse(body)}", {"__builtins__": {}})
+
+    return CompiledCondition(
+        source=source,
+        check=check,
+        flags=frozenset(rewriter.flags),
+        items=frozenset(rewriter.items),
+        uses_time=rewriter.uses_time,
+        uses_power=rewriter.uses_power,
+    )
+
+
+def format_clock(minutes: int) -> str:
+    """Переводит минуты от полуночи в строку ЧЧ:ММ"""
+    return f"{(minutes // 60) % 24:02d}:{minutes % 60:02d}"
+
+
+def parse_clock(value: Optional[str]) -> Optional[int]:
+    """Переводит строку ЧЧ:ММ в минуты от полуночи"""
+    if value is None:
+        return None
+    match = _CLOCK_RE.fullmatch(str(value).strip())
+    if not match:
+        raise ConditionError(f"Неверный формат времени: {value}")
+    return int(match.group(1)) * 60 + int(match.group(2))
@@ -0,0 +1,28 @@
+# Game/scripts/EndingBlock.py
+from typing import List, Union
+
+from Game import config
+from Game.scripts.TextBlock import TextBlock
+
+
+class EndingBlock(TextBlock):
+    """Финальный текст: после него игра переходит в END_BLOCK_ID и подсчитывает концовку"""
+
+    type_tag = "ending"
+
+    def __init__(self,
+                 block_id: str,
+                 body: str,
+                 previous_block: Union[str, List[str], None] = None):
+        super().__init__(block_id, body, config.END_BLOCK_ID, previous_block)
+
+    @classmethod
+    def from_dict(cls, block_id: str, data: dict):
+        return cls(
+            block_id=block_id,
+            body=data.get("body", ""),
+            previous_block=data.get("previous_block")
+        )
+
+    def to_dict(self):
+        return {"type": self.type_tag, "body": self.body, "previous_block": self.previous_block}
@@ -5,6 +5,8 @@ from typing import List, Union
 class GameBlock(ABC):
     """Абстрактный базовый класс для ВСЕХ блоков игры"""
 
+    type_tag = ""  # Тег "type" в данных сюжета (см. BlockRegistry)
+
     @property
     @abstractmethod
     def id(self) -> str:
@@ -17,6 +19,11 @@ class GameBlock(ABC):
         """ID следующего блока (может быть строкой, списком или None)"""
         pass
 
+    @property
+    def time_cost(self) -> int:
+        """Сколько минут игрового времени тратится на блок"""
+        return 0
+
     @abstractmethod
     def display(self, engine: 'GameEngine'):
         """Отобразить блок в контексте игрового движка"""
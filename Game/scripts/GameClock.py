@@ -0,0 +1,130 @@
+# Game/scripts/GameClock.py
+import heapq
+import json
+import os
+from typing import List, Optional, Tuple
+
+from Game.scripts.Condition import format_clock, parse_clock
+
+# Действия событий мира
+SET_FLAG = "set_flag"      # Поднять флаг
+CLEAR_FLAG = "clear_flag"  # Опустить флаг
+GOTO = "goto"              # Принудительно перейти в блок
+MESSAGE = "message"        # Просто сообщение игроку
+WINDOW = "window"          # Окно: флаг поднят с "from" до "to" (раскрывается в два события)
+
+ACTIONS = (SET_FLAG, CLEAR_FLAG, GOTO, MESSAGE)
+
+
+class WorldEvent:
+    """Событие, которое наступает в заданное игровое время"""
+
+    __slots__ = ("id", "at", "action", "flag", "block", "message", "condition", "window")
+
+    def __init__(self, event_id: str, at: int, action: str, flag: Optional[str] = None,
+                 block: Optional[str] = None, message: Optional[str] = None, condition: Optional[str] = None,
+                 window: Optional[str] = None):
+        self.id = event_id
+        self.at = at
+        self.action = action
+        self.flag = flag
+        self.block = block
+        self.message = message
+        self.condition = condition
+        self.window = window  # ID окна, половиной которого является событие
+
+    def __repr__(self):
+        return f"WorldEvent({self.id!r}, {format_clock(self.at)}, {self.action!r})"
+
+
+def parse_world_events(data: dict) -> List[WorldEvent]:
+    """Разбирает описание событий ({"events": [...]}) и сортирует их по времени"""
+    events = []
+    for index, entry in enumerate(data.get("events", [])):
+        event_id = entry.get("id") or f"event_{index}"
+        action = entry.get("type", MESSAGE)
+        condition = entry.get("condition")
+
+        if action == WINDOW:
+            # Окно открывается и закрывается отдельными событиями
+            flag = entry["flag"]
+            events.append(WorldEvent(f"{event_id}:open", parse_clock(entry["from"]), SET_FLAG, flag=flag,
+                                     message=entry.get("open_message"), condition=condition, window=event_id))
+            events.append(WorldEvent(f"{event_id}:close", parse_clock(entry["to"]), CLEAR_FLAG, flag=flag,
+                                     message=entry.get("close_message"), condition=condition, window=event_id))
+            continue
+
+        if action not in ACTIONS:
+            raise ValueError(f"Неизвестный тип события '{action}' ({event_id})")
+        if action in (SET_FLAG, CLEAR_FLAG) and not entry.get("flag"):
+            raise ValueError(f"Событию {event_id} нужен флаг")
+        if action == GOTO and not entry.get("block"):
+            raise ValueError(f"Событию {event_id} нужен блок")
+
+        events.append(WorldEvent(event_id, parse_clock(entry["at"]), action, flag=entry.get("flag"),
+                                 block=entry.get("block"), message=entry.get("message"), condition=condition))
+
+    events.sort(key=lambda event: event.at)
+    return events
+
+
+def load_world_events(filepath: str) -> List[WorldEvent]:
+    """Загружает события мира из JSON файла (нет файла - нет событий)"""
+    if not os.path.exists(filepath):
+        return []
+    with open(filepath, 'r', encoding="utf-8") as file:
+        return parse_world_events(json.load(file))
+
+
+class GameClock:
+    """Очередь событий мира одной сессии.
+
+    События лежат в куче по времени: сдвиг часов снимает только наступившие события
+    (O(log n) на событие), сколько бы минут ни прошло между ними.
+    """
+
+    def __init__(self, events: List[WorldEvent], clock: int, new_game: bool = False):
+        self.clock = clock
+
+        # События, время которых уже прошло, считаются сработавшими (их флаги лежат в сохранении).
+        # У новой игры события ровно на стартовое время еще впереди - их снимет первый advance.
+        def is_past(event: WorldEvent) -> bool:
+            return event.at < clock if new_game else event.at <= clock
+
+        self._queue: List[Tuple[int, int, WorldEvent]] = [
+            (event.at, order, event) for order, event in enumerate(events) if not is_past(event)
+        ]
+        heapq.heapify(self._queue)
+        self._order = len(events)
+
+        # Окна, открытые на момент старта часов, но открывшиеся не в этой сессии (игра началась
+        # внутри окна или окно добавили в сюжет позже): их флаг надо поднять без сообщения
+        opened = {event.window: event for event in events if event.window and event.action == SET_FLAG}
+        self.open_windows: List[WorldEvent] = [
+            opened[event.window] for event in events
+            if event.window in opened and event.action == CLEAR_FLAG
+            and is_past(opened[event.window]) and not is_past(event)
+        ]
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def next_event(self) -> Optional[WorldEvent]:
+        """Ближайшее запланированное событие"""
+        return self._queue[0][2] if self._queue else None
+
+    def schedule(self, event: WorldEvent):
+        """Добавляет событие во время игры"""
+        if event.at > self.clock:
+            self._order += 1
+            heapq.heappush(self._queue, (event.at, self._order, event))
+
+    def advance(self, clock: int) -> List[WorldEvent]:
+        """Переводит часы и возвращает наступившие события по порядку"""
+        due = []
+        queue = self._queue
+        while queue and queue[0][0] <= clock:
+            due.append(heapq.heappop(queue)[2])
+        self.clock = max(self.clock, clock)
+        return due
+
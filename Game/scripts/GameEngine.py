@@ -1,94 +1,94 @@
-from typing import Optional, Union, List
+from typing import Dict, Optional, Union, List
 
 from Game import config
+from Game.scripts.Achievements import AchievementEngine
+from Game.scripts.GameClock import GameClock, GOTO, SET_FLAG, CLEAR_FLAG
 from Game.scripts.GameStateManager import GameStateManager
+from Game.scripts.StoryWatcher import StoryWatcher
 from Game.scripts.DataManager import DataManager
 from Game.scripts.Player import Player
+from Game.scripts.Scoring import evaluate_ending
+from Game.scripts import SearchIndex
 from Game.scripts.TextBlock import TextBlock
 from Game.scripts.ChoiceBlock import ChoiceBlock
 from Game.scripts.Choice import Choice
 from Game.scripts.Inventory import Inventory
 from Game.scripts.Item import Item
 from Game.utils.ConsoleUtils import *
+from Game.utils import Coverage, MemoryReport, Metrics
 from Game.scripts.GameBlock import GameBlock
 
 
 class GameEngine:
-    def __init__(self):
-        ''' Создает все возможные экземпляры классов, проверяет конфиг'''
-        self.data_manager = DataManager()
-        self.state_manager = GameStateManager()
-        self.player: Optional[Player] = None
-        self.game_running = True
-        self.selected_save_slot = 1
-        self._item_registry = {}
+    def __init__(self, state_manager: Optional[GameStateManager] = None,
+                 data_manager: Optional[DataManager] = None):
+        ''' Создает все возможные экземпляры классов, проверяет конфиг.
 
+        Сюжет (GameStateManager) и хранилище сохранений по умолчанию общие для всех
+        движков процесса - на каждую сессию создается только её собственное состояние.
+        '''
         # Проверяем конфиг
         is_valid, errors = config.validate_config()
         if not is_valid:
             print_slow("❌ Ошибки в конфигурации:", config.TEXT_SPEED_FAST)
             for error in errors:
                 print_slow(f"  - {error}", config.TEXT_SPEED_FAST)
-            time.sleep(2)
-
-        # Загрузка игровых данных
-        self.load_game_data()
-
-    def load_game_data(self):
-        """Загружает данные игры из JSON файлов, а потом инициализирует предметы"""
-        # Проверяем и создаем директорию, если нужно
-        if not os.path.exists(config.DATA_DIR):
-            os.makedirs(config.DATA_DIR)
-            print_slow(f"📁 Создана директория: {config.DATA_DIR}", config.TEXT_SPEED_FAST)
+            pause(2)
 
-        # Пытаемся загрузить файлы
-        try:
-            choices_path = os.path.join(config.DATA_DIR, config.CHOICES_FILE)
-            text_blocks_path = os.path.join(config.DATA_DIR, config.NARRATIVE_FILE)
-            choice_blocks_path = os.path.join(config.DATA_DIR, config.CHOICE_BLOCKS_FILE)
-
-            if os.path.exists(choices_path):
-                self.state_manager.load_choices(choices_path)
-            else:
-                print_slow(f"⚠️  Файл не найден: {choices_path}", config.TEXT_SPEED_FAST)
+        # Трассировку памяти включаем до загрузки сюжета, чтобы он попал в снимки
+        if config.MEMORY_TRACE_ENABLED:
+            MemoryReport.start_tracing()
 
-            if os.path.exists(text_blocks_path):
-                self.state_manager.load_text_blocks(text_blocks_path)
-            else:
-                print_slow(f"⚠️  Файл не найден: {text_blocks_path}", config.TEXT_SPEED_FAST)
+        # Общие для всех сессий данные (загружаются один раз на процесс)
+        self.data_manager = data_manager or DataManager.shared()
+        self.state_manager = state_manager or GameStateManager.shared()
+        self.achievements = AchievementEngine.shared()
 
-            if os.path.exists(choice_blocks_path):
-                self.state_manager.load_choice_blocks(choice_blocks_path)
-            else:
-                print_slow(f"⚠️  Файл не найден: {choice_blocks_path}", config.TEXT_SPEED_FAST)
+        # Состояние конкретной сессии
+        self.player: Optional[Player] = None
+        self.game_running = True
+        self.selected_save_slot = 1
+        self._header_cache = None
+        self._story_revision = self.state_manager.revision
+        self.clock: Optional[GameClock] = None
+        self._forced_block_id: Optional[str] = None  # Переход, назначенный событием мира
+        self._memory_snapshot = None  # Снимок памяти прошлого вызова команды "память"
+
+        # Следим за файлами сюжета, чтобы правки подхватывались на лету
+        if config.HOT_RELOAD_ENABLED:
+            self.state_manager.start_watcher()
+
+        # Локальный эндпоинт с метриками (занятый порт не должен мешать игре)
+        if Metrics.REGISTRY.enabled:
+            try:
+                Metrics.REGISTRY.start_http_server()
+            except OSError as e:
+                print_slow(f"⚠️  Эндпоинт метрик не запущен ({config.METRICS_HOST}:{config.METRICS_PORT}): {e}",
+                           config.TEXT_SPEED_FAST)
 
-            # Инициализация предметов
-            self._initialize_item_registry()
+        # Счетчики покрытия сюжета (файл пишется при выходе из процесса)
+        if Coverage.COLLECTOR.enabled:
+            Coverage.COLLECTOR.bind(self.state_manager)
 
-        except Exception as e:
-            print_slow(f"❌ Ошибка загрузки данных: {e}", config.TEXT_SPEED_FAST)
+    @property
+    def story_watcher(self) -> Optional[StoryWatcher]:
+        return self.state_manager.watcher
 
-    def _initialize_item_registry(self):
-        """Инициализирует реестр предметов"""
-        for item_name, item_data in config.ITEM_REGISTRY.items():
-            item = Item(
-                name=item_data["name"],
-                description=item_data["description"],
-                power=item_data.get("power", 0)
-            )
-            self._item_registry[item_name] = item
+    @property
+    def _item_registry(self) -> Dict[str, Item]:
+        return self.state_manager.item_registry
 
-        # Для отладки - выводим загруженные предметы
-        if config.DEV_MOD:
-            print_slow(f"✅ Загружено предметов: {len(self._item_registry)}", config.TEXT_SPEED_FAST)
+    def load_game_data(self):
+        """Загружает данные игры из JSON файлов, а потом инициализирует предметы"""
+        self.state_manager.load_story()
 
     def display_saves_menu(self):
         """Отображает меню сохранений"""
         clear_console()
         print_game_name()
-        print_slow(config.SEP_SYMBOL * 50, config.TEXT_SPEED_FAST)
+        print_separator(config.SEP_SYMBOL, 50)
         print_slow("🎮 ВЫБЕРИТЕ СОХРАНЕНИЕ", config.TEXT_SPEED_FAST)
-        print_slow(config.SEP_SYMBOL * 50, config.TEXT_SPEED_FAST)
+        print_separator(config.SEP_SYMBOL, 50)
 
         players_data = []
         max_slots = config.MAX_PLAYER_SLOTS
@@ -115,7 +115,7 @@ class GameEngine:
 
         print_slow(f"{max_slots + 1}. 🗑️  Удалить сохранение", config.TEXT_SPEED_FAST)
         print_slow(f"{max_slots + 2}. ❌ Выход", config.TEXT_SPEED_FAST)
-        print_slow(config.SEP_SYMBOL * 50, config.TEXT_SPEED_FAST)
+        print_separator(config.SEP_SYMBOL, 50)
 
         return players_data, max_slots
 
@@ -129,7 +129,7 @@ class GameEngine:
 
                 if not choice.isdigit():
                     print_slow("⚠️  Пожалуйста, введите число", config.TEXT_SPEED_FAST)
-                    time.sleep(1)
+                    pause(1)
                     continue
 
                 choice_num = int(choice)
@@ -137,7 +137,7 @@ class GameEngine:
                 # Выход из игры
                 if choice_num == max_slots + 2:
                     print_slow("\n👋 До свидания!", config.TEXT_SPEED_FAST)
-                    time.sleep(1)
+                    pause(1)
                     exit()
 
                 # Удаление сохранения
@@ -159,17 +159,18 @@ class GameEngine:
 
                 else:
                     print_slow("⚠️  Неверный выбор", config.TEXT_SPEED_FAST)
-                    time.sleep(1)
+                    pause(1)
 
             except (ValueError, IndexError):
                 print_slow("⚠️  Ошибка ввода", config.TEXT_SPEED_FAST)
-                time.sleep(1)
+                pause(1)
 
     def load_existing_player(self, player: Player) -> Player:
         """Загрузка существующего игрока"""
-        print_slow("\n" + config.SEP_SYMBOL * 50, config.TEXT_SPEED_FAST)
+        print()
+        print_separator(config.SEP_SYMBOL, 50)
         print_slow(f"✅ ЗАГРУЗКА ИГРОКА", config.TEXT_SPEED_FAST)
-        print_slow(config.SEP_SYMBOL * 50, config.TEXT_SPEED_FAST)
+        print_separator(config.SEP_SYMBOL, 50)
 
         # Форматируем время
         total_minutes = player._time_left
@@ -187,17 +188,18 @@ class GameEngine:
         if active_flags:
             print_slow(f"🚩 Активные флаги: {', '.join(active_flags)}", config.TEXT_SPEED_FAST)
 
-        print_slow(config.SEP_SYMBOL * 50, config.TEXT_SPEED_FAST)
+        print_separator(config.SEP_SYMBOL, 50)
         print_slow("\nЗагрузка завершена...", config.TEXT_SPEED_NORMAL)
-        time.sleep(2)
+        pause(2)
 
         return player
 
     def create_new_player(self, slot_num: int) -> Player:
         """Создание нового игрока"""
-        print_slow("\n" + config.SEP_SYMBOL * 50, config.TEXT_SPEED_FAST)
+        print()
+        print_separator(config.SEP_SYMBOL, 50)
         print_slow("🎮 СОЗДАНИЕ НОВОГО ПЕРСОНАЖА", config.TEXT_SPEED_FAST)
-        print_slow(config.SEP_SYMBOL * 50, config.TEXT_SPEED_FAST)
+        print_separator(config.SEP_SYMBOL, 50)
 
         while True:
             name = input("\nВведите имя персонажа: ").strip()
@@ -206,7 +208,7 @@ class GameEngine:
             print_slow("⚠️  Имя не может быть пустым", config.TEXT_SPEED_FAST)
 
         print_slow("\n⏳ Создание персонажа...", config.TEXT_SPEED_NORMAL)
-        time.sleep(1)
+        pause(1)
 
         # Создаем начальные объекты из конфига
         inventory_items = []
@@ -228,11 +230,13 @@ class GameEngine:
         )
 
         # Сохраняем
+        player.story_hash = self.state_manager.content_hash()
         self.data_manager.save_data(player.to_dict(), slot_num)
 
-        print_slow("\n" + config.SEP_SYMBOL * 50, config.TEXT_SPEED_FAST)
+        print()
+        print_separator(config.SEP_SYMBOL, 50)
         print_slow(f"✅ ПЕРСОНАЖ СОЗДАН!", config.TEXT_SPEED_FAST)
-        print_slow(config.SEP_SYMBOL * 50, config.TEXT_SPEED_FAST)
+        print_separator(config.SEP_SYMBOL, 50)
 
         # Форматируем время для отображения
         hours = config.START_TIME // 60
@@ -241,11 +245,11 @@ class GameEngine:
 
         print_slow(f"👤 Имя: {player.name}", config.TEXT_SPEED_FAST)
         print_slow(f"🕒 Начальное время: {time_str}", config.TEXT_SPEED_FAST)
-        print_slow(f"🎒 Инвентарь: {len(player._inventory._items)} предметов", config.TEXT_SPEED_FAST)
-        print_slow(config.SEP_SYMBOL * 50, config.TEXT_SPEED_FAST)
+        print_slow(f"🎒 Инвентарь: {len(player._inventory)} предметов", config.TEXT_SPEED_FAST)
+        print_separator(config.SEP_SYMBOL, 50)
 
         print_slow("\n⏳ Начинаем игру...", config.TEXT_SPEED_NORMAL)
-        time.sleep(2)
+        pause(2)
 
         return player
 
@@ -254,9 +258,9 @@ class GameEngine:
         while True:
             clear_console()
             print_game_name()
-            print_slow(config.SEP_SYMBOL * 50, config.TEXT_SPEED_FAST)
+            print_separator(config.SEP_SYMBOL, 50)
             print_slow("🗑️  УДАЛЕНИЕ СОХРАНЕНИЙ", config.TEXT_SPEED_FAST)
-            print_slow(config.SEP_SYMBOL * 50, config.TEXT_SPEED_FAST)
+            print_separator(config.SEP_SYMBOL, 50)
 
             players_data = []
             for slot_num in range(1, config.MAX_PLAYER_SLOTS + 1):
@@ -269,14 +273,14 @@ class GameEngine:
                     print_slow(f"{slot_num}. 📭 Пустой слот", config.TEXT_SPEED_FAST)
 
             print_slow(f"{config.MAX_PLAYER_SLOTS + 1}. ↩️  Назад", config.TEXT_SPEED_FAST)
-            print_slow(config.SEP_SYMBOL * 50, config.TEXT_SPEED_FAST)
+            print_separator(config.SEP_SYMBOL, 50)
 
             try:
                 choice = input(f"\nВыберите слот для удаления (1-{config.MAX_PLAYER_SLOTS + 1}): ")
 
                 if not choice.isdigit():
                     print_slow("⚠️  Пожалуйста, введите число", config.TEXT_SPEED_FAST)
-                    time.sleep(1)
+                    pause(1)
                     continue
 
                 choice_num = int(choice)
@@ -291,7 +295,7 @@ class GameEngine:
 
                     if player is None:
                         print_slow("⚠️  Этот слот и так пустой!", config.TEXT_SPEED_FAST)
-                        time.sleep(1)
+                        pause(1)
                         continue
 
                     print_slow(f"\n⚠️  ВЫ УДАЛЯЕТЕ СОХРАНЕНИЕ:", config.TEXT_SPEED_FAST)
@@ -304,153 +308,123 @@ class GameEngine:
                     if confirm == 'y':
                         self.data_manager.save_data(None, choice_num)
                         print_slow("\n✅ Сохранение удалено!", config.TEXT_SPEED_FAST)
-                        time.sleep(1)
+                        pause(1)
                         return
                     else:
                         print_slow("\n❌ Удаление отменено", config.TEXT_SPEED_FAST)
-                        time.sleep(1)
+                        pause(1)
                         continue
 
                 else:
                     print_slow("⚠️  Неверный выбор", config.TEXT_SPEED_FAST)
-                    time.sleep(1)
+                    pause(1)
 
             except (ValueError, IndexError):
                 print_slow("⚠️  Ошибка ввода", config.TEXT_SPEED_FAST)
-                time.sleep(1)
+                pause(1)
 
     def start_game(self):
         """Основной метод запуска игры"""
         # Меняем имя консоли
-        os.system(f'title {config.GAME_NAME}')
+        set_console_title(config.GAME_NAME)
 
         clear_console()
         print_game_name()
-        print_slow(config.SEP_SYMBOL * 60, config.TEXT_SPEED_FAST)
+        print_separator(config.SEP_SYMBOL, 60)
         print_slow("📖 ИСТОРИЯ ОДНОГО СТУДЕНТА МАИ", config.TEXT_SPEED_NORMAL)
-        print_slow(config.SEP_SYMBOL * 60, config.TEXT_SPEED_FAST)
+        print_separator(config.SEP_SYMBOL, 60)
 
         intro_text = config.INTRO_TEXT
 
         print_slow(intro_text, config.TEXT_SPEED_NORMAL)
-        print_slow(config.SEP_SYMBOL * 60, config.TEXT_SPEED_FAST)
+        print_separator(config.SEP_SYMBOL, 60)
         print_slow("\n💡 Подсказка: во время игры можно использовать команды:", config.TEXT_SPEED_FAST)
         print_slow("   'инв' - просмотреть инвентарь", config.TEXT_SPEED_FAST)
         print_slow("   'сохр' - сохранить игру", config.TEXT_SPEED_FAST)
         print_slow("   'выход' - выйти из игры", config.TEXT_SPEED_FAST)
-        print_slow(config.SEP_SYMBOL * 60, config.TEXT_SPEED_FAST)
+        print_separator(config.SEP_SYMBOL, 60)
 
         input("\n🎮 Нажмите Enter чтобы начать...")
 
         # Авторизация
         self.player = self.start_auth()
+        # Старые сохранения не хранят достижения - восстанавливаем их по состоянию игрока
+        self.achievements.check_all(self.player)
+        # Очередь событий мира начинается с текущего времени игрока
+        new_game = not self.player.choices_history and self.player.current_time == config.START_TIME
+        self.clock = GameClock(self.state_manager.world_events, self.player.current_time, new_game)
+        self.restore_world_state()
 
         # Основной игровой цикл
         self.game_loop()
 
     def game_loop(self):
         """Основной игровой цикл"""
-        while self.game_running and self.player:
-            # Проверяем время
-            if self.player._time_left <= 0:
-                self.game_over("⏰ Время вышло! Ты не успел на зачет...")
-                return
+        Metrics.ACTIVE_SESSIONS.inc()
+        try:
+            while self.game_running and self.player:
+                # Подхватываем перезагруженный сюжет
+                if self.state_manager.revision != self._story_revision:
+                    self.apply_story_reload()
+
+                # Проверяем время
+                if self.player._time_left <= 0:
+                    self.game_over("⏰ Время вышло! Ты не успел на зачет...")
+                    return
 
-            # Проверяем, не достигли ли мы блока конца игры
-            if self.player.current_block_id == "block_end":
-                self.end_game()
-                return
+                # Проверяем, не достигли ли мы блока конца игры
+                if self.player.current_block_id == config.END_BLOCK_ID:
+                    self.end_game()
+                    return
 
-            # Получаем текущий блок (может быть TextBlock или ChoiceBlock)
-            current_block = self.state_manager.get_block(self.player.current_block_id)
+                # Держим в памяти главу, в которой находится игрок
+                if self.state_manager.chapter_store is not None:
+                    self.state_manager.chapter_store.enter(id(self), self.player.current_block_id)
 
-            if current_block is None:
-                print_slow(f"❌ Ошибка: блок '{self.player.current_block_id}' не найден!", config.TEXT_SPEED_FAST)
-                self.game_over("Техническая ошибка")
-                return
+                # Получаем текущий блок (может быть TextBlock или ChoiceBlock)
+                current_block = self.state_manager.get_block(self.player.current_block_id)
 
-            # Пример использования полиморфизма.
-            current_block.process(self)
+                if current_block is None:
+                    print_slow(f"❌ Ошибка: блок '{self.player.current_block_id}' не найден!", config.TEXT_SPEED_FAST)
+                    self.game_over("Техническая ошибка")
+                    return
 
-    def process_text_block(self, block: TextBlock):
-        """Обработка текстового блока"""
-        # Проверяем условия
-        if block.conditions and not self.state_manager.evaluate_condition(block.conditions, self.player.flags):
-            print_slow("⏩ Пропускаем блок...", config.TEXT_SPEED_FAST)
-            self.go_to_next_block(block)
+                # Пример использования полиморфизма.
+                Metrics.BLOCKS_PROCESSED.inc(label_value=type(current_block).__name__)
+                if Coverage.COLLECTOR.enabled:
+                    Coverage.COLLECTOR.hit_block(current_block.id)
+                current_block.process(self)
+        finally:
+            Metrics.ACTIVE_SESSIONS.dec()
+            # Отпускаем главу, чтобы её можно было выгрузить
+            if self.state_manager.chapter_store is not None:
+                self.state_manager.chapter_store.leave(id(self))
+
+    def apply_story_reload(self):
+        """Переносит игрока на существующий блок после горячей перезагрузки сюжета"""
+        self._story_revision = self.state_manager.revision
+
+        old_block_id = self.player.current_block_id
+        if old_block_id == config.END_BLOCK_ID:
             return
 
-        # Выводим текст
-        clear_console()
-
-        # Проверяем, нужно ли скрывать время
-        hide_time = block.id in config.HIDE_TIME_BLOCKS
-        self.display_game_header(hide_time)
-
-        text = block.body
-        text = self.format_text_with_variables(text)
-
-        print_slow(config.SEP_SYMBOL * 60, config.TEXT_SPEED_FAST)
-
-        # Выводим по абзацам
-        paragraphs = text.split('\n')
-        for paragraph in paragraphs:
-            if paragraph.strip():
-                print_slow(paragraph, config.TEXT_SPEED_NORMAL)
-            else:
-                print()
-
-        print_slow(config.SEP_SYMBOL * 60, config.TEXT_SPEED_FAST)
+        new_block_id = self.state_manager.relocate_block_id(old_block_id)
+        if new_block_id != old_block_id:
+            self.player.current_block_id = new_block_id
+            self.save_game()
 
-        input("\n↵ Нажмите Enter чтобы продолжить...")
+        if config.DEV_MOD:
+            print_slow(f"🔄 Сюжет обновлен (ревизия {self._story_revision})", config.TEXT_SPEED_FAST)
+            if new_block_id != old_block_id:
+                print_slow(f"   Блок '{old_block_id}' удален, переходим в '{new_block_id}'", config.TEXT_SPEED_FAST)
 
-        # Переход к следующему блоку
-        self.go_to_next_block(block)
+    def process_text_block(self, block: TextBlock):
+        """Обработка текстового блока"""
+        block.process(self)
 
     def process_choice_block(self, block: ChoiceBlock):
         """Обработка блока с выбором"""
-        clear_console()
-        self.display_game_header()
-
-        # Заголовок блока
-        title = self.format_text_with_variables(block.name)
-        print_slow(config.SEP_SYMBOL * 60, config.TEXT_SPEED_FAST)
-        print_slow(title, config.TEXT_SPEED_NORMAL)
-        print_slow(config.SEP_SYMBOL * 60, config.TEXT_SPEED_FAST)
-        print_slow("", config.TEXT_SPEED_FAST)
-
-        # Доступные выборы
-        available_choices = []
-        for choice_id in block.available_choices:
-            choice = self.state_manager.get_choice(choice_id)
-            if choice and self.is_choice_available(choice):
-                available_choices.append(choice)
-
-        if not available_choices:
-            print_slow("😔 Нет доступных вариантов...", config.TEXT_SPEED_FAST)
-            input("\n↵ Нажмите Enter чтобы продолжить...")
-            return
-
-        # Отображаем варианты
-        print_slow("📋 Доступные варианты:", config.TEXT_SPEED_NORMAL)
-        print_slow("-" * 40, config.TEXT_SPEED_FAST)
-
-        for i, choice in enumerate(available_choices, 1):
-            time_cost = choice.time_cost
-            if isinstance(time_cost, int):
-                time_info = f" [⏰ {time_cost} мин]"
-            elif isinstance(time_cost, str):
-                time_info = " [⏰ ??? мин]"
-            else:
-                time_info = " [⚡ мгновенно]"
-
-            print_slow(f"{i}. {choice.name}{time_info}", config.TEXT_SPEED_SLOW)
-
-        print_slow("-" * 40, config.TEXT_SPEED_FAST)
-        print_slow("", config.TEXT_SPEED_FAST)
-
-        # Получаем выбор
-        self.get_player_choice(available_choices)
+        block.process(self)
 
     def get_player_choice(self, available_choices: List[Choice]):
         """Получение выбора от игрока"""
@@ -483,47 +457,67 @@ class GameEngine:
             self.exit_game()
         elif command == "инв":
             self.show_inventory()
+        elif command == "память":
+            self.show_memory_report()
+        elif command == "поиск":
+            self.search_story()
+
+    def search_story(self):
+        """Ищет фразу, имя или флаг по тексту сюжета"""
+        query = input("🔎 Что искать (слово* - по началу, \"фраза\" - подряд): ")
+        hits = self.state_manager.search_index().search(query)
+
+        print_separator(config.SEP_SYMBOL, 60)
+        for line in SearchIndex.format_hits(hits):
+            print_slow(line, config.TEXT_SPEED_FAST)
+        print_slow(f"Найдено: {len(hits)}", config.TEXT_SPEED_FAST)
+        print_separator(config.SEP_SYMBOL, 60)
+
+    def show_memory_report(self):
+        """Отчет о памяти по подсистемам и разница с прошлым вызовом"""
+        players = [self.player] if self.player else []
+        report, self._memory_snapshot = MemoryReport.collect(
+            self.state_manager, self.data_manager, players, previous=self._memory_snapshot)
+
+        print_separator(config.SEP_SYMBOL, 60)
+        print_slow("🧠 ПАМЯТЬ", config.TEXT_SPEED_NORMAL)
+        print_separator(config.SEP_SYMBOL, 60)
+        for line in MemoryReport.format_report(report):
+            print_slow(line, config.TEXT_SPEED_FAST)
+        print_separator(config.SEP_SYMBOL, 60)
 
     def show_inventory(self):
         """Показывает только инвентарь"""
-        print_slow(config.SEP_SYMBOL * 60, config.TEXT_SPEED_FAST)
+        print_separator(config.SEP_SYMBOL, 60)
         print_slow("🎒 ИНВЕНТАРЬ", config.TEXT_SPEED_NORMAL)
-        print_slow(config.SEP_SYMBOL * 60, config.TEXT_SPEED_FAST)
-
-        items = self.player._inventory.get_items()
-        if items:
-            print_slow(f"Предметов: {len(items)}", config.TEXT_SPEED_FAST)
-            print_slow("-" * 40, config.TEXT_SPEED_FAST)
-            for i, item in enumerate(items, 1):
+        print_separator(config.SEP_SYMBOL, 60)
+
+        inventory = self.player._inventory
+        stacks = inventory.get_stacks()
+        if stacks:
+            print_slow(f"Предметов: {len(inventory)} | ⚡ Общая сила: {inventory.power}", config.TEXT_SPEED_FAST)
+            print_separator("-", 40)
+            for i, (item, count) in enumerate(stacks, 1):
                 power_info = f" [⚡ {item.power}]" if item.power > 0 else ""
-                print_slow(f"{i}. {item.name}{power_info}", config.TEXT_SPEED_FAST)
+                count_info = f" x{count}" if count > 1 else ""
+                print_slow(f"{i}. {item.name}{count_info}{power_info}", config.TEXT_SPEED_FAST)
                 print_slow(f"   {item.description}", config.TEXT_SPEED_SLOW)
         else:
             print_slow("Инвентарь пуст", config.TEXT_SPEED_FAST)
 
-        print_slow(config.SEP_SYMBOL * 60, config.TEXT_SPEED_FAST)
+        print_separator(config.SEP_SYMBOL, 60)
         input("\n↵ Нажмите Enter чтобы вернуться...")
 
     def process_choice(self, choice: Choice):
         """Обработка выбранного варианта"""
-        clear_console()
-        self.display_game_header()
-
-        print_slow("✏️" * 30, config.TEXT_SPEED_FAST)
-        print_slow("", config.TEXT_SPEED_FAST)
-
         # Описание выбора
         description = self.format_text_with_variables(choice.description)
-        paragraphs = description.split('\n')
-
-        for paragraph in paragraphs:
-            if paragraph.strip():
-                print_slow(paragraph, config.TEXT_SPEED_NORMAL)
-            else:
-                print()
 
-        print_slow("", config.TEXT_SPEED_FAST)
-        print_slow("✏️" * 30, config.TEXT_SPEED_FAST)
+        screen = Screen().clear().line(self.game_header())
+        screen.separator("✏️", 30).line()
+        screen.paragraphs(description, config.TEXT_SPEED_NORMAL)
+        screen.line().separator("✏️", 30)
+        screen.show()
 
         # Обновляем игрока
         self.update_player_from_choice(choice)
@@ -534,13 +528,11 @@ class GameEngine:
 
         input("\n↵ Нажмите Enter чтобы продолжить...")
 
-        # Переход к следующему блоку
-        if choice.next_block:
-            if isinstance(choice.next_block, list):
-                next_block_id = choice.next_block[0]
-            else:
-                next_block_id = choice.next_block
+        # Переход к следующему блоку (событие мира перебивает обычный переход)
+        next_block_id = self._forced_block_id or self.resolve_next_block(choice.next_block, f"choice:{choice.id}")
+        self._forced_block_id = None
 
+        if next_block_id:
             self.player.current_block_id = next_block_id
             self.save_game()
         else:
@@ -548,32 +540,71 @@ class GameEngine:
 
     def update_player_from_choice(self, choice: Choice):
         """Обновляет данные игрока после выбора"""
+        if Coverage.COLLECTOR.enabled:
+            Coverage.COLLECTOR.hit_choice(choice.id)
+
         # История
         self.player.add_choice_to_history(choice.id)
 
         # Флаги
         if choice.given_flag:
             self.player.set_flag(choice.given_flag)
-            # Используем достижения из конфига
-            achievement_name = config.ACHIEVEMENTS.get(choice.given_flag, choice.given_flag)
-            print_slow(f"🎯 Получено достижение: {achievement_name}", config.TEXT_SPEED_FAST)
+            self.announce_achievements(flags=[choice.given_flag])
 
         # Предметы
-        if choice.given_item:
-            self.give_item_to_player(choice.given_item)
+        if choice.given_item and self.give_item_to_player(choice.given_item):
+            self.announce_achievements(items=[item.name for item in self._resolve_items(choice.given_item)])
 
         # Время
         if isinstance(choice.time_cost, int):
-            self.player.update_time(choice.time_cost)
-            print_slow(f"⏰ Потрачено времени: {choice.time_cost} минут", config.TEXT_SPEED_FAST)
+            self.spend_time(choice.time_cost)
+
+    def spend_time(self, minutes: int):
+        """Тратит игровое время и запускает наступившие события мира"""
+        self.player.update_time(minutes)
+        print_slow(f"⏰ Потрачено времени: {minutes} минут", config.TEXT_SPEED_FAST)
+        if minutes:
+            self.advance_clock()
+            self.announce_achievements(time_changed=True)
+
+    def restore_world_state(self):
+        """Поднимает флаги окон, открытых на момент загрузки, и запускает события стартового времени"""
+        for event in self.clock.open_windows:
+            if not event.condition or self.state_manager.check_condition(event.condition, self.player):
+                self.player.set_flag(event.flag)
+        self.advance_clock()
+
+    def advance_clock(self):
+        """Запускает события мира, наступившие к текущему игровому времени"""
+        if self.clock is None:
+            return
+
+        for event in self.clock.advance(self.player.current_time):
+            if event.condition and not self.state_manager.check_condition(event.condition, self.player):
+                continue
+
+            if event.message:
+                print_slow(f"🕰️  {event.message}", config.TEXT_SPEED_FAST)
+
+            if event.action in (SET_FLAG, CLEAR_FLAG):
+                self.player.set_flag(event.flag, event.action == SET_FLAG)
+                self.announce_achievements(flags=[event.flag])
+            elif event.action == GOTO:
+                self._forced_block_id = event.block
+
+    def announce_achievements(self, flags=(), items=(), time_changed=False):
+        """Перепроверяет достижения, зависящие от изменений, и сообщает об открытых"""
+        for rule in self.achievements.on_change(self.player, flags, items, time_changed):
+            print_slow(f"🎯 Получено достижение: {rule.name}", config.TEXT_SPEED_FAST)
 
     def check_end_conditions(self, choice: Choice) -> bool:
         """Проверяет условия завершения игры"""
-        if choice.end_condition and self.state_manager.evaluate_condition(choice.end_condition, self.player.flags):
+        if choice.end_condition and self.state_manager.check_condition(choice.end_condition, self.player):
             if choice.end_description:
-                print_slow("\n" + "!" * 60, config.TEXT_SPEED_FAST)
+                print()
+                print_separator("!", 60)
                 print_slow("💀 КОНЕЦ ИГРЫ 💀", config.TEXT_SPEED_NORMAL)
-                print_slow("!" * 60, config.TEXT_SPEED_FAST)
+                print_separator("!", 60)
                 print_slow("", config.TEXT_SPEED_FAST)
                 print_slow(choice.end_description, config.TEXT_SPEED_NORMAL)
                 input("\n↵ Нажмите Enter чтобы продолжить...")
@@ -582,48 +613,58 @@ class GameEngine:
         return False
 
     def go_to_next_block(self, current_block: GameBlock):
-        """Переход к следующему блоку"""
-        next_block = current_block.next_block
+        """Переход к следующему блоку (событие мира перебивает обычный переход)"""
+        next_block_id = self._forced_block_id or self.resolve_next_block(
+            current_block.next_block, f"block:{current_block.id}")
+        self._forced_block_id = None
 
-        if not next_block:
+        if not next_block_id:
             self.game_over("История подошла к концу!")
             return
 
-        if isinstance(next_block, list):
-            self.player.current_block_id = next_block[0]
-        else:
-            self.player.current_block_id = next_block
-
+        self.player.current_block_id = next_block_id
         self.save_game()
 
-    def give_item_to_player(self, item_name: Union[str, List[str]]):
-        """Добавляет предмет(ы) в инвентарь игрока"""
-        items_to_add = []
+    def resolve_next_block(self, next_block, owner: str) -> Optional[str]:
+        """Выбирает ветку next_block; случайные ветки зависят только от игрока и места, поэтому воспроизводимы"""
+        seed = f"{self.player.name}|{owner}|{len(self.player.choices_history)}"
+        return self.state_manager.resolve_next_block(
+            next_block, self.player.flags, self.player.inventory, self.player.current_time, seed)
 
-        # Преобразуем входные данные в список
+    def _resolve_items(self, item_name: Union[str, List[str]]) -> List[Item]:
+        """Находит предметы по ID в реестре (неизвестные создаются как базовые)"""
         if isinstance(item_name, str):
             items_to_add = [item_name]
-        elif isinstance(item_name, list):
-            items_to_add = [item for item in item_name if isinstance(item, str)]
         else:
-            print_slow(f"⚠️  Неверный тип предмета: {type(item_name)}", config.TEXT_SPEED_FAST)
-            return False
+            items_to_add = [item for item in item_name if isinstance(item, str)]
 
-        # Добавляем все предметы
-        success_count = 0
+        items = []
         for item_id in items_to_add:
             if not item_id or item_id.strip() == "":
                 continue
 
             if item_id in self._item_registry:
-                item = self._item_registry[item_id]
-                self.player._inventory.add_item(item)
-                success_count += 1
+                items.append(self._item_registry[item_id])
             else:
                 # Создаем базовый предмет
-                item = Item(name=item_id, description=f"Полученный предмет: {item_id}")
-                self.player._inventory.add_item(item)
-                success_count += 1
+                items.append(Item(name=item_id, description=f"Полученный предмет: {item_id}"))
+        return items
+
+    def give_item_to_player(self, item_name: Union[str, List[str]]):
+        """Добавляет предмет(ы) в инвентарь игрока"""
+        # Преобразуем входные данные в список
+        if isinstance(item_name, str):
+            items_to_add = [item_name]
+        elif isinstance(item_name, list):
+            items_to_add = [item for item in item_name if isinstance(item, str)]
+        else:
+            print_slow(f"⚠️  Неверный тип предмета: {type(item_name)}", config.TEXT_SPEED_FAST)
+            return False
+
+        # Собираем предметы и добавляем их одним вызовом
+        items = self._resolve_items(items_to_add)
+        self.player._inventory.add_items(items)
+        success_count = len(items)
 
         # Выводим сообщение о полученных предметах
         if success_count > 0:
@@ -639,7 +680,7 @@ class GameEngine:
     def is_choice_available(self, choice: Choice) -> bool:
         """Проверяет доступность выбора"""
         if choice.condition:
-            return self.state_manager.evaluate_condition(choice.condition, self.player.flags)
+            return self.state_manager.check_condition(choice.condition, self.player)
         return True
 
     def format_text_with_variables(self, text: str) -> str:
@@ -657,11 +698,15 @@ class GameEngine:
 
         return text
 
-    def display_game_header(self, hide_time=False):
-        """Отображает заголовок игры с информацией"""
+    def game_header(self, hide_time=False) -> str:
+        """Возвращает заголовок игры с информацией (кэшируется, пока не изменилось время)"""
         if not config.SHOW_TIMER:
             hide_time = True
 
+        key = (self.player.name, self.player._time_left, hide_time)
+        if self._header_cache is not None and self._header_cache[0] == key:
+            return self._header_cache[1]
+
         minutes_passed = config.START_TIME - self.player._time_left
         current_total_minutes = config.START_TIME + minutes_passed
         minutes_left = config.DEADLINE_TIME - current_total_minutes
@@ -672,72 +717,42 @@ class GameEngine:
             deadline_str = "Ты опаздываешь!!!"
 
         if hide_time:
-            print_slow(
-                f"👤 {self.player.name} | 🕒 ??? | ⏳ До зачета: ???",
-                config.TEXT_SPEED_FAST)
+            header = f"👤 {self.player.name} | 🕒 ??? | ⏳ До зачета: ???"
         else:
             current_time = self.format_text_with_variables('{time}')
-            print_slow(f"👤 {self.player.name} | 🕒 {current_time} | ⏳ До зачета: {deadline_str}", config.TEXT_SPEED_FAST)
-        print_slow("-" * 60, config.TEXT_SPEED_FAST)
+            header = f"👤 {self.player.name} | 🕒 {current_time} | ⏳ До зачета: {deadline_str}"
+        header += "\n" + separator("-", 60)
+
+        self._header_cache = (key, header)
+        return header
+
+    def display_game_header(self, hide_time=False):
+        """Отображает заголовок игры с информацией"""
+        Screen().line(self.game_header(hide_time)).show()
 
     def save_game(self):
         """Сохраняет игру"""
+        started = Metrics.start_timer()
+        self.player.story_hash = self.state_manager.content_hash()
         self.data_manager.save_data(self.player.to_dict(), self.selected_save_slot)
+        Metrics.SAVE_LATENCY.observe_since(started)
         print_slow("💾 Игра сохранена!", config.TEXT_SPEED_FAST)
-        time.sleep(0.5)
+        pause(0.5)
 
     def exit_game(self):
         """Выход из игры"""
         print_slow("\n💾 Сохраняем игру...", config.TEXT_SPEED_FAST)
         self.save_game()
         print_slow("👋 До свидания!", config.TEXT_SPEED_FAST)
-        time.sleep(1)
+        pause(1)
         self.game_running = False
 
     def end_game(self):
         """Завершение игры с подсчетом очков и выводом концовки"""
         clear_console()
 
-        # Рассчитываем время прибытия
-        minutes_passed = config.START_TIME - self.player._time_left
-        arrival_time = config.START_TIME + minutes_passed
-
-        # Проверяем, опоздал ли игрок
-        is_late = arrival_time > config.DEADLINE_TIME
-
-        # Проверяем, ел ли игрок
-        ate_something = any([
-            self.player.flags.get("eat_1", False),
-            self.player.flags.get("eat_2", False),
-            self.player.flags.get("eat_3", False)
-        ])
-
-        # Если игрок ни разу не поел - концовка 1 (обморок)
-        if not ate_something:
-            self._show_ending("fainting", 0, is_late)
-            return
-
-        # Подсчитываем общий счет из конфига
-        total_score = 0.0
-        for flag, value in config.SCORE_VALUES.items():
-            if flag == "late_penalty":
-                continue  # Штраф за опоздание обрабатываем отдельно
-            if self.player.flags.get(flag, False):
-                total_score += value
-
-        # Штраф за опоздание
-        if is_late:
-            total_score += config.SCORE_VALUES.get("late_penalty", -2.0)
-
-        # Определяем концовку
-        if total_score < config.SCORE_THRESHOLDS["bad"]:
-            self._show_ending("bad", total_score, is_late)
-        elif total_score < config.SCORE_THRESHOLDS["good"]:
-            self._show_ending("good", total_score, is_late)
-        elif total_score < config.SCORE_THRESHOLDS["excellent"]:
-            self._show_ending("good", total_score, is_late)
-        else:
-            self._show_ending("excellent", total_score, is_late)
+        ending_type, total_score, is_late = evaluate_ending(self.player.flags, self.player._time_left)
+        self._show_ending(ending_type, total_score, is_late)
 
     def  _show_ending(self, ending_type: str, total_score: float, is_late: bool):
         """Показывает концовку"""
@@ -749,10 +764,10 @@ class GameEngine:
         grade = config.ENDING_GRADES.get(ending_type, "")
 
         # Выводим заголовок
-        print_slow(icon * 60, config.TEXT_SPEED_FAST)
+        print_separator(icon, 60)
         print_slow("", config.TEXT_SPEED_FAST)
         print_slow("🎓 ИТОГОВАЯ ОЦЕНКА", config.TEXT_SPEED_NORMAL)
-        print_slow(icon * 60, config.TEXT_SPEED_FAST)
+        print_separator(icon, 60)
         print_slow("", config.TEXT_SPEED_FAST)
 
         # Выводим катсцену
@@ -771,11 +786,11 @@ class GameEngine:
 
         # Выводим результат
         print_slow("", config.TEXT_SPEED_FAST)
-        print_slow(icon * 60, config.TEXT_SPEED_FAST)
+        print_separator(icon, 60)
         print_slow("", config.TEXT_SPEED_FAST)
         print_slow(title, config.TEXT_SPEED_NORMAL)
         print_slow(grade, config.TEXT_SPEED_NORMAL)
-        print_slow(icon * 60, config.TEXT_SPEED_FAST)
+        print_separator(icon, 60)
 
         # Статистика
         self._show_final_stats(ending_type, total_score)
@@ -787,7 +802,7 @@ class GameEngine:
         """Показывает финальную статистику (без флагов)"""
         print_slow("", config.TEXT_SPEED_FAST)
         print_slow("📊 ФИНАЛЬНАЯ СТАТИСТИКА:", config.TEXT_SPEED_FAST)
-        print_slow("-" * 40, config.TEXT_SPEED_FAST)
+        print_separator("-", 40)
 
         print_slow(f"👤 Игрок: {self.player.name}", config.TEXT_SPEED_FAST)
         print_slow(f"🎯 Итоговый счет: {total_score:.1f}/5.0", config.TEXT_SPEED_FAST)
@@ -804,25 +819,22 @@ class GameEngine:
         print_slow(f"📈 Сделано выборов: {len(self.player.choices_history)}", config.TEXT_SPEED_FAST)
 
         # Показываем только достижения (не флаги)
-        achievements = []
-        for flag, achievement_name in config.ACHIEVEMENTS.items():
-            if self.player.flags.get(flag, False):
-                achievements.append(achievement_name)
+        achievements = [rule.name for rule in self.achievements.unlocked(self.player)]
 
         if achievements:
             print_slow(f"🏆 Достижения: {', '.join(achievements[:5])}", config.TEXT_SPEED_FAST)
             if len(achievements) > 5:
                 print_slow(f"   ...и ещё {len(achievements) - 5}", config.TEXT_SPEED_FAST)
 
-        print_slow("-" * 40, config.TEXT_SPEED_FAST)
+        print_separator("-", 40)
 
     def game_over(self, message: str):
         """Завершение игры (старая версия)"""
         clear_console()
         print_game_name()
-        print_slow(config.SEP_SYMBOL * 60, config.TEXT_SPEED_FAST)
+        print_separator(config.SEP_SYMBOL, 60)
         print_slow("🎮 ИГРА ОКОНЧЕНА", config.TEXT_SPEED_NORMAL)
-        print_slow(config.SEP_SYMBOL * 60, config.TEXT_SPEED_FAST)
+        print_separator(config.SEP_SYMBOL, 60)
         print_slow("", config.TEXT_SPEED_FAST)
         print_slow(message, config.TEXT_SPEED_NORMAL)
         print_slow("", config.TEXT_SPEED_FAST)
@@ -834,16 +846,13 @@ class GameEngine:
         print_slow(f"🎯 Сделано выборов: {len(self.player.choices_history)}", config.TEXT_SPEED_FAST)
 
         # Только достижения, не флаги
-        achievements = []
-        for flag, achievement_name in config.ACHIEVEMENTS.items():
-            if self.player.flags.get(flag, False):
-                achievements.append(achievement_name)
+        achievements = [rule.name for rule in self.achievements.unlocked(self.player)]
 
         if achievements:
             print_slow(f"🏆 Достижения: {', '.join(achievements)}", config.TEXT_SPEED_FAST)
 
         print_slow("", config.TEXT_SPEED_FAST)
-        print_slow(config.SEP_SYMBOL * 60, config.TEXT_SPEED_FAST)
+        print_separator(config.SEP_SYMBOL, 60)
 
         input("\n↵ Нажмите Enter чтобы выйти...")
         self.game_running = False
\ No newline at end of file
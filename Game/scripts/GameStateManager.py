@@ -1,29 +1,255 @@
 # Game/scripts/GameStateManager.py
-from typing import Dict, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
+import hashlib
 import json
+import os
+import threading
 
 from Game import config
 from Game.scripts.TextBlock import TextBlock
 from Game.scripts.ChoiceBlock import ChoiceBlock
 from Game.scripts.Choice import Choice
 from Game.scripts.GameBlock import GameBlock
+from Game.scripts.BlockRegistry import BLOCK_TYPES
+from Game.scripts.BranchTable import BranchTable, compile_branches, link_targets
+from Game.scripts.Condition import CompiledCondition, ConditionError, compile_condition
+from Game.scripts.GameClock import GOTO, WorldEvent, load_world_events
+from Game.scripts.Inventory import Inventory
+from Game.scripts.Item import Item
 from Game.utils.ConsoleUtils import print_slow
+from Game.utils.JsonStream import iter_object_items, iter_sections
+from Game.utils import Coverage, Metrics
+
+_EMPTY_INVENTORY = Inventory()
+
+# Загруженные сюжеты, общие для всех движков процесса (папка данных -> менеджер)
+_shared_managers: Dict[str, 'GameStateManager'] = {}
+_shared_lock = threading.Lock()
+
+
+def tables_hash(tables) -> str:
+    """Хэш таблиц сюжета (текстовые блоки, блоки с выбором, выборы): ключи по порядку и to_dict()"""
+    digest = hashlib.sha1()
+    for table in tables:
+        for key in sorted(table):
+            digest.update(key.encode("utf-8"))
+            digest.update(json.dumps(table[key].to_dict(), sort_keys=True, ensure_ascii=False).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
 
 
 class GameStateManager:
+    """Содержимое сюжета: блоки, выборы, предметы и скомпилированные условия.
+
+    Не хранит ничего, что относится к конкретному игроку, поэтому один экземпляр
+    можно разделять между всеми сессиями процесса (см. shared()). Загруженные блоки
+    и выборы не изменяются; перезагрузка подменяет таблицы целиком.
+    """
+
     def __init__(self):
         self.text_blocks: Dict[str, TextBlock] = {}
         self.choice_blocks: Dict[str, ChoiceBlock] = {}
+        self.blocks: Dict[str, GameBlock] = {}  # Все блоки по ID, какого бы типа они ни были
         self.choices: Dict[str, Choice] = {}
+        self.item_registry: Dict[str, Item] = {}
+        self.world_events: List[WorldEvent] = []
+        self.watcher: Optional['StoryWatcher'] = None
+
+        # Горячая перезагрузка: какие файлы откуда загружены и номер ревизии сюжета
+        self.sources: Dict[str, str] = {}
+        self.source_sections: Dict[str, tuple] = {}  # Раздел файла, если таблица лежит в bundle
+        self.revision = 0
+        self._retired_blocks: Dict[str, GameBlock] = {}
+        self._lock = threading.RLock()
+
+        # Скомпилированные условия (исходная строка -> функция)
+        self._conditions: Dict[str, Optional[CompiledCondition]] = {}
+
+        # Таблицы ветвлений для списков next_block (id списка -> таблица)
+        self._branches: Dict[int, BranchTable] = {}
+
+        # Хэш содержимого сюжета, пересчитывается после изменения таблиц
+        self._content_hash: Optional[str] = None
+
+        # Поисковый индекс по тексту сюжета (строится при первом поиске, дальше дополняется)
+        self._search_index: Optional['SearchIndex'] = None
+        self._search_state = None
+
+        # Хранилище глав (если сюжет разбит на главы и грузится по требованию)
+        self.chapter_store: Optional['ChapterStore'] = None
+
+    @classmethod
+    def shared(cls, data_dir: str = None) -> 'GameStateManager':
+        """Возвращает общий для процесса сюжет, загружая его при первом обращении"""
+        data_dir = data_dir or config.DATA_DIR
+        with _shared_lock:
+            manager = _shared_managers.get(data_dir)
+            if manager is None:
+                manager = cls()
+                manager.load_story(data_dir)
+                _shared_managers[data_dir] = manager
+        return manager
+
+    def load_story(self, data_dir: str = None):
+        """Загружает сюжет из папки данных (главы или три JSON файла) и реестр предметов"""
+        data_dir = data_dir or config.DATA_DIR
+
+        # Проверяем и создаем директорию, если нужно
+        if not os.path.exists(data_dir):
+            os.makedirs(data_dir)
+            print_slow(f"📁 Создана директория: {data_dir}", config.TEXT_SPEED_FAST)
+
+        # Сюжет разбит на главы - читаем только манифесты, главы подгрузятся по ходу игры
+        chapters_dir = os.path.join(data_dir, config.CHAPTERS_DIR)
+        if config.CHAPTERS_ENABLED and os.path.isdir(chapters_dir):
+            try:
+                self.attach_chapters(chapters_dir)
+                self.load_item_registry()
+                self.load_world_events(os.path.join(data_dir, config.WORLD_EVENTS_FILE))
+                return
+            except Exception as e:
+                print_slow(f"❌ Ошибка загрузки глав: {e}", config.TEXT_SPEED_FAST)
+
+        # Сюжет, скомпилированный из сценария StoryScript, лежит одним файлом
+        bundle_path = os.path.join(data_dir, config.STORY_BUNDLE_FILE)
+        if os.path.exists(bundle_path):
+            self.load_bundle(bundle_path)
+            self.load_item_registry()
+            self.load_world_events(os.path.join(data_dir, config.WORLD_EVENTS_FILE))
+            return
+
+        # Пытаемся загрузить файлы
+        try:
+            choices_path = os.path.join(data_dir, config.CHOICES_FILE)
+            text_blocks_path = os.path.join(data_dir, config.NARRATIVE_FILE)
+            choice_blocks_path = os.path.join(data_dir, config.CHOICE_BLOCKS_FILE)
+
+            if os.path.exists(choices_path):
+                self.load_choices(choices_path)
+            else:
+                print_slow(f"⚠️  Файл не найден: {choices_path}", config.TEXT_SPEED_FAST)
+
+            if os.path.exists(text_blocks_path):
+                self.load_text_blocks(text_blocks_path)
+            else:
+                print_slow(f"⚠️  Файл не найден: {text_blocks_path}", config.TEXT_SPEED_FAST)
+
+            if os.path.exists(choice_blocks_path):
+                self.load_choice_blocks(choice_blocks_path)
+            else:
+                print_slow(f"⚠️  Файл не найден: {choice_blocks_path}", config.TEXT_SPEED_FAST)
+
+            # Инициализация предметов
+            self.load_item_registry()
+
+            # События мира по игровым часам
+            self.load_world_events(os.path.join(data_dir, config.WORLD_EVENTS_FILE))
+
+        except Exception as e:
+            print_slow(f"❌ Ошибка загрузки данных: {e}", config.TEXT_SPEED_FAST)
+
+    def load_item_registry(self):
+        """Инициализирует реестр предметов"""
+        registry = {}
+        for item_name, item_data in config.ITEM_REGISTRY.items():
+            registry[item_name] = Item(
+                name=item_data["name"],
+                description=item_data["description"],
+                power=item_data.get("power", 0)
+            )
+        self.item_registry = registry
+
+        # Для отладки - выводим загруженные предметы
+        if config.DEV_MOD:
+            print_slow(f"✅ Загружено предметов: {len(self.item_registry)}", config.TEXT_SPEED_FAST)
+
+    def load_world_events(self, filepath: str):
+        """Загружает расписание событий мира и компилирует их условия"""
+        try:
+            events = load_world_events(filepath)
+            for event in events:
+                if event.action == GOTO and event.block != config.END_BLOCK_ID and not self.has_block(event.block):
+                    raise ValueError(f"Событие {event.id} ведет в несуществующий блок '{event.block}'")
+        except Exception as e:
+            print_slow(f"❌ Ошибка загрузки событий мира: {e}", config.TEXT_SPEED_FAST)
+            return
+
+        for event in events:
+            self.compile_condition(event.condition)
+        self.world_events = events
+
+        if config.DEV_MOD and events:
+            print_slow(f"✅ Загружено событий мира: {len(events)}", config.TEXT_SPEED_FAST)
+
+    def start_watcher(self):
+        """Запускает слежение за файлами сюжета (один наблюдатель на менеджер)"""
+        from Game.scripts.StoryWatcher import StoryWatcher
+
+        with self._lock:
+            if self.watcher is None:
+                self.watcher = StoryWatcher(self)
+                self.watcher.start()
+
+    def attach_chapters(self, chapters_dir: str):
+        """Переключает менеджер на загрузку сюжета по главам"""
+        from Game.scripts.ChapterStore import ChapterStore
+
+        self.chapter_store = ChapterStore(self, chapters_dir)
+        print_slow(f"✅ Найдено глав: {len(self.chapter_store.chapter_ids)}", config.TEXT_SPEED_FAST)
+
+    def _parse_text_blocks(self, filepath: str, section: tuple = None) -> Dict[str, TextBlock]:
+        return self._build_text_blocks(iter_object_items(filepath, section or ()))
+
+    def _parse_choice_blocks(self, filepath: str, section: tuple = None) -> Dict[str, ChoiceBlock]:
+        return self._build_choice_blocks(iter_object_items(filepath, section or ("choice_blocks",)))
+
+    def _parse_choices(self, filepath: str, section: tuple = None) -> Dict[str, Choice]:
+        return self._build_choices(iter_object_items(filepath, section or ("choices",)))
+
+    @staticmethod
+    def _create_block(block_id: str, block_data: dict, default: type) -> Optional[GameBlock]:
+        """Создает блок через реестр; блок с ошибкой в данных пропускается, а не валит весь файл"""
+        try:
+            return BLOCK_TYPES.create(block_id, block_data, default)
+        except ValueError as e:
+            print_slow(f"⚠️  {e} - блок пропущен", config.TEXT_SPEED_FAST)
+            return None
+
+    def _build_text_blocks(self, items: Iterable[Tuple[str, dict]]) -> Dict[str, TextBlock]:
+        blocks = {}
+        for block_id, block_data in items:
+            block = self._create_block(block_id, block_data, TextBlock)
+            if block is None:
+                continue
+            self.compile_condition(block.conditions)
+            self.branch_table(block.next_block)
+            blocks[block_id] = block
+        return blocks
+
+    def _build_choice_blocks(self, items: Iterable[Tuple[str, dict]]) -> Dict[str, ChoiceBlock]:
+        blocks = {}
+        for block_id, block_data in items:
+            block = self._create_block(block_id, block_data, ChoiceBlock)
+            if block is not None:
+                blocks[block_id] = block
+        return blocks
+
+    def _build_choices(self, items: Iterable[Tuple[str, dict]]) -> Dict[str, Choice]:
+        choices = {}
+        for choice_id, choice_data in items:
+            choice = Choice.from_dict(choice_id, choice_data)
+            self.compile_condition(choice.condition)
+            self.compile_condition(choice.end_condition)
+            self.branch_table(choice.next_block)
+            choices[choice_id] = choice
+        return choices
 
     def load_text_blocks(self, filepath: str):
         """Загружает текстовые блоки из JSON файла"""
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            for block_id, block_data in data.items():
-                self.text_blocks[block_id] = TextBlock.from_dict(block_id, block_data)
+            self.text_blocks.update(self._parse_text_blocks(filepath))
+            self.sources["text_blocks"] = filepath
+            self._rebuild_block_index()
 
             print_slow(f"✅ Загружено текстовых блоков: {len(self.text_blocks)}", config.TEXT_SPEED_FAST)
         except Exception as e:
@@ -32,11 +258,9 @@ class GameStateManager:
     def load_choice_blocks(self, filepath: str):
         """Загружает блоки с выбором из JSON файла"""
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            for block_id, block_data in data.get("choice_blocks", {}).items():
-                self.choice_blocks[block_id] = ChoiceBlock.from_dict(block_id, block_data)
+            self.choice_blocks.update(self._parse_choice_blocks(filepath))
+            self.sources["choice_blocks"] = filepath
+            self._rebuild_block_index()
 
             print_slow(f"✅ Загружено блоков с выбором: {len(self.choice_blocks)}", config.TEXT_SPEED_FAST)
         except Exception as e:
@@ -45,43 +269,231 @@ class GameStateManager:
     def load_choices(self, filepath: str):
         """Загружает варианты выбора из JSON файла"""
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            for choice_id, choice_data in data.get("choices", {}).items():
-                self.choices[choice_id] = Choice.from_dict(choice_id, choice_data)
+            self.choices.update(self._parse_choices(filepath))
+            self.sources["choices"] = filepath
 
             print_slow(f"✅ Загружено вариантов выбора: {len(self.choices)}", config.TEXT_SPEED_FAST)
         except Exception as e:
             print_slow(f"❌ Ошибка загрузки вариантов выбора: {e}", config.TEXT_SPEED_FAST)
 
+    def load_bundle(self, filepath: str):
+        """Загружает весь сюжет из одного файла, собранного компилятором StoryScript (за один проход)"""
+        builders = {
+            "choices": self._build_choices,
+            "text_blocks": self._build_text_blocks,
+            "choice_blocks": self._build_choice_blocks,
+        }
+        try:
+            for kind, items in iter_sections(filepath, builders):
+                getattr(self, kind).update(builders[kind](items))
+                self.sources[kind] = filepath
+                self.source_sections[kind] = (kind,)
+            self._rebuild_block_index()
+
+            print_slow(f"✅ Загружен сюжет {os.path.basename(filepath)}: блоков "
+                       f"{len(self.text_blocks) + len(self.choice_blocks)}, выборов {len(self.choices)}",
+                       config.TEXT_SPEED_FAST)
+        except Exception as e:
+            print_slow(f"❌ Ошибка загрузки сюжета {filepath}: {e}", config.TEXT_SPEED_FAST)
+
+    def reload_source(self, kind: str) -> bool:
+        """Перечитывает один файл сюжета и атомарно подменяет соответствующую таблицу.
+
+        Новая таблица собирается целиком в стороне, поэтому при ошибке разбора
+        остается старое содержимое, а читатели никогда не видят таблицу наполовину.
+        """
+        filepath = self.sources.get(kind)
+        if filepath is None:
+            return False
+
+        parsers = {
+            "text_blocks": self._parse_text_blocks,
+            "choice_blocks": self._parse_choice_blocks,
+            "choices": self._parse_choices,
+        }
+        new_table = parsers[kind](filepath, self.source_sections.get(kind))
+
+        with self._lock:
+            old_table = getattr(self, kind)
+            self.forget_branches(old_table.values())
+            if kind != "choices":
+                # Запоминаем удаленные блоки, чтобы было по чему переселять сессии
+                for block_id, block in old_table.items():
+                    if block_id not in new_table:
+                        self._retired_blocks[block_id] = block
+                for block_id in new_table:
+                    self._retired_blocks.pop(block_id, None)
+
+            setattr(self, kind, new_table)
+            if kind != "choices":
+                self._rebuild_block_index()
+            self.revision += 1
+            self._content_hash = None
+        return True
+
+    def relocate_block_id(self, block_id: str) -> str:
+        """Подбирает существующий блок для сессии, чей текущий блок пропал после перезагрузки.
+
+        Сначала идем вперед по старым ссылкам next_block удаленного блока, затем назад
+        по previous_block, и только если ничего не нашлось - возвращаемся в стартовый блок.
+        """
+        if self.get_block(block_id) is not None:
+            return block_id
+
+        for link in ("next_block", "previous_block"):
+            visited = set()
+            queue = [block_id]
+            while queue:
+                current_id = queue.pop(0)
+                if current_id in visited:
+                    continue
+                visited.add(current_id)
+
+                if current_id != block_id and self.get_block(current_id) is not None:
+                    return current_id
+
+                retired = self._retired_blocks.get(current_id)
+                target = getattr(retired, link, None) if retired else None
+                queue.extend(link_targets(target))
+
+        return config.START_BLOCK_ID
+
+    def content_hash(self) -> str:
+        """Возвращает хэш содержимого сюжета (одинаковый для одинаковых JSON файлов).
+
+        Считается под блокировкой менеджера: главы из других сессий меняют таблицы под ней же.
+        Для сюжета по главам - хэш всего сюжета, а не загруженных сейчас глав (см. ChapterStore.story_hash).
+        """
+        if self.chapter_store is not None:
+            return self.chapter_store.story_hash()
+        with self._lock:
+            if self._content_hash is None:
+                self._content_hash = tables_hash((self.text_blocks, self.choice_blocks, self.choices))
+            return self._content_hash
+
+    def search_index(self) -> 'SearchIndex':
+        """Поисковый индекс, доведенный до текущих таблиц (переиндексируются только изменения)"""
+        from Game.scripts.SearchIndex import SearchIndex
+
+        with self._lock:
+            if self._search_index is None:
+                self._search_index = SearchIndex()
+
+            # Сюжет по главам индексируем целиком по файлам глав, а не по загруженным сейчас
+            if self.chapter_store is not None:
+                state = ("chapters", self.chapter_store.story_hash())
+                if self._search_state != state:
+                    text_blocks, choice_blocks, choices = self.chapter_store.read_story()
+                    self._search_index.sync_tables(text_blocks.items(), choice_blocks.items(), choices.items(),
+                                                   remember=False)
+                    self._search_state = state
+                return self._search_index
+
+            # Перезагрузка меняет ревизию, догрузка файлов - размеры таблиц
+            state = (self.revision, len(self.text_blocks), len(self.choice_blocks), len(self.choices))
+            if self._search_state != state:
+                self._search_index.sync(self)
+                self._search_state = state
+            return self._search_index
+
+    def has_block(self, block_id: str) -> bool:
+        """Есть ли блок в сюжете (для сюжета по главам - в любой главе, без подгрузки)"""
+        if self.chapter_store is not None and self.chapter_store.chapter_of(block_id) is not None:
+            return True
+        return block_id in self.blocks
+
+    def _rebuild_block_index(self):
+        """Пересобирает индекс блоков после смены таблиц (при совпадении ID главнее текстовый блок)"""
+        self.blocks = {**self.choice_blocks, **self.text_blocks}
+
     def get_block(self, block_id: str) -> Optional[GameBlock]:
-        """Возвращает блок по ID (полиморфно!)"""
-        if block_id in self.text_blocks:
-            return self.text_blocks[block_id]
-        elif block_id in self.choice_blocks:
-            return self.choice_blocks[block_id]
-        return None
+        """Возвращает блок по ID (полиморфно!) - один поиск в индексе блоков"""
+        block = self.blocks.get(block_id)
+        if block is None and self.chapter_store is not None and self.chapter_store.ensure_block(block_id):
+            block = self.blocks.get(block_id)
+        return block
 
     def get_choice(self, choice_id: str) -> Optional[Choice]:
         """Возвращает вариант выбора по ID"""
         return self.choices.get(choice_id)
 
-    def evaluate_condition(self, condition: str, player_flags: Dict[str, bool]) -> bool:
-        """Оценивает условие на основе флагов игрока"""
+    def compile_condition(self, condition: Optional[str]) -> Optional[CompiledCondition]:
+        """Компилирует условие один раз и кэширует результат (None - условие с ошибкой)"""
+        if not condition:
+            return None
+        if condition in self._conditions:
+            return self._conditions[condition]
+
+        try:
+            compiled = compile_condition(condition)
+        except ConditionError as e:
+            if config.DEV_MOD:
+                print_slow(f"⚠️  {e}", config.TEXT_SPEED_FAST)
+            compiled = None
+        self._conditions[condition] = compiled
+        return compiled
+
+    def branch_table(self, next_block) -> Optional[BranchTable]:
+        """Таблица ветвлений для списка next_block (компилируется один раз)"""
+        if not isinstance(next_block, list):
+            return None
+        table = self._branches.get(id(next_block))
+        if table is None or table.source is not next_block:
+            table = compile_branches(next_block, self.compile_condition)
+            self._branches[id(next_block)] = table
+            if config.DEV_MOD:
+                for error in table.errors:
+                    print_slow(f"⚠️  {error}", config.TEXT_SPEED_FAST)
+        return table
+
+    def forget_branches(self, objects: Iterable[object]):
+        """Убирает из кэша таблицы ветвлений выгруженных или замененных блоков и выборов"""
+        for obj in objects:
+            next_block = getattr(obj, "next_block", None)
+            if isinstance(next_block, list):
+                table = self._branches.get(id(next_block))
+                if table is not None and table.source is next_block:
+                    del self._branches[id(next_block)]
+
+    def resolve_next_block(self, next_block, player_flags: Dict[str, bool], inventory: Optional[Inventory] = None,
+                           clock: int = 0, seed: Optional[str] = None) -> Optional[str]:
+        """Куда ведет ссылка next_block в данном состоянии (None - никуда)"""
+        if not next_block:
+            return None
+        if not isinstance(next_block, list):
+            return next_block
+        return self.branch_table(next_block).select(
+            player_flags, inventory if inventory is not None else _EMPTY_INVENTORY, clock, seed)
+
+    def conditions(self) -> List[str]:
+        """Тексты всех скомпилированных условий сюжета"""
+        return [condition for condition, compiled in list(self._conditions.items()) if compiled is not None]
+
+    def evaluate_condition(self, condition: str, player_flags: Dict[str, bool],
+                           inventory: Optional[Inventory] = None, clock: int = 0) -> bool:
+        """Оценивает условие на основе флагов, инвентаря и игрового времени"""
         if condition is None:
             return True
 
+        compiled = self._conditions.get(condition)
+        if compiled is None:
+            compiled = self.compile_condition(condition)
+            if compiled is None:
+                return False
+
         try:
-            # Простая замена флагов
-            for flag_name, flag_value in player_flags.items():
-                condition = condition.replace(f"{flag_name} == True", str(flag_value))
-                condition = condition.replace(f"{flag_name} == False", str(not flag_value))
-
-            # Заменяем операторы
-            condition = condition.replace("==", "==")
-            condition = condition.replace("!=", "!=")
-
-            return eval(condition)
-        except:
-            return False
\ No newline at end of file
+            result = compiled(player_flags, inventory if inventory is not None else _EMPTY_INVENTORY, clock)
+        except Exception:
+            result = False
+
+        if Metrics.REGISTRY.enabled:
+            Metrics.CONDITION_EVALUATIONS.inc(label_value="true" if result else "false")
+        if Coverage.COLLECTOR.enabled:
+            Coverage.COLLECTOR.hit_condition(condition, result)
+        return result
+
+    def check_condition(self, condition: Optional[str], player: 'Player') -> bool:
+        """Оценивает условие для игрока"""
+        if condition is None:
+            return True
+        return self.evaluate_condition(condition, player.flags, player.inventory, player.current_time)
@@ -1,35 +1,82 @@
-from typing import List
+from typing import Dict, Iterable, List, Tuple
 
 from Game.scripts.Item import Item
 
 
 class Inventory:
+    """Инвентарь-мультимножество: предметы индексируются по имени, одинаковые хранятся счетчиком"""
+
     def __init__(self, items: List[Item] = None):
-        self._items = items if items is not None else []
+        self._items: Dict[str, Item] = {}  # Имя -> предмет (один экземпляр на имя)
+        self._counts: Dict[str, int] = {}  # Имя -> количество
+        self._power = 0  # Суммарная сила всех предметов
+        if items is not None:
+            self.add_items(items)
 
-    def add_item(self, item: Item):
+    def add_item(self, item: Item, count: int = 1):
         """Добавляет предмет в инвентарь"""
-        self._items.append(item)
+        if count <= 0:
+            return
+        if item.name not in self._items:
+            self._items[item.name] = item
+            self._counts[item.name] = 0
+        self._counts[item.name] += count
+        self._power += self._items[item.name].power * count
+
+    def add_items(self, items: Iterable[Item]):
+        """Добавляет сразу несколько предметов"""
+        for item in items:
+            self.add_item(item)
 
     def remove_item(self, item_name: str) -> bool:
         """Удаляет предмет из инвентаря по имени"""
-        for i, item in enumerate(self._items):
-            if item.name == item_name:
-                self._items.pop(i)
-                return True
-        return False
+        count = self._counts.get(item_name, 0)
+        if count == 0:
+            return False
+
+        self._power -= self._items[item_name].power
+        if count == 1:
+            del self._counts[item_name]
+            del self._items[item_name]
+        else:
+            self._counts[item_name] = count - 1
+        return True
 
     def has_item(self, item_name: str) -> bool:
         """Проверяет, есть ли предмет в инвентаре"""
-        return any(item.name == item_name for item in self._items)
+        return item_name in self._counts
+
+    def count(self, item_name: str) -> int:
+        """Возвращает количество предметов с таким именем"""
+        return self._counts.get(item_name, 0)
+
+    @property
+    def power(self) -> int:
+        """Суммарная сила всех предметов"""
+        return self._power
 
     def get_items(self) -> List[Item]:
         """Возвращает список предметов"""
-        return self._items.copy()
+        return [item for name, item in self._items.items() for _ in range(self._counts[name])]
+
+    def get_stacks(self) -> List[Tuple[Item, int]]:
+        """Возвращает список пар (предмет, количество)"""
+        return [(item, self._counts[name]) for name, item in self._items.items()]
+
+    def copy(self) -> 'Inventory':
+        """Возвращает независимую копию инвентаря"""
+        inventory = Inventory()
+        inventory._items = self._items.copy()
+        inventory._counts = self._counts.copy()
+        inventory._power = self._power
+        return inventory
+
+    def __len__(self) -> int:
+        return sum(self._counts.values())
 
     def to_dict(self):
         return {
-            'items': [item.to_dict() for item in self._items]
+            'items': [item.to_dict() for item in self.get_items()]
         }
 
     @classmethod
@@ -44,4 +91,4 @@ class Inventory:
             if item:
                 items.append(item)
 
-        return cls(items=items)
\ No newline at end of file
+        return cls(items=items)
@@ -0,0 +1,83 @@
+# Game/scripts/ItemCheckBlock.py
+import json
+from typing import List, Optional, Union
+
+from Game import config
+from Game.scripts.TextBlock import TextBlock
+
+
+def _item_name(block_id: str, item: str) -> str:
+    """Имя предмета в инвентаре по ключу ITEM_REGISTRY (как в given_item) или по самому имени"""
+    if item in config.ITEM_REGISTRY:
+        return config.ITEM_REGISTRY[item]["name"]
+    if any(data["name"] == item for data in config.ITEM_REGISTRY.values()):
+        return item
+    raise ValueError(f"Блок '{block_id}': неизвестный предмет '{item}'")
+
+
+class ItemCheckBlock(TextBlock):
+    """Развилка по инвентарю: есть предмет - в next_block, нет - в else_block.
+
+    Сводится к таблице ветвлений с условием has_item, поэтому решатели понимают её без доработок.
+    Поле item - ключ ITEM_REGISTRY, как в given_item; инвентарь же хранит предметы по имени,
+    поэтому в условие попадает имя из реестра.
+    """
+
+    type_tag = "item_check"
+
+    def __init__(self,
+                 block_id: str,
+                 item: str,
+                 next_block: str,
+                 else_block: Optional[str] = None,
+                 body: str = "",
+                 previous_block: Union[str, List[str], None] = None,
+                 conditions: Optional[str] = None):
+        name = _item_name(block_id, item)
+        branches = [{"block": next_block, "condition": f"has_item({json.dumps(name, ensure_ascii=False)})"}]
+        if else_block:
+            branches.append(else_block)
+        super().__init__(block_id, body, branches, previous_block, conditions)
+        self._item = item
+        self._item_name = name
+        self._target = next_block
+        self._else_block = else_block
+
+    @property
+    def item(self) -> str:
+        return self._item
+
+    @property
+    def item_name(self) -> str:
+        return self._item_name
+
+    @property
+    def else_block(self) -> Optional[str]:
+        return self._else_block
+
+    def display(self, engine: 'GameEngine'):
+        if self.body:
+            super().display(engine)
+
+    @classmethod
+    def from_dict(cls, block_id: str, data: dict):
+        return cls(
+            block_id=block_id,
+            item=data.get("item", ""),
+            next_block=data.get("next_block"),
+            else_block=data.get("else_block"),
+            body=data.get("body", ""),
+            previous_block=data.get("previous_block"),
+            conditions=data.get("conditions")
+        )
+
+    def to_dict(self):
+        return {
+            "type": self.type_tag,
+            "body": self.body,
+            "item": self._item,
+            "next_block": self._target,
+            "else_block": self._else_block,
+            "previous_block": self.previous_block,
+            "conditions": self.conditions
+        }
@@ -0,0 +1,168 @@
+# Game/scripts/PathSolver.py
+import argparse
+import heapq
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from Game import config
+from Game.scripts.StoryModel import StoryModel, StoryState
+
+# Результаты запросов: (хэш сюжета, запрос) -> результат
+_cache: Dict[Tuple[str, 'PathQuery'], 'PathResult'] = {}
+
+
+@dataclass(frozen=True)
+class PathQuery:
+    """Запрос: добраться до блока goal так, чтобы были все required флаги и ни одного forbidden"""
+    goal: str = config.END_BLOCK_ID
+    required: FrozenSet[str] = frozenset()
+    forbidden: FrozenSet[str] = frozenset()
+    start: str = config.START_BLOCK_ID
+
+
+@dataclass
+class PathResult:
+    query: PathQuery
+    found: bool
+    choices: List[str] = field(default_factory=list)  # Последовательность ID выборов
+    blocks: List[str] = field(default_factory=list)  # Пройденные блоки, включая стартовый и целевой
+    total_time: int = 0
+    explored_states: int = 0
+    reason: str = ""  # Почему пути нет (если не найден)
+
+
+def _story_block_ids(manager: 'GameStateManager') -> List[str]:
+    """ID всех блоков сюжета; для сюжета по главам - из манифестов (главы подгружает get_block)"""
+    if manager.chapter_store is not None:
+        return manager.chapter_store.block_ids
+    return list(manager.text_blocks) + list(manager.choice_blocks)
+
+
+def _block_distances(model: StoryModel, goal: str) -> Dict[str, int]:
+    """Минимальное время от каждого блока до цели без учета условий и флагов.
+
+    Это нижняя оценка настоящего пути, поэтому годится как эвристика A*.
+    """
+    reverse: Dict[str, List[Tuple[str, int]]] = {}
+    for block_id in _story_block_ids(model.state_manager):
+        for target, cost in model.block_links(block_id):
+            reverse.setdefault(target, []).append((block_id, cost))
+
+    distances = {goal: 0}
+    queue = [(0, goal)]
+    while queue:
+        distance, block_id = heapq.heappop(queue)
+        if distance > distances.get(block_id, distance):
+            continue
+        for source, cost in reverse.get(block_id, []):
+            new_distance = distance + cost
+            if new_distance < distances.get(source, new_distance + 1):
+                distances[source] = new_distance
+                heapq.heappush(queue, (new_distance, source))
+    return distances
+
+
+def find_path(state_manager: 'GameStateManager', query: PathQuery, model: StoryModel = None) -> PathResult:
+    """Ищет самый быстрый (по time_cost) путь A* по графу состояний (блок, флаги, предметы).
+
+    Если путь не найден, значит перебраны все достижимые состояния, удовлетворяющие
+    ограничениям - это и есть доказательство, что пути нет.
+    """
+    key = (state_manager.content_hash(), query)
+    if key in _cache:
+        return _cache[key]
+
+    model = model or StoryModel(state_manager)
+    result = _search(model, query)
+    _cache[key] = result
+    return result
+
+
+def _search(model: StoryModel, query: PathQuery) -> PathResult:
+    distances = _block_distances(model, query.goal)
+    start = model.initial_state(query.start)
+
+    if query.start not in distances:
+        return PathResult(query, False, reason=f"Блок '{query.goal}' недостижим из '{query.start}' даже без учета условий")
+    if start.flags & query.forbidden:
+        return PathResult(query, False, reason="Запрещенный флаг установлен уже в начале игры")
+
+    def state_key(state: StoryState):
+        return state.block_id, state.flags, state.items
+
+    best: Dict[tuple, int] = {state_key(start): 0}
+    parents: Dict[tuple, Tuple[Optional[tuple], Optional[str], StoryState]] = {state_key(start): (None, None, start)}
+    counter = 0
+    queue = [(distances[start.block_id], counter, 0, start)]
+    explored = 0
+    goal_arrivals = 0
+
+    while queue:
+        _, _, cost, state = heapq.heappop(queue)
+        key = state_key(state)
+        if cost > best.get(key, cost):
+            continue
+        explored += 1
+
+        if state.block_id == query.goal:
+            goal_arrivals += 1
+            if query.required <= state.flags:
+                return _build_result(query, parents, key, cost, explored)
+            # Флаги только добавляются, но после цели путь может продолжиться - идем дальше
+
+        for transition in model.successors(state):
+            new_state = transition.state
+            if new_state is None or new_state.flags & query.forbidden:
+                continue
+            if new_state.block_id not in distances:
+                continue
+
+            new_cost = cost + transition.cost
+            new_key = state_key(new_state)
+            if new_cost < best.get(new_key, new_cost + 1):
+                best[new_key] = new_cost
+                parents[new_key] = (key, transition.choice_id, new_state)
+                counter += 1
+                heapq.heappush(queue, (new_cost + distances[new_state.block_id], counter, new_cost, new_state))
+
+    if goal_arrivals:
+        reason = (f"Блок '{query.goal}' достигается {goal_arrivals} способами, "
+                  f"но ни в одном нет всех флагов: {', '.join(sorted(query.required))}")
+    else:
+        reason = f"Блок '{query.goal}' недостижим при заданных ограничениях"
+    return PathResult(query, False, explored_states=explored, reason=reason + f" (перебрано состояний: {explored})")
+
+
+def _build_result(query: PathQuery, parents: dict, key: tuple, cost: int, explored: int) -> PathResult:
+    choices = []
+    blocks = []
+    while key is not None:
+        parent_key, choice_id, state = parents[key]
+        blocks.append(state.block_id)
+        if choice_id is not None:
+            choices.append(choice_id)
+        key = parent_key
+
+    return PathResult(query, True, list(reversed(choices)), list(reversed(blocks)), cost, explored)
+
+
+if __name__ == "__main__":
+    # python -m Game.scripts.PathSolver --goal block_end --require mega_album --forbid eat_2
+    from Game.scripts.GameStateManager import GameStateManager
+
+    parser = argparse.ArgumentParser(description="Поиск самого быстрого пути по сюжету")
+    parser.add_argument("--goal", default=config.END_BLOCK_ID, help="ID целевого блока")
+    parser.add_argument("--start", default=config.START_BLOCK_ID, help="ID стартового блока")
+    parser.add_argument("--require", nargs="*", default=[], help="Флаги, которые должны быть получены")
+    parser.add_argument("--forbid", nargs="*", default=[], help="Флаги, которые нельзя получать")
+    args = parser.parse_args()
+
+    manager = GameStateManager.shared()
+
+    result = find_path(manager, PathQuery(args.goal, frozenset(args.require), frozenset(args.forbid), args.start))
+    if result.found:
+        print(f"✅ Путь найден: {result.total_time} мин, состояний перебрано: {result.explored_states}")
+        print(f"   Выборы: {' -> '.join(result.choices)}")
+        print(f"   Блоки: {' -> '.join(result.blocks)}")
+    else:
+        print(f"❌ Пути нет: {result.reason}")
@@ -1,5 +1,6 @@
 from dataclasses import dataclass, field
-from typing import List, Dict
+from typing import List, Dict, Optional
+from Game import config
 from Game.scripts.Inventory import Inventory
 
 
@@ -26,11 +27,17 @@ class Player:
     })
     _choices_history: List[str] = field(default_factory=list)  # История ID выбранных выборов
     _current_block_id: str = "text_000"  # Текущий блок игры
+    _achievements: List[str] = field(default_factory=list)  # ID открытых достижений
+    _story_hash: Optional[str] = None  # Хэш версии сюжета, под которую записано сохранение
 
     @property
     def name(self):
         return self._name
 
+    @property
+    def inventory(self):
+        return self._inventory
+
     @property
     def flags(self):
         return self._flags
@@ -39,6 +46,23 @@ class Player:
     def choices_history(self):
         return self._choices_history
 
+    @property
+    def achievements(self):
+        return self._achievements
+
+    @property
+    def story_hash(self):
+        return self._story_hash
+
+    @story_hash.setter
+    def story_hash(self, value: Optional[str]):
+        self._story_hash = value
+
+    @property
+    def current_time(self) -> int:
+        """Текущее игровое время в минутах от полуночи"""
+        return config.START_TIME + (config.START_TIME - self._time_left)
+
     @property
     def current_block_id(self):
         return self._current_block_id
@@ -54,6 +78,13 @@ class Player:
         if flag_name:  # Проверяем, что флаг не пустая строка
             self._flags[flag_name] = value
 
+    def unlock_achievement(self, achievement_id: str) -> bool:
+        """Отмечает достижение открытым (False - уже было открыто)"""
+        if achievement_id in self._achievements:
+            return False
+        self._achievements.append(achievement_id)
+        return True
+
     def update_time(self, time_cost: int):
         """Обновление времени игрока"""
         if isinstance(time_cost, int):
@@ -68,7 +99,9 @@ class Player:
             'inventory': self._inventory.to_dict(),
             'flags': self._flags,
             'choices_history': self._choices_history,
-            'current_block_id': self._current_block_id
+            'current_block_id': self._current_block_id,
+            'achievements': self._achievements,
+            'story_hash': self._story_hash
         }
 
     @classmethod
@@ -82,6 +115,7 @@ class Player:
         flags = data.get("flags", {})
         choices_history = data.get("choices_history", [])
         current_block_id = data.get("current_block_id", "text_000")
+        achievements = data.get("achievements", [])  # В старых сохранениях списка нет
 
         player = cls(
             _name=name,
@@ -92,4 +126,6 @@ class Player:
         player._flags = flags
         player._choices_history = choices_history
         player._current_block_id = current_block_id
+        player._achievements = achievements
+        player._story_hash = data.get("story_hash")
         return player
\ No newline at end of file
@@ -0,0 +1,226 @@
+# Game/scripts/PolicySolver.py
+import argparse
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from Game import config
+from Game.scripts.Scoring import evaluate_ending
+from Game.scripts.StoryModel import StoryModel, StoryState
+
+# Оценка за досрочный конец игры (game over, тупик, вышло время)
+GAME_OVER_SCORE = float(config.SCORE_THRESHOLDS["fail"])
+_EPSILON = 1e-9
+
+
+@dataclass
+class ChoiceRegret:
+    """Насколько выбор хуже лучшего в тех состояниях, где он доступен"""
+    choice_id: str
+    available: int = 0  # В скольких состояниях выбор был доступен
+    optimal: int = 0  # В скольких из них он был лучшим
+    max_regret: float = 0.0
+    total_regret: float = 0.0
+
+    @property
+    def mean_regret(self) -> float:
+        return self.total_regret / self.available if self.available else 0.0
+
+    @property
+    def dominated(self) -> bool:
+        """Выбор ни разу не был лучшим - кандидат на балансировку"""
+        return self.available > 0 and self.optimal == 0
+
+
+@dataclass
+class PolicyResult:
+    best_score: float
+    ending: str
+    strategy: List[str] = field(default_factory=list)  # Оптимальная последовательность выборов
+    values: Dict[StoryState, float] = field(default_factory=dict)  # Лучший балл для каждого состояния
+    policy: Dict[StoryState, str] = field(default_factory=dict)  # Лучший выбор в каждом состоянии с выбором
+    regrets: Dict[str, ChoiceRegret] = field(default_factory=dict)
+
+
+def solve_policy(state_manager: 'GameStateManager', model: StoryModel = None) -> PolicyResult:
+    """Обратная индукция по всем достижимым состояниям: лучший итоговый балл и выбор, который к нему ведет.
+
+    Состояния, связанные циклом без продвижения времени, оцениваются вместе (компонента сильной
+    связности): значения уточняются, пока не перестанут меняться, а бесконечное хождение по кругу
+    стоит как game over.
+    """
+    model = model or StoryModel(state_manager)
+    start = model.initial_state()
+
+    values: Dict[StoryState, float] = {}
+    endings: Dict[StoryState, str] = {}
+    best: Dict[StoryState, object] = {}  # Состояние -> лучший переход
+    transitions: Dict[StoryState, list] = {}
+
+    # Итеративный алгоритм Тарьяна: компоненты выходят в порядке "сначала потомки"
+    index: Dict[StoryState, int] = {}
+    low: Dict[StoryState, int] = {}
+    component_stack: List[StoryState] = []
+    on_stack = set()
+    stack = [(start, 0)]
+    while stack:
+        state, position = stack.pop()
+
+        if position == 0:
+            if state in index:
+                continue
+            index[state] = low[state] = len(index)
+
+            if model.is_end(state) and state.time_left > 0:
+                ending, score, _ = evaluate_ending(dict.fromkeys(state.flags, True), state.time_left)
+                values[state], endings[state] = score, ending
+                continue
+
+            outgoing = model.successors(state)
+            if not outgoing:
+                values[state], endings[state] = GAME_OVER_SCORE, "game_over"
+                continue
+
+            transitions[state] = outgoing
+            component_stack.append(state)
+            on_stack.add(state)
+        else:
+            child = transitions[state][position - 1].state
+            if child in on_stack:
+                low[state] = min(low[state], low[child])
+
+        # Следующий еще не посещенный потомок
+        outgoing = transitions[state]
+        while position < len(outgoing):
+            child = outgoing[position].state
+            position += 1
+            if child is None:
+                continue
+            if child not in index:
+                stack.append((state, position))
+                stack.append((child, 0))
+                break
+            if child in on_stack:
+                low[state] = min(low[state], index[child])
+        else:
+            if low[state] == index[state]:
+                component = []
+                while True:
+                    member = component_stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == state:
+                        break
+                _solve_component(component, transitions, values, endings, best)
+
+    return _collect(start, values, endings, best, transitions)
+
+
+def _solve_component(component: List[StoryState], transitions: dict, values: dict, endings: dict, best: dict):
+    """Значения состояний компоненты; значения всех состояний вне её уже известны"""
+    if len(component) == 1 and all(t.state != component[0] for t in transitions[component[0]]):
+        _choose_best(component[0], transitions, values, endings, best)
+        return
+
+    # Цикл: начинаем с game over и поднимаем значения, пока есть что улучшить. Обновляем только
+    # при строгом улучшении, поэтому лучшие переходы ведут к выходу из цикла, а не по кругу
+    for state in component:
+        values[state], endings[state] = GAME_OVER_SCORE, "game_over"
+    changed = True
+    while changed:
+        changed = False
+        for state in component:
+            for transition in transitions[state]:
+                value, ending = _transition_value(transition, values, endings)
+                if value > values[state] + _EPSILON:
+                    values[state], endings[state], best[state] = value, ending, transition
+                    changed = True
+
+    # Из цикла нет выхода лучше game over - берем первый лучший переход, как для обычных состояний
+    for state in component:
+        if state not in best:
+            _choose_best(state, transitions, values, endings, best)
+
+
+def _choose_best(state: StoryState, transitions: dict, values: dict, endings: dict, best: dict):
+    best_value, best_ending, best_transition = None, "game_over", None
+    for transition in transitions[state]:
+        value, ending = _transition_value(transition, values, endings)
+        if best_value is None or value > best_value + _EPSILON:
+            best_value, best_ending, best_transition = value, ending, transition
+
+    values[state], endings[state] = best_value, best_ending
+    best[state] = best_transition
+
+
+def _transition_value(transition, values: Dict[StoryState, float], endings: Dict[StoryState, str]) -> Tuple[float, str]:
+    child = transition.state
+    if child is None:
+        return GAME_OVER_SCORE, "game_over"
+    return values[child], endings[child]
+
+
+def _collect(start: StoryState, values: dict, endings: dict, best: dict, transitions: dict) -> PolicyResult:
+    policy = {}
+    regrets: Dict[str, ChoiceRegret] = {}
+
+    for state, outgoing in transitions.items():
+        best_transition = best[state]
+        if best_transition.choice_id is None:
+            continue
+        policy[state] = best_transition.choice_id
+
+        for transition in outgoing:
+            value, _ = _transition_value(transition, values, endings)
+            regret = max(values[state] - value, 0.0)
+
+            stats = regrets.setdefault(transition.choice_id, ChoiceRegret(transition.choice_id))
+            stats.available += 1
+            stats.total_regret += regret
+            stats.max_regret = max(stats.max_regret, regret)
+            if regret <= _EPSILON:
+                stats.optimal += 1
+
+    # Оптимальная стратегия - идем от старта по лучшим переходам
+    strategy = []
+    state: Optional[StoryState] = start
+    visited = set()
+    while state is not None and state in best and state not in visited:
+        visited.add(state)
+        transition = best[state]
+        if transition.choice_id is not None:
+            strategy.append(transition.choice_id)
+        state = transition.state
+
+    return PolicyResult(
+        best_score=values[start],
+        ending=endings[start],
+        strategy=strategy,
+        values=values,
+        policy=policy,
+        regrets=dict(sorted(regrets.items())),
+    )
+
+
+if __name__ == "__main__":
+    # python -m Game.scripts.PolicySolver
+    from Game.scripts.GameStateManager import GameStateManager
+
+    parser = argparse.ArgumentParser(description="Оптимальная стратегия и сожаление (regret) каждого выбора")
+    parser.add_argument("--dominated", action="store_true", help="Показать только выборы, которые ни разу не лучшие")
+    args = parser.parse_args()
+
+    manager = GameStateManager.shared()
+
+    result = solve_policy(manager)
+    print("=" * 60)
+    print(f"🏆 Лучший балл: {result.best_score:.1f} ({result.ending}), состояний: {len(result.values)}")
+    print(f"   Стратегия: {' -> '.join(result.strategy)}")
+    print("-" * 60)
+    print(f"{'Выбор':<8}{'Доступен':>10}{'Лучший':>8}{'Ср. regret':>12}{'Макс. regret':>14}")
+    for stats in result.regrets.values():
+        if args.dominated and not stats.dominated:
+            continue
+        mark = " ⚠️" if stats.dominated else ""
+        print(f"{stats.choice_id:<8}{stats.available:>10}{stats.optimal:>8}"
+              f"{stats.mean_regret:>12.2f}{stats.max_regret:>14.2f}{mark}")
+    print("=" * 60)
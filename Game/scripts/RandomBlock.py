@@ -0,0 +1,54 @@
+# Game/scripts/RandomBlock.py
+from typing import List, Optional, Union
+
+from Game.scripts.TextBlock import TextBlock
+
+
+class RandomBlock(TextBlock):
+    """Случайный переход: среди веток с выполненными условиями тянется одна по весам.
+
+    Ветки без веса получают вес 1. Текст необязателен - без него блок проходится молча.
+    """
+
+    type_tag = "random"
+
+    def __init__(self,
+                 block_id: str,
+                 next_block: Union[str, List[Union[str, dict]], None],
+                 body: str = "",
+                 previous_block: Union[str, List[str], None] = None,
+                 conditions: Optional[str] = None):
+        super().__init__(block_id, body, _weighted(next_block), previous_block, conditions)
+
+    def display(self, engine: 'GameEngine'):
+        if self.body:
+            super().display(engine)
+
+    @classmethod
+    def from_dict(cls, block_id: str, data: dict):
+        return cls(
+            block_id=block_id,
+            next_block=data.get("next_block"),
+            body=data.get("body", ""),
+            previous_block=data.get("previous_block"),
+            conditions=data.get("conditions")
+        )
+
+    def to_dict(self):
+        return {"type": self.type_tag, **super().to_dict()}
+
+
+def _weighted(next_block) -> list:
+    """Список веток, у каждой из которых есть вес (иначе таблица ветвлений не случайная)"""
+    if isinstance(next_block, str):
+        next_block = [next_block]
+    if not isinstance(next_block, list):
+        return []
+
+    branches = []
+    for entry in next_block:
+        if isinstance(entry, str) and entry:
+            branches.append({"block": entry, "weight": 1})
+        elif isinstance(entry, dict):
+            branches.append(entry if entry.get("weight") is not None else {**entry, "weight": 1})
+    return branches
@@ -0,0 +1,261 @@
+# Game/scripts/SaveBackend.py
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from Game import config
+
+
+class SaveBackend(ABC):
+    """Абстрактное хранилище сохранений: слот (строка "1", "2", ...) -> данные игрока или None"""
+
+    def __init__(self, slot_count: int):
+        self.slot_count = slot_count
+
+    @abstractmethod
+    def load(self) -> Dict[str, Optional[dict]]:
+        """Загружает все слоты (пустые слоты - None)"""
+        pass
+
+    @abstractmethod
+    def save_many(self, slots: Dict[str, Optional[dict]]):
+        """Сохраняет несколько слотов одной операцией"""
+        pass
+
+    def save(self, slot: str, data: Optional[dict]):
+        """Сохраняет один слот"""
+        self.save_many({slot: data})
+
+    def close(self):
+        pass
+
+    def _default_data(self) -> Dict[str, Optional[dict]]:
+        return {str(i): None for i in range(1, self.slot_count + 1)}
+
+
+class MemorySaveBackend(SaveBackend):
+    """Сохранения только в памяти процесса (прогоны сценариев, тесты)"""
+
+    def __init__(self, slot_count: int, data: Optional[Dict[str, Optional[dict]]] = None):
+        super().__init__(slot_count)
+        self._data = self._default_data()
+        if data:
+            self._data.update(data)
+
+    def load(self) -> Dict[str, Optional[dict]]:
+        return dict(self._data)
+
+    def save_many(self, slots: Dict[str, Optional[dict]]):
+        self._data.update(slots)
+
+
+class JsonSaveBackend(SaveBackend):
+    """Все слоты в одном JSON файле. Файл перезаписывается атомарно через временный файл."""
+
+    def __init__(self, path: str, slot_count: int):
+        super().__init__(slot_count)
+        self.path = path
+        self._data: Dict[str, Optional[dict]] = {}
+        self._lock = threading.Lock()
+
+    def load(self) -> Dict[str, Optional[dict]]:
+        """Безопасная загрузка данных"""
+        self._data = self._load_safe()
+        return dict(self._data)
+
+    def _load_safe(self) -> Dict[str, Optional[dict]]:
+        try:
+            # Если файла нет, создаем новый
+            if not os.path.exists(self.path):
+                return self._create_default()
+
+            # Пытаемся прочитать файл
+            with open(self.path, 'r', encoding="utf-8") as file:
+                content = file.read().strip()
+
+            # Если файл пустой, создаем новый
+            if not content:
+                return self._create_default()
+
+            # Пытаемся загрузить JSON
+            loaded_data = json.loads(content)
+
+            # Проверяем, что это словарь
+            if not isinstance(loaded_data, dict):
+                print(f"Некорректная структура в {self.path}, создаем новую...")
+                return self._replace_unreadable()
+
+            # Добавляем недостающие слоты
+            for i in range(1, self.slot_count + 1):
+                if str(i) not in loaded_data:
+                    loaded_data[str(i)] = None
+
+            return loaded_data
+
+        except json.JSONDecodeError:
+            print(f"Ошибка JSON в файле {self.path}, создаем новую структуру...")
+            return self._replace_unreadable()
+
+        except Exception as e:
+            print(f"Ошибка при загрузке {self.path}: {e}")
+            return self._replace_unreadable()
+
+    def _replace_unreadable(self) -> Dict[str, Optional[dict]]:
+        """Откладывает нечитаемый файл в сторону и только потом создает новый.
+
+        Если отложить не удалось, пустые слоты не пишутся - иначе пропала бы единственная копия.
+        """
+        corrupt_path = f"{self.path}.corrupt-{time.strftime('%Y%m%d-%H%M%S')}"
+        try:
+            os.replace(self.path, corrupt_path)
+        except OSError as e:
+            raise RuntimeError(f"Файл сохранений {self.path} не читается и не может быть отложен ({e}); "
+                               f"исправьте или уберите его вручную") from e
+        print(f"Старый файл сохранен как {corrupt_path}")
+        return self._create_default()
+
+    def _create_default(self) -> Dict[str, Optional[dict]]:
+        """Создает структуру данных по умолчанию"""
+        data = self._default_data()
+
+        # Сохраняем в файл
+        try:
+            self._write(data)
+            print(f"Создан новый файл {self.path}")
+        except Exception as e:
+            print(f"Не удалось сохранить дефолтные данные: {e}")
+
+        return data
+
+    def save_many(self, slots: Dict[str, Optional[dict]]):
+        with self._lock:
+            self._data.update(slots)
+            self._write(self._data)
+
+    def _write(self, data: Dict[str, Optional[dict]]):
+        # Пишем во временный файл и подменяем им старый: при сбое остается целый прежний файл
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding="utf-8") as file:
+            json.dump(data, file, ensure_ascii=False, indent=4)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.path)
+
+
+class SqliteSaveBackend(SaveBackend):
+    """Сохранения в SQLite (режим WAL): одна строка на слот, индексы по имени и прогрессу"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS saves (
+            slot TEXT PRIMARY KEY,
+            name TEXT,
+            progress INTEGER NOT NULL DEFAULT 0,
+            current_block_id TEXT,
+            time_left INTEGER,
+            data TEXT,
+            updated_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_saves_name ON saves(name);
+        CREATE INDEX IF NOT EXISTS idx_saves_progress ON saves(progress);
+    """
+
+    def __init__(self, path: str, slot_count: int):
+        super().__init__(slot_count)
+        self.path = path
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(self.SCHEMA)
+
+    def load(self) -> Dict[str, Optional[dict]]:
+        data = self._default_data()
+        with self._lock:
+            rows = self._connection.execute("SELECT slot, data FROM saves").fetchall()
+        for slot, payload in rows:
+            try:
+                data[slot] = json.loads(payload) if payload else None
+            except json.JSONDecodeError:
+                print(f"Поврежденное сохранение в слоте {slot}, слот очищен")
+                data[slot] = None
+        return data
+
+    @staticmethod
+    def _row(slot: str, data: Optional[dict]) -> tuple:
+        if data is None:
+            return slot, None, 0, None, None, None, time.time()
+        return (
+            slot,
+            data.get("name"),
+            len(data.get("choices_history", [])),
+            data.get("current_block_id"),
+            data.get("time_left"),
+            json.dumps(data, ensure_ascii=False),
+            time.time(),
+        )
+
+    def save_many(self, slots: Dict[str, Optional[dict]]):
+        """Все слоты пишутся в одной транзакции"""
+        rows = [self._row(slot, data) for slot, data in slots.items()]
+        with self._lock:
+            with self._connection:
+                self._connection.execute("BEGIN")
+                self._connection.executemany(
+                    "INSERT INTO saves (slot, name, progress, current_block_id, time_left, data, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(slot) DO UPDATE SET name=excluded.name, progress=excluded.progress, "
+                    "current_block_id=excluded.current_block_id, time_left=excluded.time_left, "
+                    "data=excluded.data, updated_at=excluded.updated_at",
+                    rows,
+                )
+
+    def iter_slots(self, batch_size: int = 256) -> Iterator[Tuple[str, Optional[dict]]]:
+        """Перебирает слоты пачками по ключу, не держа в памяти всю таблицу"""
+        last_slot = ""
+        while True:
+            with self._lock:
+                rows = self._connection.execute(
+                    "SELECT slot, data FROM saves WHERE slot > ? ORDER BY slot LIMIT ?",
+                    (last_slot, batch_size)).fetchall()
+            if not rows:
+                return
+            for slot, payload in rows:
+                yield slot, json.loads(payload) if payload else None
+            last_slot = rows[-1][0]
+
+    def find_by_name(self, name: str) -> List[str]:
+        """Слоты игроков с таким именем"""
+        with self._lock:
+            rows = self._connection.execute("SELECT slot FROM saves WHERE name = ? ORDER BY slot", (name,)).fetchall()
+        return [row[0] for row in rows]
+
+    def top_progress(self, limit: int = 10) -> List[tuple]:
+        """Слоты с наибольшим количеством сделанных выборов: (слот, имя, прогресс)"""
+        with self._lock:
+            return self._connection.execute(
+                "SELECT slot, name, progress FROM saves WHERE data IS NOT NULL ORDER BY progress DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+def create_save_backend(json_path: str, slot_count: int, kind: str = None) -> SaveBackend:
+    """Создает хранилище сохранений по настройке SAVE_BACKEND"""
+    kind = kind or config.SAVE_BACKEND
+    if kind == "sqlite":
+        return SqliteSaveBackend(config.SAVES_DB_PATH, slot_count)
+    if kind == "json":
+        return JsonSaveBackend(json_path, slot_count)
+    if kind == "memory":
+        return MemorySaveBackend(slot_count)
+    raise ValueError(f"Неизвестное хранилище сохранений: {kind}")
@@ -0,0 +1,246 @@
+# Game/scripts/SaveMigration.py
+import argparse
+import difflib
+import json
+import os
+from itertools import islice
+from multiprocessing import Pool
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from Game import config
+from Game.scripts.BranchTable import link_targets
+from Game.scripts.GameStateManager import GameStateManager
+from Game.utils.JsonStream import iter_object_items
+
+# Перенос сохранений на новую версию сюжета.
+#
+#   python -m Game.scripts.SaveMigration --old old_data/ [--new Game/data] [--saves Game/data/player_data.json] [-j 4]
+#
+# Сначала строится соответствие ID старой версии -> ID новой: совпавшие ID остаются как есть,
+# пропавшие ищутся среди новых по похожести текста, а блоки, для которых пары не нашлось,
+# переезжают на ближайший сохранившийся блок дальше по сюжету. Затем сохранения
+# переписываются потоком пачками по BATCH_SIZE в нескольких процессах.
+
+SIMILARITY_THRESHOLD = 0.6
+BATCH_SIZE = 256
+
+SlotEntry = Tuple[str, Optional[dict]]
+
+
+def load_version(data_dir: str) -> GameStateManager:
+    """Загружает версию сюжета из трех JSON файлов папки"""
+    manager = GameStateManager()
+    manager.load_choices(os.path.join(data_dir, config.CHOICES_FILE))
+    manager.load_text_blocks(os.path.join(data_dir, config.NARRATIVE_FILE))
+    manager.load_choice_blocks(os.path.join(data_dir, config.CHOICE_BLOCKS_FILE))
+    return manager
+
+
+# ============================================
+# СООТВЕТСТВИЕ ID
+# ============================================
+
+def _block_text(manager: GameStateManager, block_id: str) -> str:
+    block = manager.text_blocks.get(block_id) or manager.choice_blocks.get(block_id)
+    return json.dumps(block.to_dict(), sort_keys=True, ensure_ascii=False) if block else ""
+
+
+def _choice_text(manager: GameStateManager, choice_id: str) -> str:
+    choice = manager.choices.get(choice_id)
+    return f"{choice.name}\n{choice.description}" if choice else ""
+
+
+def _match_by_content(missing: List[str], candidates: List[str], old_text, new_text) -> Dict[str, str]:
+    """Жадно сопоставляет пропавшие ID с новыми по похожести содержимого"""
+    pairs = []
+    for old_id in missing:
+        matcher = difflib.SequenceMatcher(autojunk=False)
+        matcher.set_seq2(old_text(old_id))
+        for new_id in candidates:
+            matcher.set_seq1(new_text(new_id))
+            if matcher.real_quick_ratio() < SIMILARITY_THRESHOLD or matcher.quick_ratio() < SIMILARITY_THRESHOLD:
+                continue
+            ratio = matcher.ratio()
+            if ratio >= SIMILARITY_THRESHOLD:
+                pairs.append((ratio, old_id, new_id))
+
+    mapping = {}
+    used = set()
+    for ratio, old_id, new_id in sorted(pairs, reverse=True):
+        if old_id not in mapping and new_id not in used:
+            mapping[old_id] = new_id
+            used.add(new_id)
+    return mapping
+
+
+def _surviving_block(old: GameStateManager, new: GameStateManager, block_id: str, mapping: Dict[str, str]) -> str:
+    """Ближайший блок дальше по старому сюжету, который есть в новом"""
+    visited = set()
+    queue = [block_id]
+    while queue:
+        current_id = queue.pop(0)
+        if current_id in visited:
+            continue
+        visited.add(current_id)
+        if current_id != block_id and current_id in mapping:
+            return mapping[current_id]
+        if current_id != block_id and new.get_block(current_id) is not None:
+            return current_id
+
+        block = old.get_block(current_id)
+        if block is None:
+            continue
+        if current_id in old.choice_blocks:
+            for choice_id in block.available_choices:
+                choice = old.get_choice(choice_id)
+                if choice is not None:
+                    queue.extend(link_targets(choice.next_block))
+        else:
+            queue.extend(link_targets(block.next_block))
+    return config.START_BLOCK_ID
+
+
+def build_id_mapping(old: GameStateManager, new: GameStateManager) -> Dict[str, Dict[str, str]]:
+    """Соответствие ID блоков и выборов старой версии сюжета новой (только изменившиеся ID)"""
+    old_blocks = set(old.text_blocks) | set(old.choice_blocks)
+    new_blocks = set(new.text_blocks) | set(new.choice_blocks)
+
+    blocks = _match_by_content(sorted(old_blocks - new_blocks), sorted(new_blocks - old_blocks),
+                               lambda block_id: _block_text(old, block_id),
+                               lambda block_id: _block_text(new, block_id))
+    for block_id in sorted(old_blocks - new_blocks):
+        if block_id not in blocks:
+            blocks[block_id] = _surviving_block(old, new, block_id, blocks)
+
+    choices = _match_by_content(sorted(set(old.choices) - set(new.choices)),
+                                sorted(set(new.choices) - set(old.choices)),
+                                lambda choice_id: _choice_text(old, choice_id),
+                                lambda choice_id: _choice_text(new, choice_id))
+    return {"blocks": blocks, "choices": choices}
+
+
+# ============================================
+# ПЕРЕЗАПИСЬ СОХРАНЕНИЙ
+# ============================================
+
+_worker_mapping: Dict[str, Dict[str, str]] = {}
+_worker_hash: Optional[str] = None
+
+
+def _init_worker(mapping: Dict[str, Dict[str, str]], story_hash: str):
+    global _worker_mapping, _worker_hash
+    _worker_mapping, _worker_hash = mapping, story_hash
+
+
+def migrate_save(data: Optional[dict], mapping: Dict[str, Dict[str, str]], story_hash: str) -> Optional[dict]:
+    """Переводит одно сохранение на новую версию сюжета"""
+    if data is None or data.get("story_hash") == story_hash:
+        return data
+
+    blocks, choices = mapping["blocks"], mapping["choices"]
+    migrated = dict(data)
+    block_id = data.get("current_block_id")
+    if block_id in blocks:
+        migrated["current_block_id"] = blocks[block_id]
+    migrated["choices_history"] = [choices.get(choice_id, choice_id) for choice_id in data.get("choices_history", [])]
+    migrated["story_hash"] = story_hash
+    return migrated
+
+
+def _migrate_batch(batch: List[SlotEntry]) -> List[SlotEntry]:
+    return [(slot, migrate_save(data, _worker_mapping, _worker_hash)) for slot, data in batch]
+
+
+def _batches(entries: Iterable[SlotEntry], size: int) -> Iterator[List[SlotEntry]]:
+    iterator = iter(entries)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _migrate_stream(entries: Iterable[SlotEntry], mapping, story_hash: str, workers: int) -> Iterator[SlotEntry]:
+    """Переводит поток слотов; в памяти одновременно не больше workers * 2 пачек"""
+    if workers <= 1:
+        for slot, data in entries:
+            yield slot, migrate_save(data, mapping, story_hash)
+        return
+
+    with Pool(workers, initializer=_init_worker, initargs=(mapping, story_hash)) as pool:
+        batches = _batches(entries, BATCH_SIZE)
+        while True:
+            window = list(islice(batches, workers * 2))
+            if not window:
+                return
+            for batch in pool.map(_migrate_batch, window):
+                yield from batch
+
+
+def migrate_json_saves(path: str, mapping, story_hash: str, workers: int = 1) -> int:
+    """Переписывает JSON файл сохранений потоком через временный файл"""
+    temp_path = f"{path}.migrating"
+    count = 0
+    try:
+        with open(temp_path, 'w', encoding="utf-8") as out:
+            out.write("{")
+            entries = iter_object_items(path)
+            for slot, data in _migrate_stream(entries, mapping, story_hash, workers):
+                out.write("," if count else "")
+                out.write(f"\n    {json.dumps(slot, ensure_ascii=False)}: ")
+                out.write(json.dumps(data, ensure_ascii=False))
+                count += 1
+            out.write("\n}\n")
+    except BaseException:
+        # Исходный файл не тронут, недописанную копию убираем
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    os.replace(temp_path, path)
+    return count
+
+
+def migrate_sqlite_saves(backend, mapping, story_hash: str, workers: int = 1) -> int:
+    """Переписывает сохранения в SQLite пачками (каждая пачка - одна транзакция)"""
+    count = 0
+    for batch in _batches(_migrate_stream(backend.iter_slots(BATCH_SIZE), mapping, story_hash, workers), BATCH_SIZE):
+        backend.save_many(dict(batch))
+        count += len(batch)
+    return count
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Перенос сохранений на новую версию сюжета")
+    parser.add_argument("--old", required=True, help="Папка со старой версией сюжета")
+    parser.add_argument("--new", default=config.DATA_DIR, help="Папка с новой версией сюжета")
+    parser.add_argument("--saves", default=None, help="JSON файл сохранений (по умолчанию из DataManager)")
+    parser.add_argument("--sqlite", action="store_true", help="Переносить сохранения из базы SAVES_DB_PATH")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="Количество процессов")
+    parser.add_argument("--dry-run", action="store_true", help="Только показать соответствие ID")
+    args = parser.parse_args(argv)
+
+    old, new = load_version(args.old), load_version(args.new)
+    mapping = build_id_mapping(old, new)
+    story_hash = new.content_hash()
+
+    print("🔁 Соответствие ID:")
+    for kind in ("blocks", "choices"):
+        for old_id, new_id in sorted(mapping[kind].items()):
+            print(f"   {old_id} -> {new_id}")
+    if args.dry_run:
+        return
+
+    if args.sqlite:
+        from Game.scripts.SaveBackend import SqliteSaveBackend
+        backend = SqliteSaveBackend(config.SAVES_DB_PATH, config.MAX_PLAYER_SLOTS)
+        count = migrate_sqlite_saves(backend, mapping, story_hash, args.jobs)
+        backend.close()
+    else:
+        from Game.scripts.DataManager import PATH_PLAYER
+        count = migrate_json_saves(args.saves or PATH_PLAYER, mapping, story_hash, args.jobs)
+
+    print(f"✅ Обработано слотов: {count}")
+
+
+if __name__ == "__main__":
+    main()
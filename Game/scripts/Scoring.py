@@ -0,0 +1,42 @@
+# Game/scripts/Scoring.py
+from typing import Dict, Tuple
+
+from Game import config
+
+# Флаги еды: если ни одного нет - концовка с обмороком
+EAT_FLAGS = ("eat_1", "eat_2", "eat_3")
+
+
+def evaluate_ending(flags: Dict[str, bool], time_left: int) -> Tuple[str, float, bool]:
+    """Считает итог игры: (тип концовки, итоговый балл, опоздал ли игрок)"""
+    # Рассчитываем время прибытия
+    minutes_passed = config.START_TIME - time_left
+    arrival_time = config.START_TIME + minutes_passed
+
+    # Проверяем, опоздал ли игрок
+    is_late = arrival_time > config.DEADLINE_TIME
+
+    # Если игрок ни разу не поел - концовка 1 (обморок)
+    if not any(flags.get(flag, False) for flag in EAT_FLAGS):
+        return "fainting", 0.0, is_late
+
+    # Подсчитываем общий счет из конфига
+    total_score = 0.0
+    for flag, value in config.SCORE_VALUES.items():
+        if flag == "late_penalty":
+            continue  # Штраф за опоздание обрабатываем отдельно
+        if flags.get(flag, False):
+            total_score += value
+
+    # Штраф за опоздание
+    if is_late:
+        total_score += config.SCORE_VALUES.get("late_penalty", -2.0)
+
+    # Определяем концовку
+    if total_score < config.SCORE_THRESHOLDS["bad"]:
+        return "bad", total_score, is_late
+    elif total_score < config.SCORE_THRESHOLDS["good"]:
+        return "good", total_score, is_late
+    elif total_score < config.SCORE_THRESHOLDS["excellent"]:
+        return "good", total_score, is_late
+    return "excellent", total_score, is_late
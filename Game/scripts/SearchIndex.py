@@ -0,0 +1,237 @@
+# Game/scripts/SearchIndex.py
+import re
+import sys
+import time
+from bisect import bisect_left
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+# Поиск по тексту сюжета: тела блоков, названия и описания выборов, флаги и условия.
+#
+#   python -m Game.scripts.SearchIndex шаурм*
+#   python -m Game.scripts.SearchIndex "читай город"
+#
+# Слова приводятся к нижнему регистру, "ё" считается "е". Слово со звездочкой в конце ищется
+# по префиксу, запрос в кавычках - как фраза (слова подряд), иначе нужны все слова запроса.
+
+_TOKEN_RE = re.compile(r"\w+")
+
+DocKey = Tuple[str, str, str]  # (вид: block | choice, ID, поле)
+
+
+def normalize(text: str) -> str:
+    return text.casefold().replace("ё", "е")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(normalize(text))
+
+
+class SearchHit(NamedTuple):
+    kind: str
+    id: str
+    field: str
+    snippet: str
+
+
+class SearchIndex:
+    """Инвертированный индекс: слово -> документ -> позиции слова в нем"""
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[DocKey, List[int]]] = {}
+        self._doc_terms: Dict[DocKey, Set[str]] = {}
+        self._texts: Dict[DocKey, str] = {}
+        self._sources: Dict[Tuple[str, str], object] = {}  # (вид, ID) -> проиндексированный объект
+        self._sorted_terms: Optional[List[str]] = None  # Для поиска по префиксу, строится лениво
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    # ---------- Построение ----------
+
+    def add_document(self, key: DocKey, text: Optional[str]):
+        self.remove_document(key)
+        if not text:
+            return
+
+        terms = set()
+        for position, token in enumerate(tokenize(text)):
+            self._postings.setdefault(token, {}).setdefault(key, []).append(position)
+            terms.add(token)
+        self._doc_terms[key] = terms
+        self._texts[key] = text
+        self._sorted_terms = None
+
+    def remove_document(self, key: DocKey):
+        terms = self._doc_terms.pop(key, None)
+        if terms is None:
+            return
+        self._texts.pop(key, None)
+        for term in terms:
+            docs = self._postings.get(term)
+            if docs is not None:
+                docs.pop(key, None)
+                if not docs:
+                    del self._postings[term]
+        self._sorted_terms = None
+
+    def _index_object(self, kind: str, object_id: str, fields: Dict[str, Optional[str]]):
+        for field, text in fields.items():
+            self.add_document((kind, object_id, field), text)
+
+    def _drop_object(self, kind: str, object_id: str, fields: Tuple[str, ...]):
+        for field in fields:
+            self.remove_document((kind, object_id, field))
+
+    def sync(self, state_manager) -> int:
+        """Доводит индекс до текущих таблиц сюжета; переиндексирует только измененные объекты.
+
+        Блоки и выборы не изменяются на месте (перезагрузка создает новые объекты),
+        поэтому измененный объект узнается по идентичности. Возвращает число переиндексированных.
+        """
+        return self.sync_tables(list(state_manager.text_blocks.items()), list(state_manager.choice_blocks.items()),
+                                list(state_manager.choices.items()))
+
+    def sync_tables(self, text_blocks, choice_blocks, choices, remember: bool = True) -> int:
+        """То же для произвольных пар (ID, объект).
+
+        remember=False - объекты не держим в памяти: сюжет по главам каждый раз читается
+        из файлов заново, сравнивать его по идентичности не с чем.
+        """
+        current = {}
+        for block_id, block in text_blocks:
+            current[("block", block_id)] = block
+        for block_id, block in choice_blocks:
+            current[("block", block_id)] = block
+        for choice_id, choice in choices:
+            current[("choice", choice_id)] = choice
+
+        for key in [key for key in self._sources if key not in current]:
+            self._drop_object(*key, fields=_FIELDS[key[0]])
+            del self._sources[key]
+
+        changed = 0
+        for key, source in current.items():
+            if self._sources.get(key) is source:
+                continue
+            self._index_object(*key, fields=_fields_of(key[0], source))
+            self._sources[key] = source if remember else None
+            changed += 1
+        return changed
+
+    # ---------- Поиск ----------
+
+    def _terms_with_prefix(self, prefix: str) -> List[str]:
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self._postings)
+        terms = self._sorted_terms
+        result = []
+        for index in range(bisect_left(terms, prefix), len(terms)):
+            if not terms[index].startswith(prefix):
+                break
+            result.append(terms[index])
+        return result
+
+    def _postings_for(self, word: str) -> Dict[DocKey, List[int]]:
+        """Документы с позициями для слова запроса (слово* - по префиксу)"""
+        if word.endswith("*"):
+            merged: Dict[DocKey, List[int]] = {}
+            for term in self._terms_with_prefix(word[:-1]):
+                for key, positions in self._postings[term].items():
+                    merged.setdefault(key, []).extend(positions)
+            return merged
+        return self._postings.get(word, {})
+
+    def search(self, query: str, limit: int = 20) -> List[SearchHit]:
+        """Ищет документы, в которых есть все слова запроса (или фраза, если запрос в кавычках)"""
+        query = query.strip()
+        phrase = len(query) > 1 and query[0] == query[-1] == '"'
+        words = [normalize(word) for word in re.findall(r"\w+\*?", query)]
+        if not words:
+            return []
+
+        postings = [self._postings_for(word) for word in words]
+        # Пересекаем начиная с самого редкого слова (порядок postings нужен фразе)
+        ordered = sorted(postings, key=len)
+        keys = set(ordered[0])
+        for docs in ordered[1:]:
+            keys &= docs.keys()
+            if not keys:
+                return []
+
+        hits = []
+        for key in sorted(keys):
+            if phrase and not self._has_phrase(key, postings):
+                continue
+            hits.append(SearchHit(key[0], key[1], key[2], self._snippet(key, words)))
+            if len(hits) >= limit:
+                break
+        return hits
+
+    @staticmethod
+    def _has_phrase(key: DocKey, postings: List[Dict[DocKey, List[int]]]) -> bool:
+        starts = set(postings[0][key])
+        for offset, docs in enumerate(postings[1:], 1):
+            starts &= {position - offset for position in docs[key]}
+            if not starts:
+                return False
+        return True
+
+    def _snippet(self, key: DocKey, words: List[str], width: int = 80) -> str:
+        text = self._texts[key].replace("\n", " ")
+        normalized = normalize(text)
+        start = normalized.find(words[0].rstrip("*"))
+        start = max(0, start - width // 3) if start >= 0 else 0
+        snippet = text[start:start + width]
+        return ("…" if start else "") + snippet + ("…" if start + width < len(text) else "")
+
+
+_FIELDS = {
+    "block": ("body", "conditions"),
+    "choice": ("name", "description", "end_description", "flag", "condition"),
+}
+
+
+def _fields_of(kind: str, source) -> Dict[str, Optional[str]]:
+    if kind == "block":
+        # У текстового блока ищем по телу, у блока с выбором - по заголовку
+        return {
+            "body": getattr(source, "body", None) or getattr(source, "name", None),
+            "conditions": getattr(source, "conditions", None),
+        }
+    return {
+        "name": source.name,
+        "description": source.description,
+        "end_description": source.end_description,
+        "flag": source.given_flag or None,
+        "condition": " ".join(filter(None, (source.condition, source.end_condition))) or None,
+    }
+
+
+def format_hits(hits: List[SearchHit]) -> List[str]:
+    return [f"[{hit.kind} {hit.id} / {hit.field}] {hit.snippet}" for hit in hits]
+
+
+def main(argv: List[str] = None):
+    from Game.scripts.GameStateManager import GameStateManager
+
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("Использование: python -m Game.scripts.SearchIndex <запрос>")
+        return
+
+    manager = GameStateManager.shared()
+    started = time.perf_counter()
+    index = manager.search_index()
+    built = time.perf_counter() - started
+
+    started = time.perf_counter()
+    hits = index.search(" ".join(argv))
+    elapsed = time.perf_counter() - started
+
+    for line in format_hits(hits):
+        print(line)
+    print(f"Найдено: {len(hits)} за {elapsed * 1e6:.0f} мкс (индекс: {len(index)} полей за {built * 1000:.1f} мс)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+# Game/scripts/SessionPool.py
+import json
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Hashable, Iterator, Optional, Tuple
+
+from Game import config
+from Game.scripts.Player import Player
+from Game.utils import Metrics
+from Game.utils.MemoryReport import deep_sizeof
+
+# Пул сессий для хоста, который держит много игроков в одном процессе.
+#
+# Пока игрок читает длинный текст, его сессия простаивает. Через SESSION_IDLE_TIMEOUT секунд
+# простоя (или раньше, если резидентные сессии превысили SESSION_MEMORY_CAP) сессия
+# сериализуется в файл подкачки, а из памяти уходят её Player, инвентарь и закрепление главы.
+# Файл только дописывается; в памяти хранится смещение и длина записи каждой сессии, поэтому
+# восстановление - одно чтение, распаковка и Player.from_dict.
+#
+#   pool = SessionPool()
+#   pool.open(key, player)
+#   with pool.checkout(key) as session:   # пришел ввод игрока
+#       engine.process_choice(...)        # session.player - всегда живой объект
+#   pool.sweep()                          # или pool.start_sweeper()
+
+
+class Session:
+    """Резидентная сессия пула"""
+
+    __slots__ = ("key", "player", "extras", "last_active", "size", "pins")
+
+    def __init__(self, key: Hashable, player: Player, extras: Optional[dict], last_active: float):
+        self.key = key
+        self.player = player
+        self.extras = extras if extras is not None else {}  # Прочее состояние сессии (JSON)
+        self.last_active = last_active
+        self.size = 0  # Оценка занимаемой памяти (байт)
+        self.pins = 0  # Сколько checkout сейчас держат сессию
+
+
+class SessionPool:
+    """Сессии игроков с усыплением простаивающих в файл подкачки и LRU вытеснением"""
+
+    def __init__(self, spill_path: str = None, idle_timeout: float = None, memory_cap: int = None,
+                 chapter_store=None, clock: Callable[[], float] = time.monotonic):
+        self.spill_path = spill_path or config.SESSION_SPILL_PATH
+        self.idle_timeout = idle_timeout if idle_timeout is not None else config.SESSION_IDLE_TIMEOUT
+        self.memory_cap = memory_cap if memory_cap is not None else config.SESSION_MEMORY_CAP
+        self._chapter_store = chapter_store
+        self._clock = clock
+
+        # Резидентные сессии от самой давно активной к самой свежей
+        self._resident: "OrderedDict[Hashable, Session]" = OrderedDict()
+        self._resident_bytes = 0
+        self._spilled: Dict[Hashable, Tuple[int, int]] = {}  # Сессия -> (смещение, длина) записи
+        self._garbage = 0  # Байт файла, занятых устаревшими записями
+
+        self._lock = threading.RLock()
+        self._file = None
+        self._end = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def __len__(self) -> int:
+        return len(self._resident) + len(self._spilled)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._resident or key in self._spilled
+
+    @property
+    def resident_count(self) -> int:
+        return len(self._resident)
+
+    @property
+    def spilled_count(self) -> int:
+        return len(self._spilled)
+
+    @property
+    def resident_bytes(self) -> int:
+        return self._resident_bytes
+
+    def is_resident(self, key: Hashable) -> bool:
+        return key in self._resident
+
+    # ---------- Сессии ----------
+
+    def open(self, key: Hashable, player: Player, extras: Optional[dict] = None) -> Session:
+        """Добавляет сессию (или заменяет существующую с тем же ключом)"""
+        with self._lock:
+            self.close(key)
+            session = Session(key, player, extras, self._clock())
+            self._admit(session)
+            return session
+
+    def get(self, key: Hashable) -> Optional[Session]:
+        """Возвращает сессию, при необходимости восстанавливая её из файла, и отмечает активность"""
+        with self._lock:
+            session = self._resident.get(key)
+            if session is None:
+                if key not in self._spilled:
+                    return None
+                session = self._restore(key)
+            else:
+                self._resident.move_to_end(key)
+            session.last_active = self._clock()
+            return session
+
+    @contextmanager
+    def checkout(self, key: Hashable) -> Iterator[Session]:
+        """Сессия на время обработки ввода: пока она выдана, её не усыпят и не вытеснят"""
+        with self._lock:
+            session = self.get(key)
+            if session is None:
+                raise KeyError(key)
+            session.pins += 1
+        try:
+            yield session
+        finally:
+            with self._lock:
+                session.pins -= 1
+                session.last_active = self._clock()
+                # Сохраняем порядок по активности - на нем держится sweep
+                if self._resident.get(session.key) is session:
+                    self._resident.move_to_end(session.key)
+
+    def close(self, key: Hashable) -> Optional[Player]:
+        """Убирает сессию из пула (игрок вышел) и возвращает её игрока"""
+        with self._lock:
+            session = self._resident.pop(key, None)
+            if session is not None:
+                self._resident_bytes -= session.size
+                self._leave_chapter(key)
+                self._update_gauges()
+                return session.player
+
+            entry = self._spilled.pop(key, None)
+            if entry is None:
+                return None
+            self._garbage += entry[1]
+            player, _ = self._read(entry)
+            self._update_gauges()
+            return player
+
+    # ---------- Усыпление ----------
+
+    def hibernate(self, key: Hashable) -> bool:
+        """Записывает сессию в файл подкачки и освобождает память (занятые сессии не трогает)"""
+        with self._lock:
+            session = self._resident.get(key)
+            if session is None or session.pins:
+                return False
+
+            record = zlib.compress(json.dumps(
+                {"player": session.player.to_dict(), "extras": session.extras},
+                ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 1)
+            self._spilled[key] = (self._append(record), len(record))
+            del self._resident[key]
+            self._resident_bytes -= session.size
+            self._leave_chapter(key)
+            self._update_gauges()
+
+            if self._garbage > max(self._end - self._garbage, config.SESSION_SPILL_COMPACT_BYTES):
+                self.compact()
+            return True
+
+    def sweep(self, now: float = None) -> int:
+        """Усыпляет сессии, простаивающие дольше idle_timeout; возвращает их количество"""
+        now = self._clock() if now is None else now
+        deadline = now - self.idle_timeout
+        hibernated = 0
+        with self._lock:
+            # Сессии упорядочены по активности, поэтому просматриваем только просроченные
+            for key, session in list(self._resident.items()):
+                if session.last_active > deadline:
+                    break
+                if self.hibernate(key):
+                    hibernated += 1
+        return hibernated
+
+    def _admit(self, session: Session):
+        """Кладет сессию в память и вытесняет самые давно активные, пока не уложимся в лимит"""
+        session.size = deep_sizeof(session.player) + deep_sizeof(session.extras)
+        self._resident[session.key] = session
+        self._resident_bytes += session.size
+        if self._chapter_store is not None:
+            self._chapter_store.enter(session.key, session.player.current_block_id)
+
+        if self.memory_cap:
+            for key in list(self._resident):
+                if self._resident_bytes <= self.memory_cap:
+                    break
+                if key != session.key:
+                    self.hibernate(key)
+        self._update_gauges()
+
+    def _restore(self, key: Hashable) -> Session:
+        started = Metrics.start_timer()
+        entry = self._spilled.pop(key)
+        self._garbage += entry[1]
+        player, extras = self._read(entry)
+        session = Session(key, player, extras, self._clock())
+        self._admit(session)
+        Metrics.SESSION_RESTORE_LATENCY.observe_since(started)
+        return session
+
+    def _leave_chapter(self, key: Hashable):
+        if self._chapter_store is not None:
+            self._chapter_store.leave(key)
+
+    def _update_gauges(self):
+        Metrics.RESIDENT_SESSIONS.set(len(self._resident))
+        Metrics.SPILLED_SESSIONS.set(len(self._spilled))
+
+    # ---------- Файл подкачки ----------
+
+    def _open_file(self):
+        if self._file is None:
+            directory = os.path.dirname(self.spill_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Файл живет только пока жив пул - старое содержимое не нужно
+            self._file = open(self.spill_path, "w+b")
+            self._end = 0
+        return self._file
+
+    def _append(self, record: bytes) -> int:
+        file = self._open_file()
+        offset = self._end
+        file.seek(offset)
+        file.write(record)
+        file.flush()
+        self._end += len(record)
+        return offset
+
+    def _read(self, entry: Tuple[int, int]) -> Tuple[Player, dict]:
+        offset, length = entry
+        self._file.seek(offset)
+        data = json.loads(zlib.decompress(self._file.read(length)))
+        return Player.from_dict(data["player"]), data["extras"]
+
+    def compact(self):
+        """Переписывает файл подкачки без устаревших записей"""
+        with self._lock:
+            if self._file is None:
+                return
+            temp_path = f"{self.spill_path}.compact"
+            spilled = {}
+            offset = 0
+            with open(temp_path, "wb") as out:
+                for key, (old_offset, length) in self._spilled.items():
+                    self._file.seek(old_offset)
+                    out.write(self._file.read(length))
+                    spilled[key] = (offset, length)
+                    offset += length
+            self._file.close()
+            os.replace(temp_path, self.spill_path)
+            self._file = open(self.spill_path, "r+b")
+            self._spilled = spilled
+            self._end = offset
+            self._garbage = 0
+
+    # ---------- Фоновая проверка ----------
+
+    def start_sweeper(self, interval: float = None):
+        """Запускает фоновое усыпление простаивающих сессий"""
+        if self._thread is not None:
+            return
+        interval = interval if interval is not None else config.SESSION_SWEEP_INTERVAL
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="SessionPool", daemon=True)
+        self._thread.start()
+
+    def _run(self, interval: float):
+        while not self._stop_event.wait(interval):
+            self.sweep()
+
+    def shutdown(self):
+        """Останавливает фоновую проверку и удаляет файл подкачки"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                os.remove(self.spill_path)
@@ -0,0 +1,293 @@
+# Game/scripts/StoryGenerator.py
+import argparse
+import json
+import os
+import random
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from Game import config
+
+# Генератор больших синтетических сюжетов для нагрузочных тестов.
+#
+#   python -m Game.scripts.StoryGenerator --out /tmp/big --blocks 100000 --seed 7 [--verify]
+#
+# Сюжет - цепочка сцен: текстовый блок и (обычно) блок с выбором после него. Первый выбор
+# каждого блока безусловный и ведет в следующую сцену, поэтому от стартового блока до
+# END_BLOCK_ID всегда есть прохождение, а каждый блок достижим. Остальные выборы ведут
+# вперед через несколько сцен, ставят флаги, требуют условий, иногда возвращают в тот же
+# блок (circle) или заканчивают игру. Файлы пишутся потоком - в памяти держится одна сцена.
+
+_WORDS = (
+    "студент", "общежитие", "зачет", "чертеж", "альбом", "трамвай", "кафедра", "лестница", "утро",
+    "шаурма", "циркуль", "рейсшина", "одногруппник", "телефон", "коридор", "время", "дверь", "окно",
+    "быстро", "медленно", "внезапно", "опять", "почему-то", "снова", "тихо", "громко", "ещё",
+    "думает", "бежит", "смотрит", "вспоминает", "решает", "ждет", "слышит", "чертит", "спешит",
+)
+
+
+@dataclass
+class GeneratorSettings:
+    blocks: int = 1000  # Примерное число блоков (текстовых и с выбором)
+    branching: int = 3  # Выборов в блоке с выбором
+    flags: int = 50  # Сколько разных флагов выдают выборы
+    condition_terms: int = 2  # Сколько флагов/сравнений в условии выбора
+    circle_density: float = 0.05  # Доля выборов, возвращающих в тот же блок
+    body_words: int = 60  # Средняя длина текста блока в словах
+    choice_density: float = 0.8  # Доля сцен, в которых после текста есть выбор
+    ending_density: float = 0.01  # Доля выборов с условием завершения игры
+    lookahead: int = 5  # Насколько сцен вперед может перескочить выбор
+    seed: int = 0
+
+
+class _JsonObjectWriter:
+    """Пишет JSON объект {ключ: значение, ...} по одной записи"""
+
+    def __init__(self, path: str, wrapper: Optional[str] = None):
+        self._file = open(path, 'w', encoding="utf-8")
+        self._wrapper = wrapper
+        self._count = 0
+        self._file.write(f'{{\n  "{wrapper}": {{' if wrapper else "{")
+
+    def write(self, key: str, value: dict):
+        indent = "    " if self._wrapper else "  "
+        self._file.write("," if self._count else "")
+        self._file.write(f"\n{indent}{json.dumps(key)}: {json.dumps(value, ensure_ascii=False)}")
+        self._count += 1
+
+    def close(self):
+        self._file.write("\n  }\n}\n" if self._wrapper else "\n}\n")
+        self._file.close()
+
+
+class StoryGenerator:
+    """Генерирует сюжет по настройкам; одинаковые настройки и seed дают одинаковые файлы"""
+
+    def __init__(self, settings: GeneratorSettings):
+        self.settings = settings
+        self._random = random.Random(settings.seed)
+        # Сначала флаги, за которые начисляются баллы (как в Scoring), чтобы концовки различались
+        score_flags = [flag for flag in config.SCORE_VALUES if flag != "late_penalty"]
+        pool = score_flags[:settings.flags]
+        pool += [f"flag_{index:04d}" for index in range(settings.flags - len(pool))]
+        self._flags = pool
+        self._choice_counter = 0
+
+    # ---------- Содержимое ----------
+
+    def _body(self) -> str:
+        rnd = self._random
+        count = max(1, int(rnd.gauss(self.settings.body_words, self.settings.body_words / 4)))
+        words = [rnd.choice(_WORDS) for _ in range(count)]
+        if rnd.random() < 0.3:
+            words.insert(rnd.randrange(len(words)), "{name}")
+        if rnd.random() < 0.2:
+            words.insert(rnd.randrange(len(words)), "{time}")
+        sentences = []
+        while words:
+            length = rnd.randint(5, 14)
+            sentence = " ".join(words[:length])
+            sentences.append(sentence[0].upper() + sentence[1:] + rnd.choice((".", ".", "!", "...")))
+            words = words[length:]
+        return " ".join(sentences)
+
+    def _condition(self) -> Optional[str]:
+        rnd = self._random
+        terms = []
+        for _ in range(self.settings.condition_terms):
+            kind = rnd.random()
+            flag = rnd.choice(self._flags) if self._flags else None
+            if flag is None or kind < 0.15:
+                terms.append(f"time < {rnd.randint(15, 21)}:{rnd.choice(('00', '30'))}")
+            elif kind < 0.4:
+                terms.append(f"not {flag}")
+            else:
+                terms.append(flag)
+        if not terms:
+            return None
+        expression = terms[0]
+        for term in terms[1:]:
+            expression = f"{expression} {rnd.choice(('and', 'or'))} {term}"
+        return expression
+
+    def _next_choice_id(self) -> str:
+        self._choice_counter += 1
+        return f"{self._choice_counter:03d}"
+
+    # ---------- Структура ----------
+
+    def _scene_count(self) -> int:
+        # Сцена - текст и в choice_density случаев блок с выбором; плюс блок конца игры
+        return max(1, round((self.settings.blocks - 1) / (1 + self.settings.choice_density)))
+
+    @staticmethod
+    def _text_id(index: int) -> str:
+        return config.START_BLOCK_ID if index == 0 else f"text_{index:03d}"
+
+    def generate(self, out_dir: str) -> Dict[str, int]:
+        """Пишет три JSON файла сюжета в папку; возвращает количество блоков и выборов"""
+        settings = self.settings
+        rnd = self._random
+        os.makedirs(out_dir, exist_ok=True)
+        scenes = self._scene_count()
+        # Выборы на основном пути тратят время так, чтобы до конца хватало половины дня
+        spine_cost = max(0, (config.START_TIME // 2) // scenes)
+
+        texts = _JsonObjectWriter(os.path.join(out_dir, config.NARRATIVE_FILE))
+        blocks = _JsonObjectWriter(os.path.join(out_dir, config.CHOICE_BLOCKS_FILE), "choice_blocks")
+        choices = _JsonObjectWriter(os.path.join(out_dir, config.CHOICES_FILE), "choices")
+        counts = {"text_blocks": 0, "choice_blocks": 0, "choices": 0}
+
+        previous = None
+        try:
+            for index in range(scenes):
+                text_id = self._text_id(index)
+                following = self._text_id(index + 1) if index + 1 < scenes else config.END_BLOCK_ID
+                has_choice = index + 1 < scenes and rnd.random() < settings.choice_density
+
+                block_id = f"block_{index:03d}"
+                texts.write(text_id, {"body": self._body(), "previous_block": previous,
+                                      "next_block": block_id if has_choice else following})
+                counts["text_blocks"] += 1
+                previous = text_id
+                if not has_choice:
+                    continue
+
+                available = []
+                for number in range(settings.branching):
+                    choice_id = self._next_choice_id()
+                    available.append(choice_id)
+                    choices.write(choice_id, self._choice(number, block_id, index, scenes, following, spine_cost))
+                    counts["choices"] += 1
+                blocks.write(block_id, {"name": "Что вы выберете ?", "available_choices": available,
+                                        "previous_block": text_id})
+                counts["choice_blocks"] += 1
+                previous = block_id
+
+            texts.write(config.END_BLOCK_ID, {"body": self._body(), "previous_block": previous, "next_block": None})
+            counts["text_blocks"] += 1
+        finally:
+            texts.close()
+            blocks.close()
+            choices.close()
+        return counts
+
+    def _choice(self, number: int, block_id: str, index: int, scenes: int, following: str, spine_cost: int) -> dict:
+        rnd = self._random
+        settings = self.settings
+        choice = {"name": self._body()[:60].rstrip(" .!"), "description": self._body(), "time_cost": spine_cost,
+                  "condition": None, "given_flag": "", "next_block": following}
+        if number == 0:
+            return choice  # Основной путь: без условий, всегда доступен
+
+        choice["time_cost"] = rnd.randint(spine_cost, spine_cost * 3 + 5)
+        flag = rnd.choice(self._flags) if self._flags else ""
+        if rnd.random() < settings.circle_density and flag:
+            # Петля: можно пройти один раз, флаг закрывает повтор
+            choice.update(condition=f"not {flag}", given_flag=flag, next_block=block_id, circle=True)
+            return choice
+
+        choice["condition"] = self._condition()
+        choice["given_flag"] = flag if rnd.random() < 0.6 else ""
+        target = rnd.randint(index + 1, min(scenes - 1, index + settings.lookahead))
+        choice["next_block"] = self._text_id(target)
+        if rnd.random() < 0.1 and index + 2 < scenes:
+            # Иногда вместо одной цели - таблица ветвлений с запасной веткой
+            choice["next_block"] = [{"block": self._text_id(target), "condition": self._condition() or "True"},
+                                    following]
+        if rnd.random() < settings.ending_density:
+            choice["end_condition"] = self._condition() or "True"
+            choice["end"] = rnd.randint(1, 5)
+            choice["end_description"] = self._body()
+        return choice
+
+
+# ============================================
+# ПРОВЕРКА
+# ============================================
+
+def verify_story(state_manager: 'GameStateManager') -> List[str]:
+    """Проверяет, что сюжет проходим от начала до конца; возвращает найденные проблемы"""
+    from Game.scripts.StoryModel import StoryModel
+
+    model = StoryModel(state_manager)
+    block_ids = list(state_manager.text_blocks) + list(state_manager.choice_blocks)
+    forward: Dict[str, List[str]] = {block_id: [target for target, _ in model.block_links(block_id)]
+                                     for block_id in block_ids}
+    backward: Dict[str, List[str]] = {}
+    problems = []
+    for source, targets in forward.items():
+        for target in targets:
+            if target not in forward:
+                problems.append(f"{source} ссылается на несуществующий {target}")
+            backward.setdefault(target, []).append(source)
+
+    def reach(start: str, graph: Dict[str, List[str]]) -> set:
+        seen = {start}
+        queue = deque([start])
+        while queue:
+            for target in graph.get(queue.popleft(), ()):
+                if target not in seen:
+                    seen.add(target)
+                    queue.append(target)
+        return seen
+
+    unreachable = set(block_ids) - reach(config.START_BLOCK_ID, forward)
+    if unreachable:
+        problems.append(f"Недостижимых блоков: {len(unreachable)} (например {sorted(unreachable)[0]})")
+    dead_ends = set(block_ids) - reach(config.END_BLOCK_ID, backward)
+    if dead_ends:
+        problems.append(f"Блоков без пути к концу: {len(dead_ends)} (например {sorted(dead_ends)[0]})")
+
+    # Прохождение по первому доступному выбору с настоящими условиями и временем
+    state = model.initial_state()
+    steps = 0
+    while not model.is_end(state):
+        transitions = model.successors(state)
+        if not transitions or transitions[0].state is None:
+            problems.append(f"Прохождение оборвалось в {state.block_id} (осталось {state.time_left} мин)")
+            break
+        state = transitions[0].state
+        steps += 1
+        if steps > 4 * len(block_ids) + 10:
+            problems.append(f"Прохождение зациклилось около {state.block_id}")
+            break
+    return problems
+
+
+def main(argv: List[str] = None):
+    defaults = GeneratorSettings()
+    parser = argparse.ArgumentParser(description="Генератор синтетических сюжетов для нагрузочных тестов")
+    parser.add_argument("--out", required=True, help="Папка для JSON файлов сюжета")
+    parser.add_argument("--blocks", type=int, default=defaults.blocks, help="Примерное число блоков")
+    parser.add_argument("--branching", type=int, default=defaults.branching, help="Выборов в блоке")
+    parser.add_argument("--flags", type=int, default=defaults.flags, help="Число разных флагов")
+    parser.add_argument("--condition-terms", type=int, default=defaults.condition_terms,
+                        help="Сложность условий (число слагаемых)")
+    parser.add_argument("--circle-density", type=float, default=defaults.circle_density, help="Доля петель")
+    parser.add_argument("--body-words", type=int, default=defaults.body_words, help="Средняя длина текста в словах")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--verify", action="store_true", help="Загрузить сюжет и проверить проходимость")
+    args = parser.parse_args(argv)
+
+    settings = GeneratorSettings(blocks=args.blocks, branching=max(1, args.branching), flags=args.flags,
+                                 condition_terms=args.condition_terms, circle_density=args.circle_density,
+                                 body_words=args.body_words, seed=args.seed)
+    counts = StoryGenerator(settings).generate(args.out)
+    print(f"✅ {args.out}: текстовых блоков {counts['text_blocks']}, блоков с выбором {counts['choice_blocks']}, "
+          f"выборов {counts['choices']}")
+
+    if args.verify:
+        from Game.scripts.SaveMigration import load_version
+
+        problems = verify_story(load_version(args.out))
+        for problem in problems:
+            print(f"❌ {problem}")
+        if problems:
+            raise SystemExit(1)
+        print("✅ Сюжет проходим от начала до конца")
+
+
+if __name__ == "__main__":
+    main()
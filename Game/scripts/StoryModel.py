@@ -0,0 +1,176 @@
+# Game/scripts/StoryModel.py
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+from Game import config
+from Game.scripts.BranchTable import link_targets
+from Game.scripts.ChoiceBlock import ChoiceBlock
+from Game.scripts.Choice import Choice
+from Game.scripts.Inventory import Inventory
+from Game.scripts.Item import Item
+
+
+class StoryState(NamedTuple):
+    """Состояние прохождения без привязки к конкретному игроку"""
+    block_id: str
+    flags: FrozenSet[str]  # Только установленные флаги
+    items: Tuple[str, ...]  # Имена предметов (с повторами), отсортированы
+    time_left: int
+
+
+class Transition(NamedTuple):
+    """Переход из состояния: выбор (None для текстового блока), затраты времени и новое состояние"""
+    choice_id: Optional[str]
+    cost: int
+    state: Optional[StoryState]  # None - игра заканчивается (game over)
+
+
+class StoryModel:
+    """Повторяет правила GameEngine без ввода-вывода: какие выборы доступны и куда они ведут.
+
+    Используется анализаторами сюжета, которым нужно перебирать прохождения.
+    """
+
+    def __init__(self, state_manager: 'GameStateManager', item_registry: Dict[str, Item] = None):
+        self.state_manager = state_manager
+
+        if item_registry is None:
+            item_registry = state_manager.item_registry
+        if not item_registry:
+            item_registry = {
+                key: Item(name=data["name"], description=data["description"], power=data.get("power", 0))
+                for key, data in config.ITEM_REGISTRY.items()
+            }
+        self._item_registry = item_registry
+        self._items_by_name: Dict[str, Item] = {item.name: item for item in item_registry.values()}
+        self._inventories: Dict[Tuple[str, ...], Inventory] = {}
+
+    def initial_state(self, block_id: str = None) -> StoryState:
+        """Состояние нового персонажа"""
+        names = []
+        for item_data in config.INITIAL_ITEMS:
+            item = Item(name=item_data["name"], description=item_data["description"], power=item_data.get("power", 0))
+            self._items_by_name.setdefault(item.name, item)
+            names.append(item.name)
+
+        flags = frozenset(flag for flag, value in config.INITIAL_FLAGS.items() if value)
+        return StoryState(block_id or config.START_BLOCK_ID, flags, tuple(sorted(names)), config.START_TIME)
+
+    def clock(self, state: StoryState) -> int:
+        """Игровое время состояния в минутах от полуночи"""
+        return config.START_TIME + (config.START_TIME - state.time_left)
+
+    def inventory(self, items: Tuple[str, ...]) -> Inventory:
+        """Инвентарь для проверки условий (кэшируется по набору предметов)"""
+        inventory = self._inventories.get(items)
+        if inventory is None:
+            inventory = Inventory([self._items_by_name.get(name) or Item(name) for name in items])
+            self._inventories[items] = inventory
+        return inventory
+
+    def check(self, condition: Optional[str], state: StoryState) -> bool:
+        """Проверяет условие в состоянии"""
+        if not condition:
+            return True
+        flags = dict.fromkeys(state.flags, True)
+        return self.state_manager.evaluate_condition(condition, flags, self.inventory(state.items), self.clock(state))
+
+    def is_end(self, state: StoryState) -> bool:
+        return state.block_id == config.END_BLOCK_ID
+
+    def next_block_id(self, next_block, state: StoryState) -> Optional[str]:
+        """Куда ведет ссылка next_block (как в GameEngine; из случайных веток - самая вероятная)"""
+        if not isinstance(next_block, list):
+            return next_block or None
+        flags = dict.fromkeys(state.flags, True)
+        return self.state_manager.resolve_next_block(next_block, flags, self.inventory(state.items), self.clock(state))
+
+    def _item_names(self, given_item) -> List[str]:
+        if isinstance(given_item, str):
+            given_item = [given_item]
+        if not isinstance(given_item, list):
+            return []
+
+        names = []
+        for item_id in given_item:
+            if not isinstance(item_id, str) or not item_id.strip():
+                continue
+            item = self._item_registry.get(item_id)
+            if item is None:
+                item = self._items_by_name.setdefault(item_id, Item(name=item_id))
+            names.append(item.name)
+        return names
+
+    def apply_choice(self, state: StoryState, choice: Choice) -> Tuple[int, Optional[StoryState]]:
+        """Применяет выбор к состоянию, возвращает (затраты времени, новое состояние или None)"""
+        flags = state.flags | {choice.given_flag} if choice.given_flag else state.flags
+        items = state.items
+        if choice.given_item:
+            items = tuple(sorted(items + tuple(self._item_names(choice.given_item))))
+
+        cost = choice.time_cost if isinstance(choice.time_cost, int) else 0
+        time_left = max(state.time_left - cost, 0)
+        updated = StoryState(state.block_id, flags, items, time_left)
+
+        if choice.end_condition and self.check(choice.end_condition, updated):
+            return cost, None
+
+        next_block_id = self.next_block_id(choice.next_block, updated)
+        if next_block_id is None:
+            return cost, None
+        return cost, updated._replace(block_id=next_block_id)
+
+    def successors(self, state: StoryState) -> List[Transition]:
+        """Все переходы из состояния; пустой список - тупик или конец игры"""
+        if state.time_left <= 0 or self.is_end(state):
+            return []
+
+        block = self.state_manager.get_block(state.block_id)
+        if block is None:
+            return []
+
+        if isinstance(block, ChoiceBlock):
+            transitions = []
+            for choice_id in block.available_choices:
+                choice = self.state_manager.get_choice(choice_id)
+                if choice is None or not self.check(choice.condition, state):
+                    continue
+                cost, new_state = self.apply_choice(state, choice)
+                transitions.append(Transition(choice.id, cost, new_state))
+            return transitions
+
+        # Блок может тратить время (WaitBlock), если не пропущен по условию
+        cost = block.time_cost
+        if cost and self.check(getattr(block, "conditions", None), state):
+            state = state._replace(time_left=max(state.time_left - cost, 0))
+        else:
+            cost = 0
+
+        next_block_id = self.next_block_id(block.next_block, state)
+        if next_block_id is None:
+            return [Transition(None, cost, None)]
+        return [Transition(None, cost, state._replace(block_id=next_block_id))]
+
+    def block_links(self, block_id: str) -> Iterable[Tuple[str, int]]:
+        """Все ссылки блока без учета условий: пары (следующий блок, наименьшие затраты времени)"""
+        block = self.state_manager.get_block(block_id)
+        if block is None:
+            return []
+
+        targets = []
+        if isinstance(block, ChoiceBlock):
+            for choice_id in block.available_choices:
+                choice = self.state_manager.get_choice(choice_id)
+                if choice is None:
+                    continue
+                cost = choice.time_cost if isinstance(choice.time_cost, int) else 0
+                targets.extend((target, cost) for target in self._link_targets(choice.next_block))
+        else:
+            # Блок с условием может быть пропущен и ничего не стоить (как в successors) -
+            # берем 0, чтобы затраты оставались нижней оценкой для эвристики PathSolver
+            cost = 0 if getattr(block, "conditions", None) else block.time_cost
+            targets.extend((target, cost) for target in self._link_targets(block.next_block))
+        return targets
+
+    @staticmethod
+    def _link_targets(next_block) -> List[str]:
+        return link_targets(next_block)
@@ -0,0 +1,679 @@
+# Game/scripts/StoryScript.py
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import re
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from Game import config
+from Game.scripts.BlockRegistry import BLOCK_TYPES
+from Game.scripts.BranchTable import link_targets
+from Game.scripts.Condition import ConditionError, compile_condition
+from Game.scripts.TextBlock import TextBlock
+
+# StoryScript - текстовый формат сюжета вместо трех JSON файлов с ручными ссылками.
+#
+#   python -m Game.scripts.StoryScript compile story.script [--out Game/data] [--bundle story.bundle.json]
+#   python -m Game.scripts.StoryScript decompile [--data Game/data] > story.script
+#
+# Пример:
+#
+#   # Комментарий
+#   === text_005
+#   ? eat_1                          <- условие блока (необязательно)
+#   Вы открываете холодильник.       <- тело блока, пустые строки сохраняются
+#   -> block_001                     <- следующий блок
+#
+#   === block_001
+#   Что вы выберете ?                <- у блока с выбором текст - это заголовок
+#   * [001] Приготовить яичницу -> text_006
+#       Описание выбора пишется с отступом.
+#       ~ time 30
+#       ~ flag eat_1
+#       ~ item Циркуль соседа
+#   * Пропустить прием еды -> text_006     <- без [ID] выбор получит ID "block_001_2"
+#       ~ if eat_1 == False
+#   * @013                           <- выбор, уже описанный в другом блоке
+#
+# Несколько стрелок дают таблицу ветвлений: "-> block_009 weight 2 if eat_2".
+#
+# Блоки особых типов (BlockRegistry) задаются строками "~" без отступа:
+#
+#   === text_030
+#   ~ type wait                      <- random, wait, item_check или ending
+#   ~ minutes 15                     <- wait: сколько минут уходит на блок
+#   Очередь в столовой.
+#   -> text_031
+#
+#   === text_040
+#   ~ type item_check
+#   ~ item Циркуль соседа            <- item_check: ключ ITEM_REGISTRY
+#   ~ else text_042                  <- куда идти без предмета
+#   -> text_041
+#
+# Эффекты выбора: time N, flag F, item ПРЕДМЕТ, if УСЛОВИЕ, end N [if УСЛОВИЕ], ending ТЕКСТ, circle.
+# previous_block выводится из ссылок; задать его явно можно строкой "<- text_004, block_002".
+# Запятая в конце ("<- text_004,") - список из одного блока, а не строка.
+# Строку тела, начинающуюся со служебного символа, экранируют обратной косой чертой.
+#
+# Компилятор однопроходный: каждый абзац "=== ID" разбирается за один проход по строкам,
+# после чего проверяются ссылки между абзацами. Результат разбора абзаца кэшируется по хэшу
+# его текста, так что перекомпиляция разбирает заново только изменившиеся абзацы.
+
+CACHE_VERSION = 2
+
+_HEADER_RE = re.compile(r"^===\s*(\S+)\s*$")
+_CHOICE_RE = re.compile(r"^\*\s+(?:\[([^\]]+)\]\s*)?(.*?)(?:\s*->\s*(\S*))?$")
+_ARROW_RE = re.compile(r"^->\s*(\S*)(?:\s+weight\s+(\d+(?:\.\d+)?))?(?:\s+if\s+(.+))?$")
+_END_RE = re.compile(r"^(-?\d+)(?:\s+if\s+(.+))?$")
+_INT_RE = re.compile(r"^-?\d+$")
+_SPECIAL_PREFIXES = ("===", "->", "<-", "* ", "? ", "~", "#", "\\")
+
+# Типы блоков, которые умеет записывать сценарий, и их поля сверх обычного текстового блока
+_TYPE_FIELDS = {"random": (), "wait": ("minutes",), "item_check": ("item", "else_block"), "ending": ()}
+_BLOCK_FIELDS = {"minutes": "minutes", "item": "item", "else": "else_block"}
+
+
+class StoryScriptError(ValueError):
+    """Ошибки в сценарии (все найденные, с номерами строк)"""
+
+    def __init__(self, errors: List[str]):
+        super().__init__("\n".join(errors))
+        self.errors = errors
+
+
+# ============================================
+# РАЗБОР АБЗАЦА
+# ============================================
+
+def _split_passages(source: str) -> Tuple[List[Tuple[str, int, str]], List[str]]:
+    """Делит сценарий на абзацы (ID, номер строки заголовка, текст абзаца)"""
+    passages = []
+    errors = []
+    current: Optional[List] = None
+    for number, line in enumerate(source.split("\n"), 1):
+        match = _HEADER_RE.match(line)
+        if match:
+            current = [match.group(1), number, []]
+            passages.append(current)
+        if current is not None:
+            current[2].append(line)
+        elif line.strip() and not line.startswith("#"):
+            errors.append(f"строка {number}: текст до первого заголовка '=== ID'")
+    return [(passage_id, start, "\n".join(lines)) for passage_id, start, lines in passages], errors
+
+
+def _unescape(line: str) -> str:
+    return line[1:] if line.startswith("\\") else line
+
+
+def _dedent(line: str) -> str:
+    """Снимает один уровень отступа (4 пробела или табуляция)"""
+    if line.startswith("\t"):
+        return line[1:]
+    if line.startswith("    "):
+        return line[4:]
+    return line.lstrip()
+
+
+def _parse_arrow(text: str, errors: list, line: int):
+    match = _ARROW_RE.match(text)
+    if match is None:
+        errors.append([line, f"не разобрана ссылка '{text}'"])
+        return None
+    target, weight, condition = match.groups()
+    if condition:
+        _check_condition(condition, errors, line)
+    if weight is None and condition is None:
+        return target
+    entry = {"block": target}
+    if condition is not None:
+        entry["condition"] = condition
+    if weight is not None:
+        entry["weight"] = float(weight) if "." in weight else int(weight)
+    return entry
+
+
+def _text_links(block: dict) -> List[str]:
+    """Ссылки текстового блока, включая else_block блока item_check"""
+    links = link_targets(block.get("next_block"))
+    if block.get("else_block"):
+        links.append(block["else_block"])
+    return links
+
+
+def _check_condition(condition: str, errors: list, line: int):
+    try:
+        compile_condition(condition)
+    except ConditionError as e:
+        errors.append([line, str(e)])
+
+
+def _next_block(arrows: list):
+    """Стрелки абзаца или выбора -> значение next_block"""
+    if not arrows:
+        return None
+    if len(arrows) == 1 and isinstance(arrows[0], str):
+        return arrows[0]
+    return arrows
+
+
+def _apply_effect(choice: dict, text: str, errors: list, line: int):
+    key, _, value = text[1:].strip().partition(" ")
+    value = value.strip()
+    if key == "time":
+        choice["time_cost"] = int(value) if _INT_RE.match(value) else value
+    elif key == "flag":
+        choice["given_flag"] = value
+    elif key == "item":
+        if value not in config.ITEM_REGISTRY:
+            errors.append([line, f"неизвестный предмет '{value}'"])
+        choice.setdefault("given_item", []).append(value)
+    elif key == "if":
+        _check_condition(value, errors, line)
+        choice["condition"] = value
+    elif key == "end":
+        match = _END_RE.match(value)
+        if match is None:
+            errors.append([line, f"ожидалось '~ end N [if УСЛОВИЕ]', а не '{text}'"])
+            return
+        choice["end"] = int(match.group(1))
+        if match.group(2):
+            _check_condition(match.group(2), errors, line)
+            choice["end_condition"] = match.group(2)
+    elif key == "ending":
+        previous = choice.get("end_description")
+        choice["end_description"] = value if previous is None else f"{previous}\n{value}"
+    elif key == "circle":
+        choice["circle"] = True
+    else:
+        errors.append([line, f"неизвестный эффект '~ {key}'"])
+
+
+def _apply_block_field(fields: dict, text: str, errors: list, line: int):
+    """Строка "~" без отступа - тип блока или его поле (~ type wait, ~ minutes 15, ~ item ..., ~ else ID)"""
+    key, _, value = text[1:].strip().partition(" ")
+    value = value.strip()
+    if key == "type":
+        if value not in _TYPE_FIELDS:
+            errors.append([line, f"неизвестный тип блока '{value}' (есть: {', '.join(_TYPE_FIELDS)})"])
+        fields["type"] = value
+    elif key in _BLOCK_FIELDS:
+        if key == "minutes" and not _INT_RE.match(value):
+            errors.append([line, f"'~ minutes' ожидает целое число, а не '{value}'"])
+        fields[_BLOCK_FIELDS[key]] = int(value) if key == "minutes" and _INT_RE.match(value) else value
+    else:
+        errors.append([line, f"неизвестное поле блока '~ {key}'"])
+
+
+def _typed_block(block_id: str, block: dict, fields: dict, errors: list) -> dict:
+    """Текстовый блок с типом из реестра: проверка полей и JSON в формате to_dict"""
+    tag = fields.pop("type", None)
+    allowed = _TYPE_FIELDS.get(tag, ())
+    for key in fields:
+        if key not in allowed:
+            errors.append([0, f"поле '{key}' не относится к блоку типа '{tag or 'text'}'"])
+    if tag is None or tag not in _TYPE_FIELDS:
+        return block
+
+    if tag == "ending":
+        if block["next_block"] is not None or "conditions" in block:
+            errors.append([0, "у блока ending не бывает своих '->' и '?' (после него игра заканчивается)"])
+        return {"type": tag, "body": block["body"], "previous_block": block["previous_block"]}
+    for key in allowed:
+        if key not in fields:
+            errors.append([0, f"у блока типа '{tag}' не задано '~ {key.replace('_block', '')}'"])
+    if tag == "item_check" and not isinstance(block["next_block"], str):
+        errors.append([0, "у блока item_check должна быть одна ссылка '-> ID' (куда идти с предметом)"])
+    block = {"type": tag, **block, **fields}
+    try:
+        BLOCK_TYPES.create(block_id, block, TextBlock)  # Те же проверки, что при загрузке (предметы и т.п.)
+    except ValueError as e:
+        errors.append([0, str(e)])
+    return block
+
+
+def compile_passage(passage_id: str, text: str) -> dict:
+    """Разбирает один абзац за один проход по строкам.
+
+    Возвращает запись кэша: вид блока, его JSON, описанные в нем выборы,
+    ссылки на другие блоки и ошибки (номера строк - относительно заголовка).
+    """
+    errors = []
+    body: List[str] = []
+    arrows = []
+    previous = None
+    explicit_previous = False
+    condition = None
+    choices: Dict[str, dict] = {}
+    available: List[str] = []
+    shared = []  # (строка, ID выбора из другого блока)
+    fields = {}  # Тип блока и его поля (строки "~" без отступа)
+
+    choice = None  # Выбор, строки которого сейчас читаем
+    choice_arrows = None
+    blanks = 0  # Пустые строки, которые еще не ясно кому принадлежат
+
+    def close_choice():
+        if choice is not None:
+            choice["next_block"] = _next_block(choice_arrows)
+
+    for line_no, line in enumerate(text.split("\n")[1:], 1):
+        line = line.rstrip("\r")
+        if line.startswith("#"):
+            continue
+        if not line.strip():
+            blanks += 1
+            continue
+
+        indented = line[0] in " \t"
+        if choice is not None and indented:
+            content = _dedent(line)
+            if content.startswith("~"):
+                _apply_effect(choice, content.strip(), errors, line_no)
+            elif content.startswith("->"):
+                branch = _parse_arrow(content.strip(), errors, line_no)
+                if branch is not None:
+                    choice_arrows.append(branch)
+            else:
+                description = choice["description"]
+                lines = [""] * blanks if description else []
+                lines.append(_unescape(content))
+                choice["description"] = "\n".join(([description] if description else []) + lines)
+            blanks = 0
+            continue
+        pending, blanks = blanks, 0
+
+        if line.startswith("* "):
+            close_choice()
+            choice = None
+            reference = line[2:].strip()
+            if reference.startswith("@"):
+                shared.append((line_no, reference[1:]))
+                available.append(reference[1:])
+                continue
+
+            match = _CHOICE_RE.match(line)
+            choice_id = match.group(1) or f"{passage_id}_{len(available) + 1}"
+            if choice_id in choices:
+                errors.append([line_no, f"выбор {choice_id} уже описан в этом блоке"])
+            choice = {"name": match.group(2), "description": "", "time_cost": 0,
+                      "condition": None, "given_flag": ""}
+            choice_arrows = []
+            if match.group(3) is not None:
+                choice_arrows.append(match.group(3))
+            choices[choice_id] = choice
+            available.append(choice_id)
+        elif choice is not None or (available and not indented):
+            errors.append([line_no, "после выборов ожидаются только выборы; описание пишется с отступом"])
+        elif line.startswith("->"):
+            branch = _parse_arrow(line, errors, line_no)
+            if branch is not None:
+                arrows.append(branch)
+        elif line.startswith("<-"):
+            # "<-" без ID - явно без предыдущего блока
+            targets = [target.strip() for target in line[2:].split(",") if target.strip()]
+            as_list = len(targets) > 1 or (targets and line.rstrip().endswith(","))
+            previous = targets if as_list else targets[0] if targets else None
+            explicit_previous = True
+        elif line.startswith("~"):
+            _apply_block_field(fields, line, errors, line_no)
+        elif line.startswith("? "):
+            if condition is not None:
+                errors.append([line_no, "у блока уже есть условие"])
+            condition = line[2:].strip()
+            _check_condition(condition, errors, line_no)
+        else:
+            if body:
+                body.extend([""] * pending)
+            body.append(_unescape(line))
+    close_choice()
+
+    if available:
+        if arrows or condition is not None:
+            errors.append([0, "у блока с выбором не может быть своих '->' и '?' (они пишутся у выборов)"])
+        if fields:
+            errors.append([0, "у блока с выбором не бывает типа и полей '~' (эффекты пишутся у выборов)"])
+        block = {"name": "\n".join(body), "available_choices": available, "previous_block": previous}
+        kind = "choice"
+        links = [target for data in choices.values() for target in link_targets(data["next_block"])]
+    else:
+        block = {"body": "\n".join(body), "previous_block": previous, "next_block": _next_block(arrows)}
+        if condition is not None:
+            block["conditions"] = condition
+        block = _typed_block(passage_id, block, fields, errors)
+        kind = "text"
+        links = _text_links(block)
+
+    return {"id": passage_id, "kind": kind, "block": block, "choices": choices,
+            "links": links, "shared": shared, "explicit_previous": explicit_previous, "errors": errors}
+
+
+# ============================================
+# КОМПИЛЯТОР
+# ============================================
+
+class StoryBundle:
+    """Результат компиляции: таблицы в формате JSON файлов сюжета"""
+
+    def __init__(self, text_blocks: Dict[str, dict], choice_blocks: Dict[str, dict], choices: Dict[str, dict]):
+        self.text_blocks = text_blocks
+        self.choice_blocks = choice_blocks
+        self.choices = choices
+
+    def files(self) -> Dict[str, dict]:
+        """Содержимое трех JSON файлов сюжета"""
+        return {
+            config.NARRATIVE_FILE: self.text_blocks,
+            config.CHOICE_BLOCKS_FILE: {"choice_blocks": self.choice_blocks},
+            config.CHOICES_FILE: {"choices": self.choices},
+        }
+
+    def write_files(self, data_dir: str) -> List[str]:
+        """Пишет три JSON файла; файлы без изменений не трогает (не будит StoryWatcher)"""
+        written = []
+        for filename, content in self.files().items():
+            if _write_if_changed(os.path.join(data_dir, filename), content):
+                written.append(filename)
+        return written
+
+    def write_bundle(self, path: str) -> bool:
+        """Пишет весь сюжет одним файлом (разделы - в порядке загрузки в GameStateManager.load_bundle)"""
+        return _write_if_changed(path, {"choices": self.choices,
+                                        "text_blocks": self.text_blocks,
+                                        "choice_blocks": self.choice_blocks})
+
+
+def _write_if_changed(path: str, content: dict) -> bool:
+    text = json.dumps(content, ensure_ascii=False, indent=2) + "\n"
+    if os.path.exists(path):
+        with open(path, 'r', encoding="utf-8") as file:
+            if file.read() == text:
+                return False
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding="utf-8") as file:
+        file.write(text)
+    os.replace(temp_path, path)
+    return True
+
+
+def derive_previous(order: List[str], links: Dict[str, List[str]]) -> Dict[str, object]:
+    """previous_block по ссылкам: один источник - строка, несколько - список в порядке сценария"""
+    sources: Dict[str, List[str]] = {}
+    for source in order:
+        for target in links.get(source, ()):
+            found = sources.setdefault(target, [])
+            if source not in found:
+                found.append(source)
+    return {target: found[0] if len(found) == 1 else found for target, found in sources.items()}
+
+
+class StoryCompiler:
+    """Компилятор сценариев с кэшем разобранных абзацев (хэш текста абзаца -> результат)"""
+
+    def __init__(self, cache_path: Optional[str] = None):
+        self.cache_path = cache_path
+        self._cache: Dict[str, dict] = {}
+        self.compiled = 0  # Сколько абзацев разобрано заново в последней компиляции
+        self.reused = 0
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, 'r', encoding="utf-8") as file:
+                data = json.load(file)
+            if data.get("version") == CACHE_VERSION:
+                self._cache = data.get("passages", {})
+
+    def save_cache(self):
+        if self.cache_path:
+            _write_if_changed(self.cache_path, {"version": CACHE_VERSION, "passages": self._cache})
+
+    def compile(self, source: str) -> StoryBundle:
+        """Компилирует сценарий; при ошибках бросает StoryScriptError со всеми ошибками"""
+        passages, errors = _split_passages(source)
+        self.compiled = self.reused = 0
+
+        outputs = []
+        cache = {}
+        for passage_id, start, text in passages:
+            key = hashlib.sha1(text.encode("utf-8")).hexdigest()
+            output = self._cache.get(key)
+            if output is None:
+                output = compile_passage(passage_id, text)
+                self.compiled += 1
+            else:
+                self.reused += 1
+            cache[key] = output
+            outputs.append((start, output))
+            errors.extend(f"строка {start + line}: {message}" for line, message in output["errors"])
+        self._cache = cache  # Удаленные абзацы выпадают из кэша
+
+        bundle = self._link(outputs, errors)
+        if errors:
+            raise StoryScriptError(errors)
+        return bundle
+
+    @staticmethod
+    def _link(outputs: List[Tuple[int, dict]], errors: List[str]) -> StoryBundle:
+        """Проверка ссылок между абзацами и сборка таблиц"""
+        text_blocks, choice_blocks, choices = {}, {}, {}
+        choice_owner = {}
+        for start, output in outputs:
+            passage_id = output["id"]
+            if passage_id in text_blocks or passage_id in choice_blocks:
+                errors.append(f"строка {start}: блок {passage_id} уже есть")
+                continue
+            table = choice_blocks if output["kind"] == "choice" else text_blocks
+            table[passage_id] = dict(output["block"])
+            for choice_id, data in output["choices"].items():
+                if choice_id in choices:
+                    errors.append(f"строка {start}: выбор {choice_id} уже описан в блоке {choice_owner[choice_id]}")
+                    continue
+                choices[choice_id] = data
+                choice_owner[choice_id] = passage_id
+
+        links = {}
+        for start, output in outputs:
+            passage_id = output["id"]
+            for line, choice_id in output["shared"]:
+                if choice_id not in choices:
+                    errors.append(f"строка {start + line}: нет выбора @{choice_id}")
+            if output["kind"] == "choice":
+                available = output["block"]["available_choices"]
+                links[passage_id] = [target for choice_id in available if choice_id in choices
+                                     for target in link_targets(choices[choice_id]["next_block"])]
+            else:
+                links[passage_id] = output["links"]
+            for target in output["links"]:
+                if target not in text_blocks and target not in choice_blocks:
+                    errors.append(f"строка {start}: блок {passage_id} ссылается на несуществующий {target}")
+
+        derived = derive_previous([output["id"] for _, output in outputs], links)
+        for _, output in outputs:
+            if not output["explicit_previous"]:
+                table = choice_blocks if output["kind"] == "choice" else text_blocks
+                if output["id"] in table:
+                    table[output["id"]]["previous_block"] = derived.get(output["id"])
+        return StoryBundle(text_blocks, choice_blocks, choices)
+
+
+def compile_file(script_path: str, cache_path: Optional[str] = None) -> Tuple[StoryBundle, StoryCompiler]:
+    with open(script_path, 'r', encoding="utf-8") as file:
+        source = file.read()
+    compiler = StoryCompiler(cache_path)
+    bundle = compiler.compile(source)
+    compiler.save_cache()
+    return bundle, compiler
+
+
+# ============================================
+# ДЕКОМПИЛЯЦИЯ (JSON -> сценарий)
+# ============================================
+
+def _escape(line: str) -> str:
+    return f"\\{line}" if line.startswith(_SPECIAL_PREFIXES) else line
+
+
+def _arrows(next_block) -> List[str]:
+    if next_block is None:
+        return []
+    if isinstance(next_block, str):
+        return [f"-> {next_block}".rstrip()]
+    lines = []
+    for entry in next_block:
+        if isinstance(entry, str):
+            lines.append(f"-> {entry}")
+            continue
+        line = f"-> {entry.get('block')}"
+        if entry.get("weight") is not None:
+            line += f" weight {entry['weight']}"
+        if entry.get("condition"):
+            line += f" if {entry['condition']}"
+        lines.append(line)
+    return lines
+
+
+def decompile(state_manager) -> str:
+    """Переводит загруженный сюжет в сценарий (для перехода с JSON файлов)"""
+    text_blocks = {block_id: block.to_dict() for block_id, block in state_manager.text_blocks.items()}
+    choice_blocks = {block_id: block.to_dict() for block_id, block in state_manager.choice_blocks.items()}
+    choices = {choice_id: choice.to_dict() for choice_id, choice in state_manager.choices.items()}
+
+    for block_id, block in text_blocks.items():
+        tag = block.get("type", "text")
+        unknown = set(block) - {"type", "body", "next_block", "previous_block", "conditions"}
+        if tag != "text" and tag not in _TYPE_FIELDS or unknown - set(_TYPE_FIELDS.get(tag, ())):
+            # Блок превратился бы в обычный текстовый - сценарий изменил бы игру
+            raise ValueError(f"Блок '{block_id}': тип '{tag}' нельзя записать сценарием")
+    for block_id, block in choice_blocks.items():
+        if block.get("type", "choice") != "choice":
+            raise ValueError(f"Блок '{block_id}': тип '{block['type']}' нельзя записать сценарием")
+
+    links = {}
+    for block_id, block in text_blocks.items():
+        links[block_id] = _text_links(block)
+    for block_id, block in choice_blocks.items():
+        links[block_id] = [target for choice_id in block["available_choices"]
+                           if choice_id in choices for target in link_targets(choices[choice_id]["next_block"])]
+
+    # Абзацы идут в порядке прохождения от стартового блока, недостижимые - в конце
+    order = []
+    queue = [config.START_BLOCK_ID]
+    seen = set()
+    while queue:
+        block_id = queue.pop(0)
+        if block_id in seen or block_id not in links:
+            continue
+        seen.add(block_id)
+        order.append(block_id)
+        queue.extend(links[block_id])
+    order.extend(block_id for block_id in links if block_id not in seen)
+    derived = derive_previous(order, links)
+
+    lines = []
+    written = set()
+    for block_id in order:
+        block = text_blocks.get(block_id) or choice_blocks[block_id]
+        lines.append(f"=== {block_id}")
+        previous = block.get("previous_block")
+        if previous != derived.get(block_id):
+            targets = [previous] if isinstance(previous, str) else previous or []
+            trailer = "," if isinstance(previous, list) and len(previous) == 1 else ""
+            lines.append(" ".join(["<-", ", ".join(targets)]).rstrip() + trailer)
+
+        if block_id in text_blocks:
+            if block.get("type", "text") != "text":
+                lines.append(f"~ type {block['type']}")
+            if block.get("minutes") is not None:
+                lines.append(f"~ minutes {block['minutes']}")
+            if block.get("item"):
+                lines.append(f"~ item {block['item']}")
+            if block.get("else_block"):
+                lines.append(f"~ else {block['else_block']}")
+            if block.get("conditions"):
+                lines.append(f"? {block['conditions']}")
+            lines.extend(_escape(line) for line in (block.get("body") or "").split("\n") if block.get("body"))
+            lines.extend(_arrows(block.get("next_block")))
+        else:
+            if block.get("name"):
+                lines.extend(_escape(line) for line in block["name"].split("\n"))
+            for choice_id in block["available_choices"]:
+                if choice_id in written or choice_id not in choices:
+                    lines.append(f"* @{choice_id}")
+                    continue
+                written.add(choice_id)
+                lines.extend(_decompile_choice(choice_id, choices[choice_id]))
+        lines.append("")
+    return "\n".join(lines)
+
+
+def _decompile_choice(choice_id: str, choice: dict) -> List[str]:
+    name = " ".join((choice.get("name") or "").split())
+    next_block = choice.get("next_block")
+    arrows = _arrows(next_block)
+    head = f"* [{choice_id}] {name}"
+    if isinstance(next_block, str):
+        head += " " + arrows.pop()
+    lines = [head]
+    for line in (choice.get("description") or "").split("\n") if choice.get("description") else []:
+        lines.append(f"    {_escape(line)}" if line.strip() else "")
+    if choice.get("time_cost"):
+        lines.append(f"    ~ time {choice['time_cost']}")
+    if choice.get("given_flag"):
+        lines.append(f"    ~ flag {choice['given_flag']}")
+    for item in choice.get("given_item") or []:
+        lines.append(f"    ~ item {item}")
+    if choice.get("condition"):
+        lines.append(f"    ~ if {choice['condition']}")
+    if choice.get("end") is not None:
+        condition = f" if {choice['end_condition']}" if choice.get("end_condition") else ""
+        lines.append(f"    ~ end {choice['end']}{condition}")
+    for line in (choice.get("end_description") or "").split("\n") if choice.get("end_description") else []:
+        lines.append(f"    ~ ending {line}")
+    if choice.get("circle"):
+        lines.append("    ~ circle")
+    lines.extend(f"    {arrow}" for arrow in arrows)
+    return lines
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Компилятор сценариев StoryScript")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    compile_parser = commands.add_parser("compile", help="Сценарий -> JSON файлы сюжета или bundle")
+    compile_parser.add_argument("script", help="Файл сценария")
+    compile_parser.add_argument("--out", default=None, help="Папка для трех JSON файлов сюжета")
+    compile_parser.add_argument("--bundle", default=None, help="Файл скомпилированного сюжета")
+    compile_parser.add_argument("--no-cache", action="store_true", help="Разобрать все абзацы заново")
+
+    decompile_parser = commands.add_parser("decompile", help="JSON файлы сюжета -> сценарий")
+    decompile_parser.add_argument("--data", default=config.DATA_DIR, help="Папка с сюжетом")
+    args = parser.parse_args(argv)
+
+    if args.command == "decompile":
+        from Game.scripts.SaveMigration import load_version
+        with contextlib.redirect_stdout(sys.stderr):  # Сообщения загрузки не попадают в сценарий
+            manager = load_version(args.data)
+        print(decompile(manager), end="")
+        return
+
+    cache_path = None if args.no_cache else f"{args.script}.cache.json"
+    try:
+        bundle, compiler = compile_file(args.script, cache_path)
+    except StoryScriptError as e:
+        for error in e.errors:
+            print(f"❌ {error}")
+        raise SystemExit(1)
+
+    print(f"✅ Блоков: {len(bundle.text_blocks) + len(bundle.choice_blocks)}, выборов: {len(bundle.choices)} "
+          f"(разобрано абзацев: {compiler.compiled}, из кэша: {compiler.reused})")
+    if args.out:
+        written = bundle.write_files(args.out)
+        print(f"📁 Обновлено файлов: {', '.join(written) if written else 'нет'}")
+    if args.bundle:
+        print(f"📦 {args.bundle}: {'обновлен' if bundle.write_bundle(args.bundle) else 'без изменений'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# Game/scripts/StoryWatcher.py
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+from Game import config
+
+
+class StoryWatcher:
+    """Следит за JSON файлами сюжета и перечитывает только изменившиеся"""
+
+    def __init__(self, state_manager: 'GameStateManager', interval: float = None):
+        self._state_manager = state_manager
+        self._interval = interval if interval is not None else config.HOT_RELOAD_INTERVAL
+        self._stamps: Dict[str, Tuple[float, int]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self.last_error: Optional[str] = None
+
+        # Запоминаем исходное состояние файлов, чтобы первая проверка ничего не перечитывала
+        for kind, filepath in state_manager.sources.items():
+            self._stamps[kind] = self._stamp(filepath)
+
+    @staticmethod
+    def _stamp(filepath: str) -> Tuple[float, int]:
+        try:
+            stat = os.stat(filepath)
+            return stat.st_mtime, stat.st_size
+        except OSError:
+            return 0.0, -1
+
+    def check(self) -> int:
+        """Проверяет файлы один раз, возвращает количество перезагруженных"""
+        reloaded = 0
+        for kind, filepath in list(self._state_manager.sources.items()):
+            stamp = self._stamp(filepath)
+            if stamp == self._stamps.get(kind) or stamp[1] < 0:
+                continue
+
+            try:
+                self._state_manager.reload_source(kind)
+                self._stamps[kind] = stamp
+                self.last_error = None
+                reloaded += 1
+            except Exception as e:
+                # Файл мог быть сохранен редактором наполовину - попробуем на следующем круге
+                self.last_error = f"{os.path.basename(filepath)}: {e}"
+        return reloaded
+
+    def start(self):
+        """Запускает фоновую проверку файлов"""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="StoryWatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Останавливает фоновую проверку"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self._interval * 2)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop_event.wait(self._interval):
+            self.check()
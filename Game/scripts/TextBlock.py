@@ -3,10 +3,12 @@ from typing import List, Optional, Union
 from Game.scripts.GameBlock import GameBlock
 
 from Game import config
-from Game.utils.ConsoleUtils import print_slow, clear_console
+from Game.utils.ConsoleUtils import print_slow, Screen
 
 
 class TextBlock(GameBlock):
+    type_tag = "text"
+
     def __init__(self,
                  block_id: str,
                  body: str,
@@ -44,34 +46,33 @@ class TextBlock(GameBlock):
         text = self._body
         text = engine.format_text_with_variables(text)
 
-        clear_console()
         hide_time = self._id in config.HIDE_TIME_BLOCKS
-        engine.display_game_header(hide_time)
-
-        print_slow("=" * 60, config.TEXT_SPEED_FAST)
 
-        paragraphs = text.split('\n')
-        for paragraph in paragraphs:
-            if paragraph.strip():
-                print_slow(paragraph, config.TEXT_SPEED_NORMAL)
-            else:
-                print()
+        screen = Screen().clear().line(engine.game_header(hide_time))
+        screen.separator(config.SEP_SYMBOL, 60)
+        screen.paragraphs(text, config.TEXT_SPEED_NORMAL)
+        screen.separator(config.SEP_SYMBOL, 60)
+        screen.show()
 
-        print_slow("=" * 60, config.TEXT_SPEED_FAST)
         input("\n↵ Нажмите Enter чтобы продолжить...")
 
     def process(self, engine: 'GameEngine'):
         """Обработать текстовый блок"""
         # Проверяем условия
-        if self._conditions and not engine.state_manager.evaluate_condition(
-                self._conditions, engine.player.flags):
+        if self._conditions and not engine.state_manager.check_condition(
+                self._conditions, engine.player):
             print_slow("⏩ Пропускаем блок...", config.TEXT_SPEED_FAST)
             engine.go_to_next_block(self)
             return
 
         self.display(engine)
+        self.apply_effects(engine)
         engine.go_to_next_block(self)
 
+    def apply_effects(self, engine: 'GameEngine'):
+        """Действия после показа текста (у обычного текстового блока их нет)"""
+        pass
+
     @classmethod
     def from_dict(cls, block_id: str, data: dict):
         return cls(
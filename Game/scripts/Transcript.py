@@ -0,0 +1,204 @@
+import argparse
+import difflib
+import glob
+import io
+import json
+import os
+import sys
+from multiprocessing import Pool
+from typing import List, Optional, Tuple
+
+from Game import config
+from Game.scripts.DataManager import DataManager
+from Game.scripts.GameStateManager import GameStateManager
+from Game.scripts.SaveBackend import MemorySaveBackend
+
+# Эталонные прогоны (golden transcripts): сценарий ввода + весь вывод игры, разбитый по блокам.
+# Запись и проверка идут без задержек, с сохранениями в памяти, в нескольких процессах.
+#
+#   python -m Game.scripts.Transcript record scripts/ --out golden/
+#   python -m Game.scripts.Transcript replay golden/ -j 8
+#
+# Сценарий - .txt файл (одна строка ввода на строку) или .json со списком строк "inputs".
+
+Segment = Tuple[str, str]  # (ID блока, вывод, пока игрок был в этом блоке)
+
+
+class _Capture(io.TextIOBase):
+    """Подменяет stdout и режет вывод на куски по текущему блоку игрока"""
+
+    def __init__(self, engine):
+        super().__init__()
+        self._engine = engine
+        self._block_id = ""
+        self._parts: List[str] = []
+        self.segments: List[Segment] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        player = self._engine.player
+        block_id = player.current_block_id if player is not None else ""
+        if block_id != self._block_id:
+            self._close_segment()
+            self._block_id = block_id
+        self._parts.append(text)
+        return len(text)
+
+    def _close_segment(self):
+        if self._parts:
+            self.segments.append((self._block_id, "".join(self._parts)))
+            self._parts = []
+
+    def finish(self) -> List[Segment]:
+        self._close_segment()
+        return self.segments
+
+
+def _configure():
+    """Все задержки выключены, сюжет не перечитывается"""
+    config.TYPEWRITER_ENABLED = False
+    config.DELAYS_ENABLED = False
+    config.HOT_RELOAD_ENABLED = False
+
+
+def _init_worker():
+    _configure()
+    GameStateManager.shared()  # Сюжет загружается один раз на процесс
+
+
+def run_script(inputs: List[str]) -> List[Segment]:
+    """Проигрывает сценарий ввода и возвращает вывод по блокам"""
+    from Game.scripts.GameEngine import GameEngine
+
+    data_manager = DataManager(backend=MemorySaveBackend(config.MAX_PLAYER_SLOTS))
+    real_stdin, real_stdout = sys.stdin, sys.stdout
+    sys.stdin = io.StringIO("".join(line + "\n" for line in inputs))
+    try:
+        engine = GameEngine(data_manager=data_manager)
+        capture = _Capture(engine)
+        sys.stdout = capture
+        try:
+            engine.start_game()
+        except (EOFError, SystemExit):
+            pass  # Сценарий закончился или игрок вышел из меню
+    finally:
+        sys.stdin, sys.stdout = real_stdin, real_stdout
+    return capture.finish()
+
+
+def read_script(path: str) -> List[str]:
+    with open(path, 'r', encoding="utf-8") as file:
+        if path.endswith(".json"):
+            data = json.load(file)
+            return list(data["inputs"] if isinstance(data, dict) else data)
+        return file.read().splitlines()
+
+
+def find_divergence(expected: List[Segment], actual: List[Segment]) -> Optional[dict]:
+    """Первый расходящийся кусок вывода (None - вывод совпал)"""
+    for index in range(max(len(expected), len(actual))):
+        want = expected[index] if index < len(expected) else ("", "")
+        got = actual[index] if index < len(actual) else ("", "")
+        if tuple(want) == tuple(got):
+            continue
+
+        diff = difflib.unified_diff(want[1].splitlines(), got[1].splitlines(),
+                                    "эталон", "сейчас", n=2, lineterm="")
+        return {
+            "segment": index,
+            "expected_block": want[0],
+            "actual_block": got[0],
+            "diff": list(diff)[:40],
+        }
+    return None
+
+
+# ============================================
+# ЗАДАЧИ ДЛЯ ПРОЦЕССОВ
+# ============================================
+
+def _record_one(job: Tuple[str, str]) -> str:
+    script_path, out_dir = job
+    inputs = read_script(script_path)
+    name = os.path.splitext(os.path.basename(script_path))[0]
+    golden_path = os.path.join(out_dir, f"{name}.json")
+    with open(golden_path, 'w', encoding="utf-8") as file:
+        json.dump({"name": name, "inputs": inputs, "segments": run_script(inputs)},
+                  file, ensure_ascii=False, indent=1)
+    return golden_path
+
+
+def _replay_one(golden_path: str) -> Tuple[str, Optional[dict]]:
+    with open(golden_path, 'r', encoding="utf-8") as file:
+        golden = json.load(file)
+    return golden_path, find_divergence(golden["segments"], run_script(golden["inputs"]))
+
+
+def _run_jobs(func, jobs: list, workers: int) -> list:
+    if workers <= 1 or len(jobs) < 2:
+        _init_worker()
+        return [func(job) for job in jobs]
+
+    chunk_size = max(1, len(jobs) // (workers * 8))
+    with Pool(workers, initializer=_init_worker) as pool:
+        return list(pool.imap_unordered(func, jobs, chunk_size))
+
+
+def record(script_paths: List[str], out_dir: str, workers: int = None) -> List[str]:
+    """Записывает эталоны для сценариев"""
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = [(path, out_dir) for path in script_paths]
+    return _run_jobs(_record_one, jobs, workers or os.cpu_count() or 1)
+
+
+def replay(golden_paths: List[str], workers: int = None) -> List[Tuple[str, Optional[dict]]]:
+    """Проигрывает эталоны заново и возвращает (файл, расхождение или None)"""
+    return sorted(_run_jobs(_replay_one, list(golden_paths), workers or os.cpu_count() or 1))
+
+
+def _expand(paths: List[str], patterns: Tuple[str, ...]) -> List[str]:
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for pattern in patterns:
+                files.extend(glob.glob(os.path.join(path, pattern)))
+        else:
+            files.append(path)
+    return sorted(files)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Запись и проверка эталонных прогонов игры")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser("record", help="Записать эталоны для сценариев")
+    record_parser.add_argument("scripts", nargs="+", help="Файлы сценариев или папки с ними")
+    record_parser.add_argument("--out", required=True, help="Папка для эталонов")
+    record_parser.add_argument("-j", "--jobs", type=int, default=None, help="Количество процессов")
+
+    replay_parser = commands.add_parser("replay", help="Проиграть эталоны и сравнить вывод")
+    replay_parser.add_argument("golden", nargs="+", help="Файлы эталонов или папки с ними")
+    replay_parser.add_argument("-j", "--jobs", type=int, default=None, help="Количество процессов")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        written = record(_expand(args.scripts, ("*.txt", "*.json")), args.out, args.jobs)
+        print(f"Записано эталонов: {len(written)}")
+        return 0
+
+    results = replay(_expand(args.golden, ("*.json",)), args.jobs)
+    failures = [(path, divergence) for path, divergence in results if divergence is not None]
+    for path, divergence in failures:
+        print(f"❌ {path}: расхождение в блоке '{divergence['expected_block'] or '(меню)'}' "
+              f"(фрагмент {divergence['segment']})")
+        for line in divergence["diff"]:
+            print(f"    {line}")
+    print(f"Проверено: {len(results)}, совпало: {len(results) - len(failures)}, расхождений: {len(failures)}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+# Game/scripts/WaitBlock.py
+from typing import List, Optional, Union
+
+from Game.scripts.TextBlock import TextBlock
+
+
+class WaitBlock(TextBlock):
+    """Текстовый блок, на который уходит игровое время (очередь, дорога, пара)"""
+
+    type_tag = "wait"
+
+    def __init__(self,
+                 block_id: str,
+                 body: str,
+                 minutes: int,
+                 next_block: Union[str, List[str], None],
+                 previous_block: Union[str, List[str], None] = None,
+                 conditions: Optional[str] = None):
+        super().__init__(block_id, body, next_block, previous_block, conditions)
+        self._minutes = minutes
+
+    @property
+    def time_cost(self) -> int:
+        return self._minutes
+
+    def apply_effects(self, engine: 'GameEngine'):
+        """Тратим время (могут сработать события мира)"""
+        engine.spend_time(self._minutes)
+
+    @classmethod
+    def from_dict(cls, block_id: str, data: dict):
+        try:
+            minutes = int(data.get("minutes", 0))
+        except (TypeError, ValueError):
+            raise ValueError(f"Блок '{block_id}': minutes должно быть целым числом, а не {data.get('minutes')!r}")
+        return cls(
+            block_id=block_id,
+            body=data.get("body", ""),
+            minutes=minutes,
+            next_block=data.get("next_block"),
+            previous_block=data.get("previous_block"),
+            conditions=data.get("conditions")
+        )
+
+    def to_dict(self):
+        return {"type": self.type_tag, **super().to_dict(), "minutes": self._minutes}
@@ -1,27 +1,156 @@
 import os
 import sys
 import time
+from functools import lru_cache
+
+from Game import config
+from Game.utils import Metrics
+from Game.utils.TextLayout import terminal_width, wrap
 
 # Блок следующих 3х функций невероятно поможет по ходу игры красиво выводить / форматировать / драмматизировать и оживлять игру. Они будут считать console_utils :3
 
+# ANSI последовательности: очистка экрана вместе с прокруткой и курсор в начало
+CLEAR_SEQUENCE = "\033[2J\033[3J\033[H"
+
+GAME_NAME_BANNER = """
+    ╔══════════════════════════════════════════╗
+    ║   Инженерная графика: MAI                ║
+    ║   Ingenernaya grafikcs: MAI              ║
+    ╚══════════════════════════════════════════╝
+    
+"""
+
+_ansi_ready = False
+
+
+def _enable_ansi():
+    """Включает обработку ANSI в консоли Windows (без запуска внешних процессов)"""
+    global _ansi_ready
+    if _ansi_ready:
+        return
+    _ansi_ready = True
+
+    if os.name == 'nt':
+        try:
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            handle = kernel32.GetStdHandle(-11)
+            mode = ctypes.c_uint32()
+            if kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+                kernel32.SetConsoleMode(handle, mode.value | 0x0004)  # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+        except Exception:
+            pass
+
+
+def _write(text: str):
+    """Отправляет текст в консоль одной записью"""
+    sys.stdout.write(text)
+    sys.stdout.flush()
+
+
 def print_slow(text: str, delay: float = 0.07):
     """Печатает текст побуквенно с задержкой"""
+    if delay <= 0 or not config.TYPEWRITER_ENABLED or not config.DELAYS_ENABLED:
+        _write(text + "\n")
+        return
+
     for char in text:
         sys.stdout.write(char)
         sys.stdout.flush()
         time.sleep(delay)
     print()
 
+def pause(seconds: float):
+    """Драматическая пауза между экранами (отключается настройкой DELAYS_ENABLED)"""
+    if config.DELAYS_ENABLED and seconds > 0:
+        time.sleep(seconds)
+
 def clear_console():
     """Очищает консоль"""
-    os.system('cls' if os.name == 'nt' else 'clear')
+    _enable_ansi()
+    _write(CLEAR_SEQUENCE)
+
+def set_console_title(title: str):
+    """Меняет заголовок окна консоли"""
+    _enable_ansi()
+    _write(f"\033]0;{title}\007")
+
+@lru_cache(maxsize=None)
+def separator(symbol: str = config.SEP_SYMBOL, width: int = 60) -> str:
+    """Возвращает строку-разделитель (кэшируется)"""
+    return symbol * width
+
+def print_separator(symbol: str = config.SEP_SYMBOL, width: int = 60):
+    """Выводит разделитель сразу, без побуквенной печати"""
+    _write(separator(symbol, width) + "\n")
 
 def print_game_name():
     """Выводит название игры"""
-    game_name = """
-    ╔══════════════════════════════════════════╗
-    ║   Инженерная графика: MAI                ║
-    ║   Ingenernaya grafikcs: MAI              ║
-    ╚══════════════════════════════════════════╝
+    _write(GAME_NAME_BANNER)
+
+
+class Screen:
+    """Собирает экран в памяти и выводит его одной записью.
+
+    Строки, добавленные через typed(), печатаются побуквенно (если включено),
+    всё остальное уходит в консоль одним write.
     """
-    print(game_name)
+
+    def __init__(self):
+        self._parts = []
+        self._segments = []  # Пары (текст, задержка), задержка 0 - вывести сразу
+
+    def clear(self) -> 'Screen':
+        _enable_ansi()
+        self._parts.append(CLEAR_SEQUENCE)
+        return self
+
+    def line(self, text: str = "") -> 'Screen':
+        self._parts.append(text)
+        self._parts.append("\n")
+        return self
+
+    def separator(self, symbol: str = config.SEP_SYMBOL, width: int = 60) -> 'Screen':
+        return self.line(separator(symbol, width))
+
+    def game_name(self) -> 'Screen':
+        self._parts.append(GAME_NAME_BANNER)
+        return self
+
+    def typed(self, text: str, delay: float) -> 'Screen':
+        if delay <= 0 or not config.TYPEWRITER_ENABLED or not config.DELAYS_ENABLED:
+            return self.line(text)
+        self._flush_parts()
+        self._segments.append((text, delay))
+        return self
+
+    def paragraphs(self, text: str, delay: float, width: int = None) -> 'Screen':
+        """Добавляет текст по абзацам с переносом по ширине консоли, пустые строки выводятся сразу"""
+        for paragraph in wrap(text, width or terminal_width()):
+            if paragraph.strip():
+                self.typed(paragraph, delay)
+            else:
+                self.line()
+        return self
+
+    def _flush_parts(self):
+        if self._parts:
+            self._segments.append(("".join(self._parts), 0))
+            self._parts = []
+
+    def show(self):
+        """Выводит собранный экран"""
+        self._flush_parts()
+        render_time = 0.0
+        for text, delay in self._segments:
+            if delay:
+                print_slow(text, delay)
+            else:
+                started = Metrics.start_timer()
+                _write(text)
+                if started:
+                    render_time += time.perf_counter() - started
+        self._segments = []
+
+        if Metrics.REGISTRY.enabled:
+            Metrics.RENDER_LATENCY.observe(render_time)
@@ -0,0 +1,252 @@
+import argparse
+import atexit
+import glob
+import json
+import os
+import threading
+from array import array
+from typing import Dict, Iterable, List, Optional
+
+from Game import config
+
+# Покрытие сюжета: сколько раз посещены блоки, выбраны варианты и какими были исходы условий.
+# Каждому ID один раз выдается индекс, счетчики лежат в заранее выделенных массивах,
+# поэтому посещение - это поиск в словаре и инкремент элемента массива.
+# Сборщик один на процесс, а сессии могут идти в разных потоках, поэтому все изменения
+# счетчиков идут под одной блокировкой сборщика.
+
+KINDS = ("blocks", "choices", "conditions_true", "conditions_false")
+
+_INITIAL_CAPACITY = 256
+
+
+class _Counters:
+    """Интернированные ID и массив счетчиков к ним"""
+
+    def __init__(self, lock: threading.Lock, capacity: int = _INITIAL_CAPACITY):
+        self.index: Dict[str, int] = {}
+        self.names: List[str] = []
+        self.counts = array("q", bytes(8 * capacity))
+        self._lock = lock
+
+    def intern(self, name: str) -> int:
+        with self._lock:
+            return self._intern(name)
+
+    def _intern(self, name: str) -> int:
+        idx = self.index.get(name)
+        if idx is None:
+            idx = len(self.names)
+            self.index[name] = idx
+            self.names.append(name)
+            if idx >= len(self.counts):
+                # Удваиваем массив только при появлении новых ID, а не при посещениях
+                self.counts.extend(array("q", bytes(8 * len(self.counts))))
+        return idx
+
+    def hit(self, name: str):
+        with self._lock:
+            self.counts[self._intern(name)] += 1
+
+    def to_dict(self) -> Dict[str, int]:
+        with self._lock:
+            counts = self.counts
+            return {name: counts[idx] for idx, name in enumerate(self.names) if counts[idx]}
+
+    def add(self, values: Dict[str, int]):
+        with self._lock:
+            for name, value in values.items():
+                self.counts[self._intern(name)] += value
+
+
+class CoverageCollector:
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.blocks = _Counters(self._lock)
+        self.choices = _Counters(self._lock)
+        # Исходы условий - два массива на одном наборе ID
+        self.conditions = _Counters(self._lock)
+        self._false_counts = array("q", bytes(8 * len(self.conditions.counts)))
+        self._dump_registered = False
+
+    # ---------- Сбор ----------
+
+    def bind(self, state_manager):
+        """Заранее интернирует все ID сюжета, чтобы при игре массивы не росли"""
+        for block_id in list(state_manager.text_blocks) + list(state_manager.choice_blocks):
+            self.blocks.intern(block_id)
+        for choice_id in state_manager.choices:
+            self.choices.intern(choice_id)
+        with self._lock:
+            for condition in state_manager.conditions():
+                self._intern_condition(condition)
+
+        if self.enabled and not self._dump_registered:
+            self._dump_registered = True
+            atexit.register(self.dump)
+
+    def _intern_condition(self, condition: str) -> int:
+        idx = self.conditions._intern(condition)
+        if len(self._false_counts) < len(self.conditions.counts):
+            self._false_counts.extend(array("q", bytes(8 * (len(self.conditions.counts) - len(self._false_counts)))))
+        return idx
+
+    def hit_block(self, block_id: str):
+        self.blocks.hit(block_id)
+
+    def hit_choice(self, choice_id: str):
+        self.choices.hit(choice_id)
+
+    def hit_condition(self, condition: str, result: bool):
+        with self._lock:
+            idx = self._intern_condition(condition)
+            if result:
+                self.conditions.counts[idx] += 1
+            else:
+                self._false_counts[idx] += 1
+
+    # ---------- Выгрузка ----------
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        """Ненулевые счетчики в виде словарей (формат файла покрытия)"""
+        with self._lock:
+            false_counts = self._false_counts
+            conditions_false = {name: false_counts[idx] for idx, name in enumerate(self.conditions.names)
+                                if false_counts[idx]}
+        return {
+            "blocks": self.blocks.to_dict(),
+            "choices": self.choices.to_dict(),
+            "conditions_true": self.conditions.to_dict(),
+            "conditions_false": conditions_false,
+        }
+
+    def dump(self, directory: str = None) -> Optional[str]:
+        """Дописывает счетчики процесса в его файл coverage-<pid>.json"""
+        snapshot = self.snapshot()
+        if not any(snapshot.values()):
+            return None
+
+        directory = directory or config.COVERAGE_DIR
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"coverage-{os.getpid()}.json")
+        if os.path.exists(path):
+            snapshot = merge([load(path), snapshot])
+
+        with open(path, 'w', encoding="utf-8") as file:
+            json.dump(snapshot, file, ensure_ascii=False, indent=2)
+        self.reset()
+        return path
+
+    def reset(self):
+        with self._lock:
+            for counters in (self.blocks, self.choices, self.conditions):
+                counters.counts = array("q", bytes(8 * len(counters.counts)))
+            self._false_counts = array("q", bytes(8 * len(self.conditions.counts)))
+
+
+COLLECTOR = CoverageCollector(enabled=config.COVERAGE_ENABLED)
+
+
+# ============================================
+# ОБЪЕДИНЕНИЕ И ОТЧЕТ
+# ============================================
+
+def load(path: str) -> Dict[str, Dict[str, int]]:
+    with open(path, 'r', encoding="utf-8") as file:
+        data = json.load(file)
+    return {kind: data.get(kind, {}) for kind in KINDS}
+
+
+def merge(snapshots: Iterable[Dict[str, Dict[str, int]]]) -> Dict[str, Dict[str, int]]:
+    """Складывает счетчики нескольких процессов"""
+    merged = {kind: {} for kind in KINDS}
+    for snapshot in snapshots:
+        for kind in KINDS:
+            target = merged[kind]
+            for name, value in snapshot.get(kind, {}).items():
+                target[name] = target.get(name, 0) + value
+    return merged
+
+
+def _heatmap(counts: Dict[str, int], names: List[str], width: int = 30) -> List[str]:
+    top = max(counts.values(), default=0) or 1
+    name_width = max((len(name) for name in names), default=0)
+    lines = []
+    for name in names:
+        value = counts.get(name, 0)
+        bar = "█" * max(1, round(value / top * width)) if value else "·"
+        lines.append(f"  {name:<{name_width}} {value:>6} {bar}")
+    return lines
+
+
+def report(state_manager, data: Dict[str, Dict[str, int]], heatmap: bool = True) -> str:
+    """Отчет: непосещенный контент сюжета и тепловые карты посещений"""
+    block_ids = sorted(set(state_manager.text_blocks) | set(state_manager.choice_blocks))
+    if state_manager.chapter_store is not None:
+        block_ids = sorted(set(block_ids) | set(state_manager.chapter_store.block_ids))
+    choice_ids = sorted(state_manager.choices)
+    conditions = sorted(set(state_manager.conditions()) | set(data["conditions_true"]) | set(data["conditions_false"]))
+
+    blocks, choices = data["blocks"], data["choices"]
+    unvisited_blocks = [block_id for block_id in block_ids if not blocks.get(block_id)]
+    unvisited_choices = [choice_id for choice_id in choice_ids if not choices.get(choice_id)]
+    never_true = [cond for cond in conditions if not data["conditions_true"].get(cond)]
+    never_false = [cond for cond in conditions if not data["conditions_false"].get(cond)]
+
+    def percent(total, missed):
+        return 100.0 * (total - missed) / total if total else 100.0
+
+    lines = [
+        f"Блоки:   {len(block_ids) - len(unvisited_blocks)}/{len(block_ids)} "
+        f"({percent(len(block_ids), len(unvisited_blocks)):.1f}%)",
+        f"Выборы:  {len(choice_ids) - len(unvisited_choices)}/{len(choice_ids)} "
+        f"({percent(len(choice_ids), len(unvisited_choices)):.1f}%)",
+        f"Условия: {len(conditions)} (ни разу не истинны: {len(never_true)}, ни разу не ложны: {len(never_false)})",
+    ]
+
+    for title, items in (("Непосещенные блоки", unvisited_blocks),
+                         ("Ни разу не выбранные варианты", unvisited_choices),
+                         ("Условия, ни разу не выполненные", never_true),
+                         ("Условия, ни разу не проваленные", never_false)):
+        if items:
+            lines.append("")
+            lines.append(f"{title}:")
+            lines.extend(f"  - {item}" for item in items)
+
+    if heatmap:
+        lines.append("")
+        lines.append("Посещения блоков:")
+        lines.extend(_heatmap(blocks, block_ids))
+        lines.append("")
+        lines.append("Выборы:")
+        lines.extend(_heatmap(choices, choice_ids))
+
+    return "\n".join(lines)
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Объединение файлов покрытия и отчет по непосещенному сюжету")
+    parser.add_argument("files", nargs="*", help=f"Файлы покрытия (по умолчанию {config.COVERAGE_DIR}/*.json)")
+    parser.add_argument("--out", help="Сохранить объединенные счетчики в файл")
+    parser.add_argument("--no-heatmap", action="store_true", help="Только список непосещенного")
+    args = parser.parse_args(argv)
+
+    from Game.scripts.GameStateManager import GameStateManager
+
+    files = args.files or sorted(glob.glob(os.path.join(config.COVERAGE_DIR, "*.json")))
+    if not files:
+        print("Файлы покрытия не найдены")
+        return
+
+    data = merge(load(path) for path in files)
+    if args.out:
+        with open(args.out, 'w', encoding="utf-8") as file:
+            json.dump(data, file, ensure_ascii=False, indent=2)
+
+    print(f"Объединено файлов: {len(files)}")
+    print(report(GameStateManager.shared(), data, heatmap=not args.no_heatmap))
+
+
+if __name__ == "__main__":
+    main()
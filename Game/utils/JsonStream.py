@@ -0,0 +1,182 @@
+import json
+import re
+from typing import Any, Collection, Iterator, Optional, Sequence, TextIO, Tuple
+
+# Сколько символов читать из файла за раз
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE_RE = re.compile(r"[ \t\n\r]*")
+_NUMBER_CHARS = "0123456789.eE+-"
+# При пропуске значения: строка целиком (группа 1 пуста, если строка не закончилась) или скобка
+_SKIP_TOKEN_RE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*(")?|[{}\[\]]', re.DOTALL)
+_decoder = json.JSONDecoder()
+
+
+class _JsonReader:
+    """Читает JSON из файла кусками и разбирает его по одному значению за раз"""
+
+    def __init__(self, file: TextIO, chunk_size: int = CHUNK_SIZE):
+        self._file = file
+        self._chunk_size = chunk_size
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Дочитывает следующий кусок, уже разобранную часть буфера выбрасывает"""
+        if self._eof:
+            return False
+        chunk = self._file.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """Возвращает следующий значимый символ (пропуская пробелы), не сдвигая позицию"""
+        while True:
+            self._pos = _WHITESPACE_RE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                raise json.JSONDecodeError("Неожиданный конец файла", self._buf, self._pos)
+
+    def _expect(self, char: str):
+        if self._peek() != char:
+            raise json.JSONDecodeError(f"Ожидался символ '{char}'", self._buf, self._pos)
+        self._pos += 1
+
+    def read_value(self) -> Any:
+        """Разбирает одно JSON значение целиком"""
+        self._peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # Число на границе буфера могло оборваться (например "1." из "1.5") - дочитываем и пробуем снова
+            if (isinstance(value, (int, float)) and not isinstance(value, bool)
+                    and not self._buf[end:].strip(_NUMBER_CHARS) and self._fill()):
+                continue
+            self._pos = end
+            return value
+
+    def skip_value(self):
+        """Пропускает одно JSON значение, не разбирая его.
+
+        Считаем только глубину скобок (строки проглатываются регулярным выражением целиком),
+        а прочитанная часть буфера выбрасывается при каждом _fill, поэтому пропуск большого
+        раздела идет за один проход и в памяти держит только текущий кусок.
+        """
+        if self._peek() not in '{["':
+            self.read_value()  # Число, true/false/null - короткие
+            return
+
+        depth = 0
+        while True:
+            buf = self._buf
+            for match in _SKIP_TOKEN_RE.finditer(buf, self._pos):
+                char = buf[match.start()]
+                if char == '"':
+                    if match.group(1) is None:
+                        break  # Строка оборвалась на границе буфера - дочитаем и разберем заново
+                elif char in "{[":
+                    depth += 1
+                else:
+                    depth -= 1
+                self._pos = match.end()
+                if depth == 0:
+                    return
+            else:
+                self._pos = len(buf)
+            if not self._fill():
+                raise json.JSONDecodeError("Неожиданный конец файла", self._buf, self._pos)
+
+    def enter_object(self) -> bool:
+        """Входит в объект; если значение не объект - пропускает его и возвращает False"""
+        if self._peek() != "{":
+            self.skip_value()
+            return False
+        self._pos += 1
+        return True
+
+    def next_key(self) -> Optional[str]:
+        """Возвращает следующий ключ текущего объекта или None, если объект закончился"""
+        char = self._peek()
+        if char == "}":
+            self._pos += 1
+            return None
+        if char == ",":
+            self._pos += 1
+        key = self.read_value()
+        if not isinstance(key, str):
+            raise json.JSONDecodeError("Ключ объекта должен быть строкой", self._buf, self._pos)
+        self._expect(":")
+        return key
+
+
+def iter_object_items(filepath: str, path: Sequence[str] = (),
+                      chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, Any]]:
+    """Поочередно выдает пары (ключ, значение) объекта, лежащего в файле по пути path.
+
+    Например, для choices.json и path=("choices",) выдаются пары (ID выбора, данные выбора).
+    В памяти одновременно находится только кусок файла и одна запись.
+    """
+    with open(filepath, 'r', encoding='utf-8') as f:
+        reader = _JsonReader(f, chunk_size)
+        if not reader.enter_object():
+            return
+
+        for wanted in path:
+            while True:
+                key = reader.next_key()
+                if key is None:
+                    return
+                if key == wanted:
+                    break
+                reader.skip_value()
+
+            if not reader.enter_object():
+                return
+
+        yield from _object_items(reader)
+
+
+def _object_items(reader: _JsonReader) -> Iterator[Tuple[str, Any]]:
+    while True:
+        key = reader.next_key()
+        if key is None:
+            return
+        yield key, reader.read_value()
+
+
+def iter_sections(filepath: str, wanted: Collection[str],
+                  chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, Iterator[Tuple[str, Any]]]]:
+    """За один проход по файлу выдает разделы верхнего уровня из wanted: (имя, итератор его пар).
+
+    Остальные разделы пропускаются без разбора. Пары раздела нужно дочитать до следующего
+    шага - непрочитанный остаток раздела разбирается и выбрасывается.
+    """
+    with open(filepath, 'r', encoding='utf-8') as f:
+        reader = _JsonReader(f, chunk_size)
+        if not reader.enter_object():
+            return
+
+        while True:
+            key = reader.next_key()
+            if key is None:
+                return
+            if key not in wanted:
+                reader.skip_value()
+                continue
+            if not reader.enter_object():
+                continue
+
+            items = _object_items(reader)
+            yield key, items
+            for _ in items:
+                pass
@@ -0,0 +1,193 @@
+import gc
+import sys
+import tracemalloc
+import types
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Отчет о памяти по подсистемам движка.
+#
+# Размер подсистемы - глубокий размер её объектов (sys.getsizeof по всему графу); объект,
+# общий для нескольких подсистем, засчитывается первой из них. Если включен tracemalloc,
+# дополнительно показываются места выделения памяти и разница между снимками.
+
+# Модули, по которым группируются выделения tracemalloc
+MODULE_GROUPS = (
+    ("Сюжет", ("GameStateManager.py", "TextBlock.py", "ChoiceBlock.py", "Choice.py", "GameBlock.py",
+               "JsonStream.py", "ChapterStore.py", "BranchTable.py", "GameClock.py", "BlockRegistry.py",
+               "RandomBlock.py", "WaitBlock.py", "ItemCheckBlock.py", "EndingBlock.py")),
+    ("Условия", ("Condition.py",)),
+    ("Игроки", ("Player.py", "Inventory.py", "Item.py", "Achievements.py", "SessionPool.py")),
+    ("Сохранения", ("DataManager.py", "SaveBackend.py")),
+    ("Вывод", ("ConsoleUtils.py", "TextLayout.py")),
+)
+
+# Что не считаем частью подсистем: общий код и модули
+_SKIP_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+               types.MethodType, types.CodeType, types.FrameType)
+
+
+@dataclass
+class MemoryReport:
+    subsystems: Dict[str, int]  # Подсистема -> байт (глубокий размер объектов)
+    traced_current: int = 0  # Байт под наблюдением tracemalloc сейчас
+    traced_peak: int = 0
+    modules: Dict[str, int] = field(default_factory=dict)  # Группа модулей -> байт по tracemalloc
+    top_sites: List[Tuple[str, int, int]] = field(default_factory=list)  # (место, байт, блоков)
+    diff: List[Tuple[str, int, int]] = field(default_factory=list)  # (место, прирост байт, прирост блоков)
+
+
+def deep_sizeof(obj, seen: Optional[set] = None) -> int:
+    """Размер объекта вместе со всем, на что он ссылается (без повторов из seen)"""
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, _SKIP_TYPES):
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        elif not isinstance(current, (str, bytes, int, float, bool)):
+            if hasattr(current, "__dict__"):
+                stack.append(vars(current))
+            for slot in getattr(type(current), "__slots__", ()):
+                if hasattr(current, slot):
+                    stack.append(getattr(current, slot))
+    return total
+
+
+def subsystem_sizes(state_manager=None, data_manager=None, players: Iterable = ()) -> Dict[str, int]:
+    """Глубокие размеры подсистем движка в байтах"""
+    parts = []
+    if state_manager is not None:
+        parts += [
+            ("Текстовые блоки", state_manager.text_blocks),
+            ("Блоки с выбором", state_manager.choice_blocks),
+            ("Варианты выбора", state_manager.choices),
+            ("Скомпилированные условия", state_manager._conditions),
+            ("Таблицы ветвлений", state_manager._branches),
+            ("Реестр предметов", state_manager.item_registry),
+            ("События мира", state_manager.world_events),
+        ]
+    parts.append(("Игроки", list(players)))
+    if data_manager is not None:
+        parts.append(("Кэш сохранений DataManager", data_manager.cache))
+
+    seen = set()
+    return {name: deep_sizeof(obj, seen) for name, obj in parts}
+
+
+# ============================================
+# TRACEMALLOC
+# ============================================
+
+def start_tracing(frames: int = 1):
+    """Включает tracemalloc (лучше до загрузки сюжета, иначе он не попадет в снимки)"""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def stop_tracing():
+    tracemalloc.stop()
+
+
+def take_snapshot() -> Optional[tracemalloc.Snapshot]:
+    """Снимок выделений без служебных записей tracemalloc (None, если трассировка выключена)"""
+    if not tracemalloc.is_tracing():
+        return None
+    gc.collect()
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    ))
+
+
+def _site(stat) -> str:
+    frame = stat.traceback[0]
+    return f"{frame.filename}:{frame.lineno}"
+
+
+def top_sites(snapshot: tracemalloc.Snapshot, limit: int = 10) -> List[Tuple[str, int, int]]:
+    """Места, где выделено больше всего памяти"""
+    return [(_site(stat), stat.size, stat.count) for stat in snapshot.statistics("lineno")[:limit]]
+
+
+def diff_snapshots(old: tracemalloc.Snapshot, new: tracemalloc.Snapshot, limit: int = 10) -> List[Tuple[str, int, int]]:
+    """Места с наибольшим изменением памяти между двумя снимками"""
+    return [(_site(stat), stat.size_diff, stat.count_diff)
+            for stat in new.compare_to(old, "lineno")[:limit] if stat.size_diff]
+
+
+def module_sizes(snapshot: tracemalloc.Snapshot) -> Dict[str, int]:
+    """Память по группам модулей движка (по месту выделения)"""
+    sizes = {name: 0 for name, _ in MODULE_GROUPS}
+    sizes["Прочее"] = 0
+    for stat in snapshot.statistics("filename"):
+        filename = stat.traceback[0].filename.replace("\\", "/")
+        for name, patterns in MODULE_GROUPS:
+            if any(pattern in filename for pattern in patterns):
+                sizes[name] += stat.size
+                break
+        else:
+            sizes["Прочее"] += stat.size
+    return sizes
+
+
+def collect(state_manager=None, data_manager=None, players: Iterable = (),
+            previous: Optional[tracemalloc.Snapshot] = None, limit: int = 10) -> Tuple[MemoryReport, Optional[tracemalloc.Snapshot]]:
+    """Собирает отчет; возвращает его вместе со снимком для следующего сравнения"""
+    report = MemoryReport(subsystem_sizes(state_manager, data_manager, players))
+    snapshot = take_snapshot()
+    if snapshot is not None:
+        report.traced_current, report.traced_peak = tracemalloc.get_traced_memory()
+        report.modules = module_sizes(snapshot)
+        report.top_sites = top_sites(snapshot, limit)
+        if previous is not None:
+            report.diff = diff_snapshots(previous, snapshot, limit)
+    return report, snapshot
+
+
+def format_size(size: int) -> str:
+    for unit in ("Б", "КБ", "МБ"):
+        if abs(size) < 1024 or unit == "МБ":
+            return f"{size:.0f} {unit}" if unit == "Б" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def format_report(report: MemoryReport) -> List[str]:
+    """Строки отчета для консоли"""
+    lines = ["Подсистемы (глубокий размер объектов):"]
+    for name, size in report.subsystems.items():
+        lines.append(f"  {name:<30} {format_size(size):>10}")
+    lines.append(f"  {'Итого':<30} {format_size(sum(report.subsystems.values())):>10}")
+
+    if not report.modules:
+        lines.append("")
+        lines.append("tracemalloc выключен - места выделения не отслеживаются (MEMORY_TRACE_ENABLED)")
+        return lines
+
+    lines.append("")
+    lines.append(f"tracemalloc: сейчас {format_size(report.traced_current)}, пик {format_size(report.traced_peak)}")
+    for name, size in report.modules.items():
+        lines.append(f"  {name:<30} {format_size(size):>10}")
+
+    lines.append("")
+    lines.append("Больше всего памяти выделено в:")
+    for site, size, count in report.top_sites:
+        lines.append(f"  {format_size(size):>10} {count:>7} блоков  {site}")
+
+    if report.diff:
+        lines.append("")
+        lines.append("Изменения с прошлого снимка:")
+        for site, size, count in report.diff:
+            change = ("+" if size > 0 else "") + format_size(size)
+            lines.append(f"  {change:>10} {count:+7d} блоков  {site}")
+    return lines
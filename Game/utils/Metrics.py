@@ -0,0 +1,202 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence
+
+from Game import config
+
+# Метрики в формате Prometheus. Когда они выключены, каждый вызов - одна проверка флага.
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._metrics: List['_Metric'] = []
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def register(self, metric: '_Metric') -> '_Metric':
+        self._metrics.append(metric)
+        metric._registry = self
+        return metric
+
+    def render(self) -> str:
+        """Текст всех метрик в формате Prometheus exposition"""
+        lines = []
+        with self._lock:
+            for metric in self._metrics:
+                lines.append(f"# HELP {metric.name} {metric.help}")
+                lines.append(f"# TYPE {metric.name} {metric.kind}")
+                lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def start_http_server(self, port: int = None, host: str = None) -> ThreadingHTTPServer:
+        """Поднимает локальный HTTP эндпоинт /metrics в фоновом потоке (один на процесс)"""
+        if self._server is not None:
+            return self._server
+
+        registry = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Не мусорим в игровую консоль
+
+        self._server = ThreadingHTTPServer((host or config.METRICS_HOST, port or config.METRICS_PORT), _Handler)
+        threading.Thread(target=self._server.serve_forever, name="MetricsServer", daemon=True).start()
+        return self._server
+
+    def stop_http_server(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, help: str, label: str = None):
+        self.name = name
+        self.help = help
+        self.label = label  # Имя единственной метки (например "type") или None
+        self._registry: Optional[MetricsRegistry] = None
+
+    def _suffix(self, label_value: str, extra: str = "") -> str:
+        parts = []
+        if self.label:
+            parts.append(f'{self.label}="{_escape(label_value)}"')
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    @abstractmethod
+    def samples(self) -> List[str]:
+        """Строки метрики в формате Prometheus"""
+        pass
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, label: str = None):
+        super().__init__(name, help, label)
+        self._values: Dict[str, float] = {}
+
+    def inc(self, amount: float = 1, label_value: str = ""):
+        registry = self._registry
+        if not registry.enabled:
+            return
+        with registry._lock:
+            self._values[label_value] = self._values.get(label_value, 0) + amount
+
+    def value(self, label_value: str = "") -> float:
+        return self._values.get(label_value, 0)
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{self._suffix(key)} {value}" for key, value in sorted(self._values.items())]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, label_value: str = ""):
+        self.inc(-amount, label_value)
+
+    def set(self, value: float, label_value: str = ""):
+        registry = self._registry
+        if not registry.enabled:
+            return
+        with registry._lock:
+            self._values[label_value] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, label: str = None, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, label)
+        self._buckets = tuple(sorted(buckets))
+        self._counts: Dict[str, List[int]] = {}  # Метка -> количество наблюдений по корзинам (+Inf в конце)
+        self._sums: Dict[str, float] = {}
+
+    def observe(self, value: float, label_value: str = ""):
+        registry = self._registry
+        if not registry.enabled:
+            return
+        with registry._lock:
+            counts = self._counts.get(label_value)
+            if counts is None:
+                counts = self._counts[label_value] = [0] * (len(self._buckets) + 1)
+                self._sums[label_value] = 0.0
+            counts[bisect_left(self._buckets, value)] += 1
+            self._sums[label_value] += value
+
+    def observe_since(self, started: float, label_value: str = ""):
+        """Записывает время, прошедшее с start_timer(); ничего не делает, если метрики выключены"""
+        if started:
+            self.observe(time.perf_counter() - started, label_value)
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key in sorted(self._counts):
+            cumulative = 0
+            for bound, count in zip(self._buckets + (float("inf"),), self._counts[key]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                le_label = f'le="{le}"'
+                lines.append(f"{self.name}_bucket{self._suffix(key, le_label)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._suffix(key)} {self._sums[key]}")
+            lines.append(f"{self.name}_count{self._suffix(key)} {cumulative}")
+        return lines
+
+
+REGISTRY = MetricsRegistry(enabled=config.METRICS_ENABLED)
+
+
+def start_timer() -> float:
+    """Начало замера для Histogram.observe_since (0, если метрики выключены)"""
+    return time.perf_counter() if REGISTRY.enabled else 0.0
+
+
+# ============================================
+# МЕТРИКИ ДВИЖКА
+# ============================================
+
+BLOCKS_PROCESSED = REGISTRY.register(Counter(
+    "gne_blocks_processed_total", "Обработано блоков сюжета", label="type"))
+ACTIVE_SESSIONS = REGISTRY.register(Gauge(
+    "gne_active_sessions", "Сессии, находящиеся в игровом цикле"))
+SAVE_LATENCY = REGISTRY.register(Histogram(
+    "gne_save_game_seconds", "Время сохранения игры (GameEngine.save_game)"))
+DATA_FLUSH_LATENCY = REGISTRY.register(Histogram(
+    "gne_save_all_data_seconds", "Время записи файла сохранений (DataManager.save_all_data)"))
+CONDITION_EVALUATIONS = REGISTRY.register(Counter(
+    "gne_condition_evaluations_total", "Проверено условий", label="result"))
+RENDER_LATENCY = REGISTRY.register(Histogram(
+    "gne_render_seconds", "Время вывода экрана без учета побуквенной печати"))
+RESIDENT_SESSIONS = REGISTRY.register(Gauge(
+    "gne_resident_sessions", "Сессии пула в памяти"))
+SPILLED_SESSIONS = REGISTRY.register(Gauge(
+    "gne_spilled_sessions", "Сессии пула, усыпленные в файл подкачки"))
+SESSION_RESTORE_LATENCY = REGISTRY.register(Histogram(
+    "gne_session_restore_seconds", "Время восстановления сессии из файла подкачки",
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01)))
@@ -0,0 +1,120 @@
+import shutil
+import unicodedata
+from functools import lru_cache
+from typing import Tuple
+
+from Game import config
+
+# Перенос текста по ширине консоли с учетом реальной ширины символов:
+# иероглифы и эмодзи занимают две колонки, комбинирующие знаки и модификаторы - ноль.
+
+_ZERO_WIDTH = {"\u200b", "\u200c", "\u200d", "\u2060", "\ufeff"}
+_EMOJI_PRESENTATION = "\ufe0f"  # Селектор варианта: предыдущий символ рисуется как эмодзи
+
+# Диапазоны эмодзи, которые east_asian_width не считает широкими
+_WIDE_RANGES = (
+    (0x1F300, 0x1F64F),
+    (0x1F680, 0x1F6FF),
+    (0x1F900, 0x1F9FF),
+    (0x1FA70, 0x1FAFF),
+)
+
+
+@lru_cache(maxsize=None)
+def char_width(char: str) -> int:
+    """Количество колонок, которое занимает символ в терминале"""
+    if char in _ZERO_WIDTH or char == _EMOJI_PRESENTATION:
+        return 0
+    if unicodedata.combining(char) or unicodedata.category(char) in ("Mn", "Me", "Cc", "Cf"):
+        return 0
+    if unicodedata.east_asian_width(char) in ("W", "F"):
+        return 2
+
+    code = ord(char)
+    for start, end in _WIDE_RANGES:
+        if start <= code <= end:
+            return 2
+    return 1
+
+
+def text_width(text: str) -> int:
+    """Ширина строки в колонках терминала"""
+    width = 0
+    previous = 0
+    for char in text:
+        if char == _EMOJI_PRESENTATION and previous == 1:
+            # "✏️" = узкий символ + FE0F, а на экране занимает две колонки
+            width += 1
+            previous = 2
+            continue
+        previous = char_width(char)
+        width += previous
+    return width
+
+
+def terminal_width() -> int:
+    """Ширина текущего терминала, не больше CONSOLE_WIDTH"""
+    columns = shutil.get_terminal_size((config.CONSOLE_WIDTH, config.MIN_CONSOLE_HEIGHT)).columns
+    return max(10, min(columns, config.CONSOLE_WIDTH))
+
+
+def _split_long_word(word: str, width: int):
+    part, part_width = [], 0
+    for char in word:
+        char_cols = text_width(char)
+        if part and part_width + char_cols > width:
+            yield "".join(part)
+            part, part_width = [], 0
+        part.append(char)
+        part_width += char_cols
+    if part:
+        yield "".join(part)
+
+
+def _wrap_line(line: str, width: int) -> Tuple[str, ...]:
+    stripped = line.lstrip(" ")
+    if not stripped:
+        return (line,)
+
+    indent = line[:len(line) - len(stripped)]
+    if len(indent) >= width // 2:
+        indent = ""  # Отступ съел бы всю строку
+
+    lines = []
+    current, current_width = indent, len(indent)
+    for word in stripped.split():
+        word_width = text_width(word)
+        if current_width > len(indent):
+            if current_width + 1 + word_width <= width:
+                current += " " + word
+                current_width += 1 + word_width
+                continue
+            lines.append(current)
+            current, current_width = indent, len(indent)
+
+        if len(indent) + word_width <= width:
+            current += word
+            current_width += word_width
+            continue
+
+        # Слово длиннее строки - режем по символам
+        for part in _split_long_word(word, width - len(indent)):
+            if current_width > len(indent):
+                lines.append(current)
+            current, current_width = indent + part, len(indent) + text_width(part)
+
+    lines.append(current)
+    return tuple(lines)
+
+
+@lru_cache(maxsize=1024)
+def wrap(text: str, width: int) -> Tuple[str, ...]:
+    """Разбивает текст на строки не шире width колонок (результат кэшируется по тексту и ширине)"""
+    lines = []
+    for line in text.split("\n"):
+        if text_width(line) <= width:
+            lines.append(line)
+        else:
+            lines.extend(_wrap_line(line, width))
+    return tuple(lines)
+
@@ -0,0 +1,105 @@
+# tests/test_condition.py
+# Запуск из корня репозитория: python -m pytest tests
+import pytest
+
+from Game.scripts.Condition import ConditionError, compile_condition, format_clock, parse_clock
+from Game.scripts.Inventory import Inventory
+from Game.scripts.Item import Item
+
+
+def _inventory(*items: Item) -> Inventory:
+    return Inventory(list(items))
+
+
+# ---------- Белый список конструкций ----------
+
+@pytest.mark.parametrize("source", [
+    "eat_1.__class__",  # Обращение к атрибуту
+    "().__class__.__bases__[0]",
+    "flags['eat_1']",  # Индексация
+    "(lambda: True)()",
+    "open('save.json')",  # Вызовы, кроме has_item / item_count
+    "__import__('os')",
+    "has_item(name)",  # has_item только со строковым литералом
+    "has_item('Ручка', 2)",
+    "item_count(x='Ручка')",
+    "[eat_1]",
+    "eat_1 if eat_2 else eat_3",
+    "eat_1 + 1",
+    "b'bytes'",
+])
+def test_rejected_constructions(source):
+    with pytest.raises(ConditionError):
+        compile_condition(source)
+
+
+def test_syntax_error_is_condition_error():
+    with pytest.raises(ConditionError):
+        compile_condition("eat_1 ==")
+
+
+def test_no_builtins_in_compiled_function():
+    # Имя, совпадающее со встроенной функцией, - это флаг, а не builtin
+    condition = compile_condition("len")
+    assert condition.flags == {"len"}
+    assert condition({}) is False
+    assert condition({"len": True}) is True
+
+
+# ---------- Флаги ----------
+
+def test_bare_flag_means_flag_is_set():
+    # Раньше "eat_1" давало NameError и всегда считалось ложью
+    condition = compile_condition("eat_1")
+    assert condition({"eat_1": True}) is True
+    assert condition({"eat_1": False}) is False
+    assert condition({}) is False
+
+
+def test_flag_comparisons_and_missing_flags():
+    assert compile_condition("eat_1 == True")({"eat_1": True}) is True
+    assert compile_condition("eat_1 == False")({}) is True
+    assert compile_condition("not eat_1 and eat_2")({"eat_2": True}) is True
+    assert compile_condition("eat_1 or eat_2")({}) is False
+
+
+def test_dependencies_are_recorded():
+    condition = compile_condition('eat_1 and has_item("Ручка") and time < 17:30 and item_power > 10')
+    assert condition.flags == {"eat_1"}
+    assert condition.items == {"Ручка"}
+    assert condition.uses_time
+    assert condition.uses_power
+
+
+# ---------- Время ----------
+
+def test_time_comparisons():
+    before = compile_condition("time < 17:30")
+    assert before({}, None, 17 * 60 + 29) is True
+    assert before({}, None, 17 * 60 + 30) is False
+    assert compile_condition("time >= 9:05")({}, None, 9 * 60 + 5) is True
+
+
+def test_clock_literal_inside_string_is_not_rewritten():
+    condition = compile_condition('has_item("Билет 17:30")')
+    assert condition.items == {"Билет 17:30"}
+    assert condition({}, _inventory(Item("Билет 17:30"))) is True
+
+
+def test_clock_helpers():
+    assert parse_clock("08:05") == 8 * 60 + 5
+    assert parse_clock(None) is None
+    assert format_clock(17 * 60 + 30) == "17:30"
+    with pytest.raises(ConditionError):
+        parse_clock("завтра")
+
+
+# ---------- Предметы ----------
+
+def test_item_predicates():
+    inventory = _inventory(Item("Ручка", power=5), Item("Ручка", power=5), Item("Циркуль соседа", power=60))
+    assert compile_condition('has_item("Ручка")')({}, inventory) is True
+    assert compile_condition('has_item("Линейка")')({}, inventory) is False
+    assert compile_condition('item_count("Ручка") >= 2')({}, inventory) is True
+    assert compile_condition("item_power >= 70")({}, inventory) is True
+    assert compile_condition("item_power > 70")({}, inventory) is False